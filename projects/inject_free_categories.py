@@ -1,6 +1,11 @@
-import json
-import os
-import shutil
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.utils import journal_insert
 
 TOOLS_DB = r"H:\boring\projects\tools-directory\data\database.json"
 OS_DB = r"H:\boring\projects\opensource-directory\data\database.json"
@@ -69,22 +74,13 @@ free_software = [
 ]
 
 def append_to_db(filepath, new_records):
+    # Journal the inserts instead of rewriting the whole catalog; records whose
+    # slug already exists are skipped when the journal is replayed.
+    # Run `python -m scripts.compact_database <filepath>` to fold them in.
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        existing_slugs = {item['slug'] for item in data}
-        added = 0
-        for record in new_records:
-            if record['slug'] not in existing_slugs:
-                data.append(record)
-                added += 1
-                
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-            
-        print(f"Added {added} records to {filepath}")
-    except Exception as e:
+        queued = journal_insert(new_records, Path(filepath))
+        print(f"Journaled {queued} records for {filepath}")
+    except (OSError, ValueError, KeyError) as e:
         print(f"Error processing {filepath}: {e}")
 
 # Inject the 35 Tools/News/Edu/Media into Tools Directory
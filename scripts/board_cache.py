@@ -0,0 +1,109 @@
+"""
+Pinterest board lookup with a local name -> ID cache.
+
+Both post_pinterest.py and pinterest_automation.py resolve boards by name.
+The v5 GET /boards endpoint is paginated with a `bookmark` cursor, so a
+correct lookup may take several requests; caching the result for a while
+saves those round trips on every run and, more importantly, means a board
+on page two is never mistaken for missing and created again.
+"""
+import time
+from pathlib import Path
+
+from scripts.utils import get_cache_dir, load_json_state, save_json_state
+
+BOARD_CACHE_NAME = "pinterest-boards.json"
+BOARD_CACHE_TTL = 7 * 24 * 3600  # seconds
+BOARDS_PAGE_SIZE = 250  # Pinterest v5 maximum
+
+
+class BoardListingError(RuntimeError):
+    """A page of boards could not be fetched, so the listing is incomplete."""
+
+
+class BoardCache:
+    """Board IDs keyed by case-folded board name, each with a fetch time.
+
+    Args:
+        path: JSON state file. Defaults to the build cache.
+        ttl: Seconds an entry stays valid.
+    """
+
+    def __init__(self, path: Path = None, ttl: float = BOARD_CACHE_TTL):
+        self.path = Path(path) if path else get_cache_dir() / BOARD_CACHE_NAME
+        self.ttl = ttl
+        self.entries = load_json_state(self.path, default={})
+
+    def get(self, name: str):
+        """Return the cached board ID, or None if missing or expired."""
+        entry = self.entries.get(name.lower())
+        if entry and time.time() - entry["fetched"] < self.ttl:
+            return entry["id"]
+        return None
+
+    def set(self, name: str, board_id: str) -> None:
+        self.entries[name.lower()] = {"id": board_id, "fetched": time.time()}
+
+    def forget(self, name: str) -> None:
+        self.entries.pop(name.lower(), None)
+
+    def save(self) -> None:
+        save_json_state(self.path, self.entries)
+
+
+def iter_boards(fetch_page):
+    """Yield every board, following the bookmark cursor across pages.
+
+    Args:
+        fetch_page: Callable taking a bookmark (None for the first page) and
+            returning the decoded GET /boards response, or None on error.
+
+    Yields:
+        Board dicts with at least 'id' and 'name'.
+
+    Raises:
+        BoardListingError: If a page fails, since a board may be on it.
+    """
+    bookmark = None
+    seen = set()
+    while True:
+        page = fetch_page(bookmark)
+        if page is None:
+            raise BoardListingError(f"failed to fetch boards page (bookmark {bookmark!r})")
+        yield from page.get("items", [])
+        bookmark = page.get("bookmark")
+        # Stop on a missing or repeated cursor so a misbehaving API can't loop forever
+        if not bookmark or bookmark in seen:
+            return
+        seen.add(bookmark)
+
+
+def find_board(name: str, fetch_page, cache: BoardCache = None):
+    """Resolve a board ID by name, consulting the cache first.
+
+    On a miss every page of boards is listed, and every board seen is cached,
+    so looking up sibling boards afterwards is free.
+
+    Returns:
+        The board ID, or None if no board has that name.
+
+    Raises:
+        BoardListingError: If the listing failed before the board was found.
+            Boards seen until then are still cached.
+    """
+    cache = cache or BoardCache()
+    board_id = cache.get(name)
+    if board_id:
+        return board_id
+
+    try:
+        for board in iter_boards(fetch_page):
+            cache.set(board["name"], board["id"])
+            if board["name"].lower() == name.lower():
+                board_id = board["id"]
+    except BoardListingError:
+        if not board_id:
+            raise
+    finally:
+        cache.save()
+    return board_id
@@ -3,11 +3,19 @@ Static Site Generator for the Programmatic SEO Directory.
 
 Reads data/database.json, renders Jinja2 templates, and outputs
 thousands of static HTML pages into dist/.
+
+Every build step takes an optional BuildContext describing the site. Without
+one, the module-level settings below are used. `--config sites.json` builds
+every configured directory site (and its sitemaps) in one process, in
+parallel, sharing one compiled template environment per templates directory.
 """
 import json
 import os
 import shutil
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -16,9 +24,20 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, pass_context
 
+from scripts.critical_css import CriticalCss, minify_css
+from scripts.entity_index import EntityIndex, build_entity_index
+from scripts.generate_sitemap import generate_sitemap
+from scripts.optimize_images import IMAGE_EXTENSIONS, optimize_images
+from scripts.schemas import get_render_plan
+from scripts.search_index import build_search_index
+from scripts.social_cards import build_social_cards
 from scripts.utils import (
+    ASSET_MANIFEST_NAME,
+    build_state_dir,
+    CATEGORY_PAGE_SIZE,
+    DATA_PAGE_SIZE,
     DIST_DIR,
     PROJECT_ROOT,
     SITE_DESCRIPTION,
@@ -26,9 +45,13 @@ from scripts.utils import (
     SITE_URL,
     SRC_DIR,
     TEMPLATES_DIR,
+    BuildContext,
     ensure_dir,
     get_categories,
+    hash_content,
     load_database,
+    load_sites_config,
+    save_page_manifest,
     slugify,
     truncate,
 )
@@ -144,6 +167,18 @@ DEFAULT_BOOKS = [
     {"title": "RESTful Web APIs", "author": "Leonard Richardson", "asin": "1449358063"},
 ]
 
+# Static asset directories whose files get content-hashed names. Images keep
+# stable names: social networks and Pinterest reference them by URL.
+FINGERPRINT_DIRS = ("css", "js")
+FINGERPRINT_LENGTH = 8
+
+# Bundles of the assets every page loads: bundle -> source files. Sources are
+# only published inside their bundle, not as separate files.
+ASSET_BUNDLES = {
+    "css/bundle.css": ["css/styles.css"],
+    "js/bundle.js": ["js/main.js"],
+}
+
 # Try HTML minification, but don't fail if not available
 try:
     import htmlmin
@@ -160,10 +195,46 @@ except ImportError:
         return html
 
 
-def create_jinja_env() -> Environment:
-    """Create and configure the Jinja2 template environment."""
+def minify_asset(rel_path: str, content: bytes) -> bytes:
+    """Minify a CSS asset; other files are returned unchanged.
+
+    JavaScript ships as written: a safe minifier needs a real tokenizer
+    (strings, template literals, regex literals), and precompression
+    already removes most of the whitespace and comment overhead.
+    """
+    if rel_path.endswith(".css"):
+        return minify_css(content.decode("utf-8")).encode("utf-8")
+    return content
+
+
+def default_context() -> BuildContext:
+    """Return the single-site context described by this module's settings."""
+    return BuildContext(
+        name="",
+        site_url=SITE_URL,
+        site_name=SITE_NAME,
+        site_description=SITE_DESCRIPTION,
+        dist_dir=DIST_DIR,
+        src_dir=SRC_DIR,
+        templates_dir=TEMPLATES_DIR,
+        category_page_size=CATEGORY_PAGE_SIZE,
+        data_page_size=DATA_PAGE_SIZE,
+    )
+
+
+def create_jinja_env(ctx: BuildContext = None) -> Environment:
+    """Create and configure the Jinja2 template environment.
+
+    The environment can be shared by every site using the same templates
+    directory: site-specific variables are passed at render time and
+    override the globals registered here.
+
+    Args:
+        ctx: Build context. Defaults to default_context().
+    """
+    ctx = ctx or default_context()
     env = Environment(
-        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        loader=FileSystemLoader(str(ctx.templates_dir)),
         autoescape=True,
         trim_blocks=True,
         lstrip_blocks=True,
@@ -174,14 +245,13 @@ def create_jinja_env() -> Environment:
     env.filters["truncate_text"] = truncate
 
     # Register global variables
+    env.globals["asset_url"] = asset_url
     env.globals.update(
         {
-            "site_name": SITE_NAME,
-            "site_url": SITE_URL,
-            "site_description": SITE_DESCRIPTION,
+            **ctx.template_globals(),
+            "labels": get_render_plan(ctx.schema).labels,
             "build_date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
             "current_year": datetime.now(timezone.utc).year,
-            "site_description": SITE_DESCRIPTION,
             "ga_measurement_id": (os.environ.get("GA_MEASUREMENT_ID") or "").strip() or "G-QPDP38ZCCV",
             "adsense_publisher_id": (os.environ.get("ADSENSE_PUBLISHER_ID") or "").strip() or "ca-pub-5193703345853377",
             "amazon_affiliate_tag": AMAZON_TAG,
@@ -191,44 +261,214 @@ def create_jinja_env() -> Environment:
     return env
 
 
-def copy_static_assets():
-    """Copy static assets (CSS, JS, images, ads.txt, robots.txt) to dist/."""
+def fingerprint_name(rel_path: str, content: bytes) -> str:
+    """Insert a content hash before the extension: css/styles.css -> css/styles.3fa9c1d2.css."""
+    stem, dot, ext = rel_path.rpartition(".")
+    if not dot or "/" in ext:
+        stem, ext = rel_path, ""
+    digest = hash_content(content)[:FINGERPRINT_LENGTH]
+    return f"{stem}.{digest}.{ext}" if ext else f"{stem}.{digest}"
+
+
+@pass_context
+def asset_url(context, path: str) -> str:
+    """Jinja global: site-relative URL of a static asset, fingerprinted when built.
+
+    Looks the path up in the `asset_manifest` render variable; assets that
+    were not fingerprinted keep their plain path.
+    """
+    path = path.lstrip("/")
+    return "/" + (context.get("asset_manifest") or {}).get(path, path)
+
+
+def load_critical_css(ctx: BuildContext) -> CriticalCss | None:
+    """Critical CSS extractor for the site's CSS bundle, once assets are copied."""
+    bundle = (ctx.assets or {}).get("css/bundle.css")
+    if not bundle:
+        return None
+    stylesheet = (ctx.dist_dir / bundle).read_text(encoding="utf-8")
+    return CriticalCss(stylesheet, ctx.templates_dir)
+
+
+def render_page(template, page_type: str, ctx: BuildContext, **context) -> str:
+    """Render a page with the critical CSS of its page type inlined.
+
+    The first page of each type (per templates and stylesheet version) is
+    rendered once more without it, as the sample the critical rules are
+    extracted from. Without a critical CSS extractor on the context, the
+    page is rendered as-is and loads the full stylesheet.
+    """
+    critical = ctx.critical_css
+    if critical is None:
+        return template.render(**context)
+    css = critical.get(page_type)
+    if css is None:
+        css = critical.extract(page_type, template.render(**context), (template.name, "base.html"))
+    return template.render(**context, critical_css=css)
+
+
+def copy_static_assets(ctx: BuildContext = None) -> dict:
+    """Copy static assets (CSS, JS, images, ads.txt, robots.txt) to dist/.
+
+    PNG and JPEG images are left to optimize_images().
+
+    Files in FINGERPRINT_DIRS are minified and written under content-hashed
+    names so they can be cached as immutable. Sources of the ASSET_BUNDLES
+    are only written as part of their bundle. The mapping is saved as
+    asset-manifest.json in the build state dir, outside the deployed site.
+
+    Returns:
+        Asset manifest mapping standalone source paths ('js/search.js') and
+        bundle names ('css/bundle.css') to the fingerprinted paths written.
+    """
+    ctx = ctx or default_context()
     asset_dirs = ["css", "js", "images"]
+    bundled = {source for sources in ASSET_BUNDLES.values() for source in sources}
+    manifest = {}
+    minified = {}
 
     for asset_dir in asset_dirs:
-        src = SRC_DIR / asset_dir
-        dst = DIST_DIR / asset_dir
-        if src.exists():
-            if dst.exists():
-                shutil.rmtree(dst)
-            shutil.copytree(src, dst)
+        src = ctx.src_dir / asset_dir
+        dst = ctx.dist_dir / asset_dir
+        if not src.exists():
+            continue
+        if dst.exists():
+            shutil.rmtree(dst)
+        if asset_dir not in FINGERPRINT_DIRS:
+            # PNG/JPEG images are written by optimize_images()
+            shutil.copytree(src, dst, ignore=shutil.ignore_patterns(*(f"*{ext}" for ext in IMAGE_EXTENSIONS)))
+            continue
+        for path in sorted(src.rglob("*")):
+            if not path.is_file():
+                continue
+            rel_path = path.relative_to(ctx.src_dir).as_posix()
+            minified[rel_path] = minify_asset(rel_path, path.read_bytes())
+            if rel_path in bundled:
+                continue
+            manifest[rel_path] = fingerprint_name(rel_path, minified[rel_path])
+            target = ctx.dist_dir / manifest[rel_path]
+            ensure_dir(target.parent)
+            target.write_bytes(minified[rel_path])
+
+    for bundle, sources in ASSET_BUNDLES.items():
+        parts = [minified[source] for source in sources if source in minified]
+        if not parts:
+            continue
+        content = b"\n".join(parts)
+        manifest[bundle] = fingerprint_name(bundle, content)
+        target = ctx.dist_dir / manifest[bundle]
+        ensure_dir(target.parent)
+        target.write_bytes(content)
 
     # Copy root-level files
     for filename in ["ads.txt", "robots.txt"]:
-        src_file = SRC_DIR / filename
+        src_file = ctx.src_dir / filename
         if src_file.exists():
-            shutil.copy2(src_file, DIST_DIR / filename)
+            shutil.copy2(src_file, ctx.dist_dir / filename)
+
+    with open(build_state_dir(ctx.dist_dir) / ASSET_MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def write_page(rel_path: str, html: str, page_type: str, manifest: list = None, ctx: BuildContext = None):
+    """Minify and write a page under dist/, recording it in the page manifest.
+
+    Args:
+        rel_path: Output path relative to dist/ (e.g., 'api/dog-api.html').
+        html: Rendered page HTML.
+        page_type: Page type recorded in the manifest ('api', 'category', 'index', '404').
+        manifest: Optional list collecting {path, type, hash} records.
+        ctx: Build context. Defaults to default_context().
+    """
+    ctx = ctx or default_context()
+    html = minify_html(html)
+    (ctx.dist_dir / rel_path).write_text(html, encoding="utf-8")
+
+    if manifest is not None:
+        manifest.append({"path": rel_path, "type": page_type, "hash": hash_content(html)})
+
+
+def write_data(rel_path: str, payload, manifest: list = None, ctx: BuildContext = None):
+    """Write a static JSON API file under dist/, recording it in the page manifest.
 
+    Data files are listed in the page manifest as type 'data', with their
+    content hash. They are not in the sitemap and are rewritten on every
+    build, like the HTML pages.
 
-def build_item_pages(env: Environment, items: list, categories: dict):
-    """Generate individual item pages.
+    Args:
+        rel_path: Output path relative to dist/ (e.g., 'data/api/dog-api.json').
+        payload: JSON-serializable payload.
+        manifest: Optional list collecting {path, type, hash} records.
+        ctx: Build context. Defaults to default_context().
+    """
+    ctx = ctx or default_context()
+    text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False, sort_keys=True)
+    path = ctx.dist_dir / rel_path
+    ensure_dir(path.parent)
+    path.write_text(text, encoding="utf-8")
+
+    if manifest is not None:
+        manifest.append({"path": rel_path, "type": "data", "hash": hash_content(text)})
+
+
+def item_record(item: dict, ctx: BuildContext) -> dict:
+    """Full static JSON API record of an item: its database fields plus its page URL."""
+    record = {key: value for key, value in item.items() if key != "view"}
+    record["page_url"] = f"{ctx.site_url}/api/{item['slug']}.html"
+    return record
+
+
+def item_summary(item: dict, ctx: BuildContext) -> dict:
+    """Short static JSON API record of an item, as listed in category and all-N files.
+
+    Includes the item's listing badges and facet values, which the category
+    filter uses to render and narrow matches.
+    """
+    view = item.get("view") or get_render_plan(ctx.schema).present(item)
+    return {
+        "slug": item["slug"],
+        "title": item["title"],
+        "description": item.get("description", ""),
+        "category": item.get("category", ""),
+        "url": item.get("url", ""),
+        "page_url": f"{ctx.site_url}/api/{item['slug']}.html",
+        "data_url": f"{ctx.site_url}/data/api/{item['slug']}.json",
+        "badges": view["badges"],
+        "facets": view["facets"],
+    }
+
+
+def build_item_pages(env: Environment, items: list, categories: dict, manifest: list = None, cards: dict = None,
+                     ctx: BuildContext = None, entities: EntityIndex = None):
+    """Generate individual item pages and their data/api/<slug>.json records.
 
     Args:
         env: Jinja2 environment.
         items: All items from the database.
         categories: Items grouped by category.
+        manifest: Optional list collecting page manifest records.
+        cards: Optional slug -> social card URL map from build_social_cards().
+        ctx: Build context. Defaults to default_context().
+        entities: Optional cross-site index for "also listed in" links.
     """
+    ctx = ctx or default_context()
+    plan = get_render_plan(ctx.schema)
+    labels = plan.labels
+    site_url = ctx.site_url
+    cards = cards or {}
+    entities = entities or EntityIndex()
     template = env.get_template("item.html")
-    items_dir = DIST_DIR / "api"
+    items_dir = ctx.dist_dir / "api"
     ensure_dir(items_dir)
 
-    for item in items:
+    for item in plan.present_items(items):
         # Get related items from the same category (up to 6, excluding self)
-        related = [
+        related = plan.present_items([
             i
             for i in categories.get(item["category"], [])
             if i["slug"] != item["slug"]
-        ][:6]
+        ][:6])
 
         # Get book recommendations for this category
         raw_books = BOOK_RECOMMENDATIONS.get(item["category"], DEFAULT_BOOKS)
@@ -241,67 +481,183 @@ def build_item_pages(env: Environment, items: list, categories: dict):
             for b in raw_books
         ]
 
-        html = template.render(
+        html = render_page(
+            template, "api", ctx,
+            **ctx.template_globals(),
+            labels=labels,
             item=item,
             related_items=related,
+            also_listed=entities.also_listed(site_url, item),
             recommended_books=books,
-            page_title=f"{item['title']} - Free API | {SITE_NAME}",
+            page_title=f"{item['title']} - Free {labels['item']} | {ctx.site_name}",
             page_description=truncate(item["description"]),
-            page_url=f"{SITE_URL}/api/{item['slug']}.html",
-            canonical_url=f"{SITE_URL}/api/{item['slug']}.html",
+            page_url=f"{site_url}/api/{item['slug']}.html",
+            canonical_url=f"{site_url}/api/{item['slug']}.html",
+            og_image=f"{site_url}{cards[item['slug']]}" if item["slug"] in cards else None,
         )
 
-        output_path = items_dir / f"{item['slug']}.html"
-        output_path.write_text(minify_html(html), encoding="utf-8")
+        write_page(f"api/{item['slug']}.html", html, "api", manifest, ctx)
+        write_data(f"data/api/{item['slug']}.json", item_record(item, ctx), manifest, ctx)
 
     print(f"  ✓ Generated {len(items)} item pages → dist/api/")
 
 
-def build_category_pages(env: Environment, categories: dict):
-    """Generate category listing pages.
+def category_page_path(cat_slug: str, page: int) -> str:
+    """Relative path of a category listing page; page 1 is category/<slug>.html."""
+    if page == 1:
+        return f"category/{cat_slug}.html"
+    return f"category/{cat_slug}/page-{page}.html"
+
+
+def page_links(current: int, count: int, window: int = 2) -> list:
+    """Page numbers to link from a pagination bar.
+
+    Always includes the first and last page and `window` pages either side
+    of the current one; None marks a gap.
+    """
+    shown = {1, count, *range(current - window, current + window + 1)}
+    links = []
+    for page in sorted(p for p in shown if 1 <= p <= count):
+        if links and page - links[-1] > 1:
+            links.append(None)
+        links.append(page)
+    return links
+
+
+def build_category_pages(env: Environment, categories: dict, manifest: list = None, ctx: BuildContext = None):
+    """Generate paginated category listing pages.
+
+    Each category gets category/<slug>.html with the first
+    ctx.category_page_size items, category/<slug>/page-N.html for the rest,
+    and a data/category/<slug>.json static API file listing every item,
+    which the client-side filter also searches.
 
     Args:
         env: Jinja2 environment.
         categories: Items grouped by category.
+        manifest: Optional list collecting page manifest records.
+        ctx: Build context. Defaults to default_context().
     """
+    ctx = ctx or default_context()
+    plan = get_render_plan(ctx.schema)
+    labels = plan.labels
     template = env.get_template("category.html")
-    cat_dir = DIST_DIR / "category"
+    cat_dir = ctx.dist_dir / "category"
     ensure_dir(cat_dir)
+    page_size = max(1, ctx.category_page_size)
 
     all_categories = [
         {"name": name, "slug": slugify(name), "count": len(items)}
         for name, items in categories.items()
     ]
 
+    pages_written = 0
     for name, items in categories.items():
         cat_slug = slugify(name)
+        items = plan.present_items(items)
+        items_url = f"/data/category/{cat_slug}.json"
+        facets = plan.facet_options(items)
+        write_data(items_url.lstrip("/"), {
+            "name": name,
+            "slug": cat_slug,
+            "count": len(items),
+            "page_url": f"{ctx.site_url}/{category_page_path(cat_slug, 1)}",
+            "items": [item_summary(item, ctx) for item in items],
+        }, manifest, ctx)
+        page_count = max(1, -(-len(items) // page_size))
+        if page_count > 1:
+            ensure_dir(cat_dir / cat_slug)
+
+        for page in range(1, page_count + 1):
+            rel_path = category_page_path(cat_slug, page)
+            page_url = f"{ctx.site_url}/{rel_path}"
+            start = (page - 1) * page_size
+            suffix = f" - Page {page}" if page > 1 else ""
+            pagination = {
+                "page": page,
+                "count": page_count,
+                "first": start + 1,
+                "last": min(start + page_size, len(items)),
+                "prev_url": f"/{category_page_path(cat_slug, page - 1)}" if page > 1 else None,
+                "next_url": f"/{category_page_path(cat_slug, page + 1)}" if page < page_count else None,
+                "links": [
+                    {"number": p, "url": f"/{category_page_path(cat_slug, p)}"} if p else None
+                    for p in page_links(page, page_count)
+                ],
+            }
 
-        html = template.render(
-            category_name=name,
-            category_slug=cat_slug,
-            items=items,
-            item_count=len(items),
-            all_categories=all_categories,
-            page_title=f"{name} APIs - Free & Open | {SITE_NAME}",
-            page_description=f"Browse {len(items)} free {name} APIs. Find the best open APIs for {name.lower()} development.",
-            page_url=f"{SITE_URL}/category/{cat_slug}.html",
-            canonical_url=f"{SITE_URL}/category/{cat_slug}.html",
-        )
+            html = render_page(
+                template, "category", ctx,
+                **ctx.template_globals(),
+                labels=labels,
+                category_name=name,
+                category_slug=cat_slug,
+                items=items[start:start + page_size],
+                item_count=len(items),
+                items_url=items_url,
+                facets=facets,
+                pagination=pagination,
+                all_categories=all_categories,
+                page_title=f"{name} {labels['items']}{suffix} - Free & Open | {ctx.site_name}",
+                page_description=(
+                    f"Browse {len(items)} free {name} {labels['items']}{suffix.lower()}. "
+                    f"Find the best open {labels['items']} for {name.lower()}."
+                ),
+                page_url=page_url,
+                canonical_url=page_url,
+            )
+
+            write_page(rel_path, html, "category", manifest, ctx)
+            pages_written += 1
+
+    print(f"  ✓ Generated {pages_written} category pages ({len(categories)} categories) → dist/category/")
+
+
+def build_data_index(items: list, manifest: list = None, ctx: BuildContext = None):
+    """Generate the paginated data/all-N.json listing of every item.
+
+    Each page holds ctx.data_page_size item summaries plus the URLs of its
+    neighbours, so consumers can walk the whole directory from all-1.json.
+
+    Args:
+        items: All items from the database.
+        manifest: Optional list collecting page manifest records.
+        ctx: Build context. Defaults to default_context().
+    """
+    ctx = ctx or default_context()
+    page_size = max(1, ctx.data_page_size)
+    page_count = max(1, -(-len(items) // page_size))
 
-        output_path = cat_dir / f"{cat_slug}.html"
-        output_path.write_text(minify_html(html), encoding="utf-8")
+    def page_url(page):
+        return f"{ctx.site_url}/data/all-{page}.json" if 1 <= page <= page_count else None
 
-    print(f"  ✓ Generated {len(categories)} category pages → dist/category/")
+    for page in range(1, page_count + 1):
+        start = (page - 1) * page_size
+        write_data(f"data/all-{page}.json", {
+            "page": page,
+            "pages": page_count,
+            "total": len(items),
+            "prev_url": page_url(page - 1),
+            "next_url": page_url(page + 1),
+            "items": [item_summary(item, ctx) for item in items[start:start + page_size]],
+        }, manifest, ctx)
 
+    print(f"  ✓ Generated {page_count} data listing pages → dist/data/")
 
-def build_index_page(env: Environment, items: list, categories: dict):
+
+def build_index_page(env: Environment, items: list, categories: dict, manifest: list = None,
+                     ctx: BuildContext = None):
     """Generate the homepage.
 
     Args:
         env: Jinja2 environment.
         items: All items from the database.
         categories: Items grouped by category.
+        manifest: Optional list collecting page manifest records.
+        ctx: Build context. Defaults to default_context().
     """
+    ctx = ctx or default_context()
+    plan = get_render_plan(ctx.schema)
     template = env.get_template("index.html")
 
     category_cards = [
@@ -310,89 +666,203 @@ def build_index_page(env: Environment, items: list, categories: dict):
     ]
 
     # Pick featured items (first 8 from the database)
-    featured = items[:8]
+    featured = plan.present_items(items[:8])
 
     # Categories context
-    html = template.render(
+    html = render_page(
+        template, "index", ctx,
+        **ctx.template_globals(),
+        labels=plan.labels,
         categories=category_cards,
         featured_items=featured,
         total_apis=len(items),
         total_categories=len(categories),
-        page_title=f"{SITE_NAME} — Discover Free & Open APIs",
-        page_description=SITE_DESCRIPTION,
-        page_url=SITE_URL,
-        canonical_url=SITE_URL,
+        page_title=f"{ctx.site_name} — Discover Free & Open {plan.labels['items']}",
+        page_description=ctx.site_description,
+        page_url=ctx.site_url,
+        canonical_url=ctx.site_url,
     )
 
-    output_path = DIST_DIR / "index.html"
-    output_path.write_text(minify_html(html), encoding="utf-8")
+    write_page("index.html", html, "index", manifest, ctx)
     print("  ✓ Generated homepage → dist/index.html")
 
 
-def build_404_page(env: Environment):
-    """Generate a custom 404 page."""
+def build_404_page(env: Environment, manifest: list = None, ctx: BuildContext = None):
+    """Generate a custom 404 page.
+
+    Args:
+        env: Jinja2 environment.
+        manifest: Optional list collecting page manifest records.
+        ctx: Build context. Defaults to default_context().
+    """
+    ctx = ctx or default_context()
     template = env.get_template("404.html")
 
-    html = template.render(
-        page_title=f"Page Not Found | {SITE_NAME}",
+    html = render_page(
+        template, "404", ctx,
+        **ctx.template_globals(),
+        labels=get_render_plan(ctx.schema).labels,
+        page_title=f"Page Not Found | {ctx.site_name}",
         page_description="The page you're looking for doesn't exist.",
-        page_url=f"{SITE_URL}/404.html",
-        canonical_url=SITE_URL,
+        page_url=f"{ctx.site_url}/404.html",
+        canonical_url=ctx.site_url,
     )
 
-    output_path = DIST_DIR / "404.html"
-    output_path.write_text(minify_html(html), encoding="utf-8")
+    write_page("404.html", html, "404", manifest, ctx)
     print("  ✓ Generated 404 page → dist/404.html")
 
 
-def build_site(database_path: Path = None):
+def build_site(database_path: Path = None, ctx: BuildContext = None, env: Environment = None,
+               entities: EntityIndex = None) -> dict:
     """Main build pipeline.
 
     Args:
-        database_path: Optional path to database.json. Defaults to data/database.json.
+        database_path: Optional path to database.json. Defaults to the context's
+            database, then data/database.json.
+        ctx: Build context. Defaults to default_context().
+        env: Optional shared Jinja2 environment for ctx.templates_dir.
+        entities: Cross-site entity index. Defaults to the one last saved
+            in the build cache (if any).
+
+    Returns:
+        Build report with item/page counts and per-phase timings in seconds,
+        or None if the database was empty.
     """
-    print("🔨 Building static directory site...")
+    ctx = ctx or default_context()
+    dist_dir = ctx.dist_dir
+    timings = {}
+    clock = time.perf_counter()
+
+    def lap(phase):
+        nonlocal clock
+        now = time.perf_counter()
+        timings[phase] = now - clock
+        clock = now
+
+    print(f"🔨 Building static directory site{f' {ctx.name}' if ctx.name else ''}...")
 
     # Load data
-    items = load_database(database_path)
+    items = load_database(database_path or ctx.database)
     if not items:
         print("  ✗ No items in database. Aborting build.")
-        return
+        return None
 
+    # Format every item's fields once; all pages share the resulting views
+    items = get_render_plan(ctx.schema).present_items(items)
     categories = get_categories(items)
+    lap("load")
 
     # Clean and create dist directory
-    if DIST_DIR.exists():
+    if dist_dir.exists():
         # Clear contents inside dist (but don't remove the dir itself,
         # as it may be a Docker bind-mount)
-        for child in DIST_DIR.iterdir():
+        for child in dist_dir.iterdir():
             if child.is_dir():
                 shutil.rmtree(child)
             else:
                 child.unlink()
-    ensure_dir(DIST_DIR)
+    ensure_dir(dist_dir)
+
+    # Copy static assets first; social cards are written into dist/images/
+    ctx = replace(ctx, assets=copy_static_assets(ctx))
+    ctx = replace(ctx, critical_css=load_critical_css(ctx))
+    print(f"  ✓ Copied static assets (CSS, JS, images; {len(ctx.assets)} fingerprinted)")
+    lap("assets")
+    optimize_images(ctx.src_dir, dist_dir)
+    lap("images")
+    cards = build_social_cards(items, dist_dir, site_name=ctx.site_name)
+    lap("cards")
 
     # Set up Jinja2
-    env = create_jinja_env()
-
-    # Build pages
-    build_item_pages(env, items, categories)
-    build_category_pages(env, categories)
-    build_index_page(env, items, categories)
-    build_404_page(env)
-
-    # Copy static assets
-    copy_static_assets()
-    print("  ✓ Copied static assets (CSS, JS, images)")
+    env = env or create_jinja_env(ctx)
+
+    # Build pages, recording each one for the sitemap generator
+    manifest = []
+    build_item_pages(env, items, categories, manifest, cards, ctx, entities or EntityIndex.load())
+    build_category_pages(env, categories, manifest, ctx)
+    build_index_page(env, items, categories, manifest, ctx)
+    build_404_page(env, manifest, ctx)
+    build_data_index(items, manifest, ctx)
+    lap("pages")
+    build_search_index(items, dist_dir)
+    lap("search")
+    save_page_manifest(manifest, dist_dir)
+    data_files = sum(1 for record in manifest if record["type"] == "data")
+    pages = len(manifest) - data_files
+    print(f"  ✓ Wrote page manifest ({pages} pages, {data_files} data files)")
+    lap("manifest")
 
     print(
         f"✅ Build complete: {len(items)} items, {len(categories)} categories, "
-        f"{len(items) + len(categories) + 2} total pages."
+        f"{pages} total pages."
     )
+    return {
+        "site": ctx.name or ctx.site_url,
+        "items": len(items),
+        "categories": len(categories),
+        "pages": pages,
+        "data_files": data_files,
+        "timings": timings,
+        "seconds": sum(timings.values()),
+    }
+
+
+def build_sites(contexts: list, workers: int = None, sitemaps: bool = True) -> list:
+    """Build several directory sites in parallel.
+
+    Sites sharing a templates directory share one Jinja2 environment, so
+    each template is compiled once per run. A cross-site entity index is
+    built first, in one pass over all databases, for "also listed in" links.
+
+    Args:
+        contexts: BuildContext per site.
+        workers: Concurrent site builds. Defaults to one per site.
+        sitemaps: Also generate each site's sitemaps after its build.
+
+    Returns:
+        One build report per site, in input order (None for skipped sites).
+    """
+    entities = build_entity_index(contexts)
+    envs = {}
+    for ctx in contexts:
+        if ctx.templates_dir not in envs:
+            envs[ctx.templates_dir] = create_jinja_env(ctx)
+
+    def build_one(ctx):
+        report = build_site(ctx=ctx, env=envs[ctx.templates_dir], entities=entities)
+        if report and sitemaps:
+            start = time.perf_counter()
+            generate_sitemap(ctx=ctx)
+            report["timings"]["sitemap"] = time.perf_counter() - start
+            report["seconds"] += report["timings"]["sitemap"]
+        return report
+
+    with ThreadPoolExecutor(max_workers=workers or max(1, len(contexts))) as pool:
+        return list(pool.map(build_one, contexts))
+
+
+def print_build_report(reports: list, seconds: float = None) -> None:
+    """Print one timing line per site."""
+    print("📊 Build report:")
+    for report in reports:
+        if report is None:
+            continue
+        phases = ", ".join(f"{phase} {secs:.2f}s" for phase, secs in report["timings"].items())
+        print(f"  {report['site']}: {report['pages']} pages in {report['seconds']:.2f}s ({phases})")
+    if seconds is not None:
+        print(f"  Total wall time: {seconds:.2f}s")
 
 
 def main():
-    build_site()
+    if len(sys.argv) == 3 and sys.argv[1] == "--config":
+        contexts = [BuildContext.from_site(site) for site in load_sites_config(sys.argv[2])]
+        start = time.perf_counter()
+        reports = build_sites(contexts)
+        print_build_report(reports, time.perf_counter() - start)
+        if not all(reports):
+            sys.exit(1)
+    else:
+        build_site()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,31 @@
+"""
+Fold pending catalog journal edits into the database snapshots.
+
+Usage:
+    python -m scripts.compact_database [database.json ...]
+
+Defaults to data/database.json. Databases without a journal are skipped.
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.utils import DATA_DIR, compact_database
+
+
+def main():
+    paths = [Path(p) for p in sys.argv[1:]] or [DATA_DIR / "database.json"]
+    for path in paths:
+        folded = compact_database(path)
+        if folded:
+            print(f"  ✓ Compacted {path}: folded {folded} journal operations")
+        else:
+            print(f"  → {path}: no pending journal edits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Critical CSS extraction and CSS minification.
+
+The full stylesheet blocks rendering until it has downloaded. Instead, each
+page type (item, category, index, 404) gets the subset of rules it actually
+uses inlined in <head>, and the full bundle loads asynchronously.
+
+A rule is kept when every class, id and tag in one of its selectors appears
+in a sample page of that type or in the sources of the templates it renders
+with (which covers classes only some items get). @media/@supports
+blocks are filtered recursively, @font-face is always kept and @keyframes
+are kept when a kept rule refers to them.
+
+Extraction runs once per page type: results are cached in memory and in
+the build cache under a hash of the page type, the template sources and
+the stylesheet, so they are only recomputed when one of those changes.
+"""
+import os
+import re
+import threading
+from pathlib import Path
+
+from scripts.utils import ensure_dir, get_cache_dir, hash_content
+
+# Bump to re-extract everything after changing the matching below
+CRITICAL_VERSION = 1
+
+# At-rules whose body is a list of rules rather than declarations
+GROUP_AT_RULES = ("@media", "@supports", "@layer", "@container")
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+_WORD_RE = re.compile(r"[A-Za-z_][\w-]*")
+_PSEUDO_RE = re.compile(r"::?[\w-]+(\([^)]*\))?")
+_ATTR_RE = re.compile(r"\[[^\]]*\]")
+_CLASS_RE = re.compile(r"[.#]([\w-]+)")
+_TAG_RE = re.compile(r"(?:^|[\s>+~])([a-zA-Z][\w-]*)")
+_HTML_TAG_RE = re.compile(r"<([a-zA-Z][\w-]*)")
+_HTML_ATTR_RE = re.compile(r"""\b(?:class|id)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+
+
+def parse_css(css: str) -> list:
+    """Parse a stylesheet into a list of nodes.
+
+    Returns:
+        Nodes of the form ('rule', selector, declarations),
+        ('group', prelude, [child nodes]), ('at', prelude, body) or
+        ('stmt', text, None) for at-rules without a block.
+    """
+    css = _COMMENT_RE.sub("", css)
+    nodes = []
+    pos = 0
+    while pos < len(css):
+        brace = css.find("{", pos)
+        semi = css.find(";", pos)
+        if css[pos:].lstrip().startswith("@") and semi != -1 and (brace == -1 or semi < brace):
+            nodes.append(("stmt", " ".join(css[pos:semi].split()), None))
+            pos = semi + 1
+            continue
+        if brace == -1:
+            break
+
+        prelude = " ".join(css[pos:brace].split())
+        depth = 1
+        end = brace + 1
+        while end < len(css) and depth:
+            if css[end] == "{":
+                depth += 1
+            elif css[end] == "}":
+                depth -= 1
+            end += 1
+        body = css[brace + 1:end - 1]
+        pos = end
+
+        if prelude.startswith(GROUP_AT_RULES):
+            nodes.append(("group", prelude, parse_css(body)))
+        elif prelude.startswith("@"):
+            nodes.append(("at", prelude, body))
+        elif prelude:
+            nodes.append(("rule", prelude, body))
+    return nodes
+
+
+def _minify_declarations(body: str) -> str:
+    parts = _STRING_RE.split(body)
+    for i in range(0, len(parts), 2):  # Odd parts are quoted strings; leave them alone
+        part = re.sub(r"\s+", " ", parts[i])
+        part = re.sub(r"\s*([;:{}])\s*", r"\1", part)
+        parts[i] = re.sub(r"\s*,\s*", ",", part)
+    return "".join(parts).strip().rstrip(";")
+
+
+def _minify_selector(selector: str) -> str:
+    return re.sub(r"\s*([,>+~])\s*", r"\1", selector)
+
+
+def serialize_css(nodes: list) -> str:
+    """Write nodes back out as minified CSS."""
+    out = []
+    for kind, prelude, body in nodes:
+        if kind == "stmt":
+            out.append(f"{prelude};")
+        elif kind == "group":
+            out.append(f"{prelude}{{{serialize_css(body)}}}")
+        elif kind == "at":
+            inner = serialize_css(parse_css(body)) if "{" in body else _minify_declarations(body)
+            out.append(f"{_minify_selector(prelude)}{{{inner}}}")
+        else:
+            out.append(f"{_minify_selector(prelude)}{{{_minify_declarations(body)}}}")
+    return "".join(out)
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and whitespace from a stylesheet."""
+    return serialize_css(parse_css(css))
+
+
+def html_tokens(html: str) -> set:
+    """Tag names, classes and ids used in an HTML document."""
+    tokens = {tag.lower() for tag in _HTML_TAG_RE.findall(html)}
+    for match in _HTML_ATTR_RE.finditer(html):
+        tokens.update((match.group(1) or match.group(2) or match.group(3) or "").split())
+    return tokens
+
+
+def selector_used(selector: str, used: set) -> bool:
+    """Whether any selector in a comma-separated list can match the used tokens."""
+    for part in selector.split(","):
+        simple = _ATTR_RE.sub("", _PSEUDO_RE.sub("", part)).strip()
+        names = set(_CLASS_RE.findall(simple))
+        names.update(tag.lower() for tag in _TAG_RE.findall(simple))
+        if names <= used:
+            return True
+    return False
+
+
+def _filter(nodes: list, used: set) -> list:
+    kept = []
+    for node in nodes:
+        kind, prelude, body = node
+        if kind == "rule" and selector_used(prelude, used):
+            kept.append(node)
+        elif kind == "group":
+            children = _filter(body, used)
+            if children:
+                kept.append((kind, prelude, children))
+        elif kind == "stmt" or prelude.startswith("@font-face"):
+            kept.append(node)
+    return kept
+
+
+def extract_critical(nodes: list, used: set) -> str:
+    """Minified CSS for the rules that can match the used tokens."""
+    kept = _filter(nodes, used)
+    referenced = set(_WORD_RE.findall(serialize_css(kept)))
+    for kind, prelude, body in nodes:
+        if kind == "at" and prelude.startswith("@keyframes") and prelude.split()[-1] in referenced:
+            kept.append((kind, prelude, body))
+    return serialize_css(kept)
+
+
+class CriticalCss:
+    """Per-page-type critical CSS for one stylesheet and templates directory.
+
+    Args:
+        stylesheet: Full CSS the pages load.
+        templates_dir: Templates directory; its sources are part of the cache key.
+        cache_dir: Where extracted CSS is persisted. Defaults to the build cache.
+    """
+
+    def __init__(self, stylesheet: str, templates_dir: Path, cache_dir: Path = None):
+        self.stylesheet = stylesheet
+        self.cache_dir = Path(cache_dir or get_cache_dir() / "critical")
+        templates_dir = Path(templates_dir)
+        sources = {
+            path.relative_to(templates_dir).as_posix(): path.read_text(encoding="utf-8")
+            for path in sorted(templates_dir.rglob("*.html"))
+        }
+        self.template_words = {name: set(_WORD_RE.findall(text)) for name, text in sources.items()}
+        self.source_hash = hash_content("\0".join([str(CRITICAL_VERSION), *sources.values(), stylesheet]))
+        self._nodes = None
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _path(self, page_type: str) -> Path:
+        key = hash_content(f"{page_type}:{self.source_hash}")
+        return self.cache_dir / f"{key}.css"
+
+    def get(self, page_type: str) -> str | None:
+        """Cached critical CSS for a page type, or None if not extracted yet."""
+        with self._lock:
+            if page_type not in self._memo:
+                path = self._path(page_type)
+                if not path.exists():
+                    return None
+                self._memo[page_type] = path.read_text(encoding="utf-8")
+            return self._memo[page_type]
+
+    def extract(self, page_type: str, html: str, templates: tuple = ()) -> str:
+        """Extract and cache the critical CSS of a page type from a sample page.
+
+        Args:
+            page_type: Page type the result is cached under.
+            html: A rendered page of that type.
+            templates: Names of the templates the page type renders with;
+                every word in them counts as used.
+        """
+        used = html_tokens(html)
+        for name in templates:
+            used |= self.template_words.get(name, set())
+        with self._lock:
+            if self._nodes is None:
+                self._nodes = parse_css(self.stylesheet)
+            css = extract_critical(self._nodes, used)
+            ensure_dir(self.cache_dir)
+            # Other sites of a multi-site build may read this cache file concurrently
+            path = self._path(page_type)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(css)
+            os.replace(tmp_path, path)
+            self._memo[page_type] = css
+            return css
@@ -0,0 +1,175 @@
+"""
+Cross-directory entity index.
+
+The same project can be listed in several directory sites (an API that is
+also an open-source project and a web tool). This index is built in one
+streaming pass over every site's database. It maps normalized identity
+keys to the items that carry them:
+
+- "url:<host>/<path>" for each URL field (lowercased, without scheme,
+  "www.", query or trailing slash);
+- "slug:<slug>".
+
+Only keys shared by two or more sites are kept, so the index stays small.
+It is saved in the build cache. Site builds then look up "also listed in"
+links with a few dict lookups per item, without loading any other site's
+database.
+
+Usage:
+    python -m scripts.entity_index [sites.json]
+"""
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Ensure project root is in sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.utils import (
+    DATA_DIR,
+    BuildContext,
+    get_cache_dir,
+    iter_database,
+    load_json_state,
+    load_sites_config,
+    save_json_state,
+)
+
+ENTITY_INDEX_NAME = "entity-index.json"
+
+# Item fields holding URLs that identify the listed project
+URL_FIELDS = ("url", "github_repo")
+
+
+def normalize_url(url: str) -> str | None:
+    """Reduce a URL to a comparable 'host/path' key, or None if it has no host."""
+    if not url or not isinstance(url, str):
+        return None
+    parsed = urlparse(url.strip() if "//" in url else f"//{url.strip()}")
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if not host:
+        return None
+    path = parsed.path.rstrip("/").lower()
+    return f"{host}{path}"
+
+
+def entity_keys(item: dict) -> set:
+    """Return the identity keys of an item."""
+    keys = set()
+    for field in URL_FIELDS:
+        normalized = normalize_url(item.get(field))
+        if normalized:
+            keys.add(f"url:{normalized}")
+    if item.get("slug"):
+        keys.add(f"slug:{item['slug']}")
+    return keys
+
+
+class EntityIndex:
+    """Identity keys shared across sites, with O(1) lookup per key.
+
+    Args:
+        sites: site_url -> site_name for every indexed site.
+        entries: key -> list of [site_url, slug, title] in two or more sites.
+    """
+
+    def __init__(self, sites: dict = None, entries: dict = None):
+        self.sites = sites or {}
+        self.entries = entries or {}
+
+    @classmethod
+    def build(cls, contexts: list) -> "EntityIndex":
+        """Index every site's database in a single streaming pass.
+
+        Sites whose database is missing are skipped with a warning.
+        """
+        sites = {}
+        entries = {}
+        for ctx in contexts:
+            database = ctx.database or DATA_DIR / "database.json"
+            if not Path(database).exists():
+                print(f"  ⚠ {ctx.name or ctx.site_url}: database not found; not indexed")
+                continue
+            sites[ctx.site_url] = ctx.site_name
+            for item in iter_database(database):
+                entry = [ctx.site_url, item.get("slug"), item.get("title", "")]
+                for key in entity_keys(item):
+                    entries.setdefault(key, []).append(entry)
+
+        shared = {
+            key: found for key, found in entries.items()
+            if len({site for site, _, _ in found}) > 1
+        }
+        return cls(sites, shared)
+
+    @classmethod
+    def load(cls, path: Path = None) -> "EntityIndex":
+        """Load a saved index; an empty index if there is none yet."""
+        data = load_json_state(path or get_cache_dir() / ENTITY_INDEX_NAME, {})
+        return cls(data.get("sites"), data.get("entries"))
+
+    def save(self, path: Path = None) -> Path:
+        path = path or get_cache_dir() / ENTITY_INDEX_NAME
+        save_json_state(path, {"sites": self.sites, "entries": self.entries})
+        return path
+
+    def also_listed(self, site_url: str, item: dict) -> list:
+        """Other sites listing the same entity as item.
+
+        Returns:
+            List of {'site_name', 'url', 'title'} dicts, one per other site
+            entry, ordered by site name.
+        """
+        found = {}
+        for key in entity_keys(item):
+            for site, slug, title in self.entries.get(key, ()):
+                if site != site_url and slug:
+                    found[(site, slug)] = title
+        return sorted(
+            (
+                {"site_name": self.sites.get(site, site), "url": f"{site}/api/{slug}.html", "title": title}
+                for (site, slug), title in found.items()
+            ),
+            key=lambda e: (e["site_name"], e["url"]),
+        )
+
+    def duplicates(self) -> dict:
+        """Shared keys grouped by the set of items carrying them.
+
+        Returns:
+            Dict mapping a sorted tuple of (site_url, slug) pairs to the keys
+            they share. Each value is one cross-site duplicate.
+        """
+        groups = {}
+        for key, found in self.entries.items():
+            members = tuple(sorted({(site, slug) for site, slug, _ in found}))
+            groups.setdefault(members, []).append(key)
+        return groups
+
+
+def build_entity_index(contexts: list, path: Path = None) -> EntityIndex:
+    """Build, save and summarize the cross-site index."""
+    index = EntityIndex.build(contexts)
+    index.save(path)
+    print(
+        f"  ✓ Entity index: {len(index.duplicates())} entities listed on more than one "
+        f"of {len(index.sites)} sites"
+    )
+    return index
+
+
+def main():
+    config = sys.argv[1] if len(sys.argv) > 1 else None
+    contexts = [BuildContext.from_site(site) for site in load_sites_config(config)]
+    index = build_entity_index(contexts)
+    for members, keys in sorted(index.duplicates().items()):
+        listed = ", ".join(f"{index.sites.get(site, site)}:{slug}" for site, slug in members)
+        print(f"  → {listed} ({', '.join(sorted(keys))})")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from pathlib import Path
 
 import requests
 
+from scripts.http_client import get_client
 from scripts.utils import save_database, slugify, DATA_DIR, ensure_dir
 
 # Primary source: public-apis API
@@ -31,7 +32,7 @@ def fetch_from_primary() -> list | None:
         List of raw entry dicts, or None on failure.
     """
     try:
-        response = requests.get(PRIMARY_URL, timeout=REQUEST_TIMEOUT)
+        response = get_client().get(PRIMARY_URL, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         data = response.json()
 
@@ -50,7 +51,7 @@ def fetch_from_alternative() -> list | None:
         List of raw entry dicts, or None on failure.
     """
     try:
-        response = requests.get(ALT_URL, timeout=REQUEST_TIMEOUT)
+        response = get_client().get(ALT_URL, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         data = response.json()
 
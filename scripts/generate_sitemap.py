@@ -1,21 +1,59 @@
 """
 Sitemap Generator for the Programmatic SEO Directory.
 
-Walks the dist/ directory and generates a valid XML sitemap
-containing URLs for every generated page.
+Reads the page manifest written by build_site() and generates a valid
+XML sitemap containing URLs for every generated page. Falls back to
+walking the dist/ directory when no manifest is present.
+
+Pages are split into gzip-compressed child sitemaps per page type
+(sitemap-api-1.xml.gz, ...) that stay within the sitemap protocol limits,
+and listed in sitemap_index.xml.
+
+Each URL's lastmod only moves when the page's content hash changes, and
+changefreq is estimated from how often it has changed, using a page
+history persisted in the build cache between deploys.
 """
+import gzip
 import os
 import sys
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from pathlib import Path
-from xml.etree.ElementTree import Element, SubElement, ElementTree, indent
+from xml.sax.saxutils import escape
 
 # Ensure project root is in sys.path for Cloudflare Pages environment
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from scripts.utils import DIST_DIR, SITE_URL, ensure_dir
+from scripts.utils import (
+    DIST_DIR,
+    SITE_URL,
+    BuildContext,
+    ensure_dir,
+    get_cache_dir,
+    hash_content,
+    iter_page_manifest,
+    load_json_state,
+    page_manifest_path,
+    save_json_state,
+)
+
+# Manifest page types that never belong in the sitemap
+EXCLUDED_PAGE_TYPES = {"404", "data"}
+
+# Sitemap protocol limits per file (https://www.sitemaps.org/protocol.html)
+MAX_URLS_PER_SITEMAP = 50_000
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+SITEMAP_INDEX_NAME = "sitemap_index.xml"
+PAGE_HISTORY_NAME = "page-history.json"
+
+# Document framing, byte-compatible with ElementTree's indented output
+XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8'?>\n"
+URLSET_OPEN = f'<urlset xmlns="{SITEMAP_NS}">\n'
+URLSET_CLOSE = "</urlset>"
+URLSET_EMPTY = f'<urlset xmlns="{SITEMAP_NS}" />'
 
 
 def collect_pages(dist_dir: Path = None) -> list:
@@ -42,6 +80,56 @@ def collect_pages(dist_dir: Path = None) -> list:
     return sorted(pages)
 
 
+def iter_manifest_pages(dist_dir: Path):
+    """Lazily yield sitemap page paths from the build's page manifest.
+
+    Args:
+        dist_dir: Path to the dist directory.
+
+    Yields:
+        Relative paths in build order, excluding EXCLUDED_PAGE_TYPES.
+    """
+    for page, _ in iter_manifest_records(dist_dir):
+        yield page
+
+
+def iter_manifest_records(dist_dir: Path):
+    """Lazily yield (path, content hash) pairs for sitemap pages in the manifest."""
+    for record in iter_page_manifest(dist_dir):
+        if record.get("type") not in EXCLUDED_PAGE_TYPES:
+            yield record["path"], record.get("hash", "")
+
+
+def iter_walked_records(dist_dir: Path, pages: list):
+    """Yield (path, content hash) pairs for walked pages, hashing each file."""
+    for page in pages:
+        yield page, hash_content((dist_dir / page).read_bytes())
+
+
+def get_page_type(page: str) -> str:
+    """Determine which child sitemap a page belongs to.
+
+    Args:
+        page: Relative path to the page.
+
+    Returns:
+        Sitemap group name ('api', 'category' or 'pages').
+    """
+    if page.startswith("api/"):
+        return "api"
+    elif page.startswith("category/"):
+        return "category"
+    else:
+        return "pages"
+
+
+def get_page_url(page: str, site_url: str) -> str:
+    """Build the absolute URL for a page, mapping index.html to the site root."""
+    if page == "index.html":
+        return f"{site_url}/"
+    return f"{site_url}/{page}"
+
+
 def get_priority(page: str) -> str:
     """Determine the sitemap priority based on page type.
 
@@ -53,6 +141,9 @@ def get_priority(page: str) -> str:
     """
     if page == "index.html":
         return "1.0"
+    elif page.startswith("category/") and "/page-" in page:
+        # Later pages of a paginated category listing
+        return "0.5"
     elif page.startswith("category/"):
         return "0.8"
     elif page.startswith("api/"):
@@ -78,55 +169,266 @@ def get_changefreq(page: str) -> str:
         return "monthly"
 
 
-def build_sitemap_xml(pages: list, site_url: str = None) -> str:
-    """Build a sitemap XML string from a list of pages.
+class PageHistory:
+    """Per-URL content-hash history used to derive lastmod and changefreq.
+
+    Records map URL -> {hash, lastmod, first_seen, changes}. A record's
+    lastmod only moves when observe() sees a different content hash.
+    URLs not observed during this build are dropped on save().
+    """
+
+    def __init__(self, records: dict = None, today: date = None):
+        self.records = records if records is not None else {}
+        self.today = today or datetime.now(timezone.utc).date()
+        self.seen = set()
+
+    @classmethod
+    def load(cls, path: Path, today: date = None) -> "PageHistory":
+        """Load a history file, starting empty if it is missing or corrupt."""
+        return cls(load_json_state(path, default={}), today)
+
+    def save(self, path: Path) -> None:
+        """Persist the history of the URLs observed in this build for the next deploy."""
+        self.records = {url: record for url, record in self.records.items() if url in self.seen}
+        save_json_state(path, self.records)
+
+    def observe(self, url: str, content_hash: str) -> None:
+        """Record the current content hash of a URL."""
+        today = self.today.isoformat()
+        record = self.records.get(url)
+        self.seen.add(url)
+
+        if record is None:
+            self.records[url] = {
+                "hash": content_hash,
+                "lastmod": today,
+                "first_seen": today,
+                "changes": 0,
+            }
+        elif record["hash"] != content_hash:
+            record["hash"] = content_hash
+            record["lastmod"] = today
+            record["changes"] += 1
+
+    def lastmod(self, url: str) -> str:
+        """Return the date the URL's content last changed."""
+        record = self.records.get(url)
+        return record["lastmod"] if record else self.today.isoformat()
+
+    def changefreq(self, url: str, page: str) -> str:
+        """Estimate changefreq from the URL's observed change rate.
+
+        Falls back to the page-type rules in get_changefreq() until the
+        page has been observed for more than a week without a change.
+        """
+        record = self.records.get(url)
+        if record is None:
+            return get_changefreq(page)
+
+        days = (self.today - date.fromisoformat(record["first_seen"])).days
+        if record["changes"]:
+            interval = days / record["changes"]
+        elif days > 7:
+            # No change seen yet: the true interval is at least `days`
+            interval = days + 1
+        else:
+            return get_changefreq(page)
+
+        if interval <= 1:
+            return "daily"
+        elif interval <= 7:
+            return "weekly"
+        elif interval <= 31:
+            return "monthly"
+        else:
+            return "yearly"
+
+
+def format_url_entry(page: str, site_url: str, lastmod: str, changefreq: str = None) -> str:
+    """Render a single <url> entry, indented as in the pretty-printed sitemap.
 
     Args:
-        pages: List of relative paths to HTML files.
-        site_url: Base URL. Defaults to SITE_URL.
+        page: Relative path to the page.
+        site_url: Base URL.
+        lastmod: Last modification date (YYYY-MM-DD).
+        changefreq: Change frequency. Defaults to get_changefreq(page).
 
     Returns:
-        Valid XML sitemap string.
+        The escaped <url> element followed by a newline.
     """
-    if site_url is None:
-        site_url = SITE_URL
+    return (
+        "  <url>\n"
+        f"    <loc>{escape(get_page_url(page, site_url))}</loc>\n"
+        f"    <lastmod>{escape(lastmod)}</lastmod>\n"
+        f"    <changefreq>{changefreq or get_changefreq(page)}</changefreq>\n"
+        f"    <priority>{get_priority(page)}</priority>\n"
+        "  </url>\n"
+    )
 
-    urlset = Element("urlset")
-    urlset.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
 
-    lastmod = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+def format_history_entry(page: str, site_url: str, history: PageHistory) -> str:
+    """Render a <url> entry with lastmod and changefreq taken from the page history."""
+    url = get_page_url(page, site_url)
+    return format_url_entry(page, site_url, history.lastmod(url), history.changefreq(url, page))
 
-    for page in pages:
-        url_elem = SubElement(urlset, "url")
 
-        # Build the full URL
-        if page == "index.html":
-            full_url = f"{site_url}/"
+def write_sitemap(fp, pages, site_url: str, lastmod: str = None, history: PageHistory = None) -> int:
+    """Stream a sitemap document to a text file object, one entry at a time.
+
+    Args:
+        fp: Writable text file object.
+        pages: Iterable of relative paths to HTML files.
+        site_url: Base URL.
+        lastmod: Last modification date. Defaults to today (UTC).
+        history: Optional page history supplying per-URL lastmod/changefreq.
+
+    Returns:
+        Number of URLs written.
+    """
+    if lastmod is None:
+        lastmod = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    fp.write(XML_DECLARATION)
+    count = 0
+    for page in pages:
+        if count == 0:
+            fp.write(URLSET_OPEN)
+        if history is not None:
+            fp.write(format_history_entry(page, site_url, history))
         else:
-            full_url = f"{site_url}/{page}"
+            fp.write(format_url_entry(page, site_url, lastmod))
+        count += 1
 
-        loc = SubElement(url_elem, "loc")
-        loc.text = full_url
+    fp.write(URLSET_CLOSE if count else URLSET_EMPTY)
+    return count
 
-        lastmod_elem = SubElement(url_elem, "lastmod")
-        lastmod_elem.text = lastmod
 
-        changefreq = SubElement(url_elem, "changefreq")
-        changefreq.text = get_changefreq(page)
+def build_sitemap_index_xml(sitemaps: list) -> str:
+    """Build a sitemap index XML string listing child sitemaps.
 
-        priority = SubElement(url_elem, "priority")
-        priority.text = get_priority(page)
+    Args:
+        sitemaps: (absolute URL, lastmod) pairs for the child sitemaps,
+            where lastmod is the newest lastmod of the URLs in that child.
 
-    # Pretty-print
-    indent(urlset, space="  ")
+    Returns:
+        Valid XML sitemap index string.
+    """
+    parts = [XML_DECLARATION, f'<sitemapindex xmlns="{SITEMAP_NS}">\n']
+    for url, lastmod in sitemaps:
+        parts.append(
+            "  <sitemap>\n"
+            f"    <loc>{escape(url)}</loc>\n"
+            f"    <lastmod>{lastmod}</lastmod>\n"
+            "  </sitemap>\n"
+        )
+    parts.append("</sitemapindex>")
+    return "".join(parts)
+
+
+class ChildSitemapWriter:
+    """Streams pages into gzip-compressed child sitemaps, one open file per page type.
+
+    A child is closed and the next one started as soon as another entry
+    would push it past MAX_URLS_PER_SITEMAP or MAX_SITEMAP_BYTES
+    (uncompressed), so memory use does not depend on the catalog size.
+    """
 
-    # Convert to string
-    tree = ElementTree(urlset)
-    import io
+    def __init__(self, dist_dir: Path, site_url: str, lastmod: str = None, history: PageHistory = None):
+        self.dist_dir = dist_dir
+        self.site_url = site_url
+        self.lastmod = lastmod or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        self.history = history
+        self.filenames = []
+        self.lastmods = {}
+        self.url_count = 0
+        self._open = {}
+        self._numbers = {}
+
+    def add(self, page: str) -> None:
+        """Append a page to the child sitemap for its type."""
+        page_type = get_page_type(page)
+        if self.history is not None:
+            url = get_page_url(page, self.site_url)
+            lastmod = self.history.lastmod(url)
+            entry = format_url_entry(page, self.site_url, lastmod, self.history.changefreq(url, page))
+        else:
+            lastmod = self.lastmod
+            entry = format_url_entry(page, self.site_url, lastmod)
+        entry = entry.encode("utf-8")
+
+        state = self._open.get(page_type)
+        if state and (
+            state["urls"] >= MAX_URLS_PER_SITEMAP
+            or state["bytes"] + len(entry) + len(URLSET_CLOSE) > MAX_SITEMAP_BYTES
+        ):
+            self._finish(page_type)
+            state = None
+
+        if state is None:
+            state = self._start(page_type)
+
+        state["file"].write(entry)
+        # ISO dates compare correctly as strings
+        if lastmod > self.lastmods[state["filename"]]:
+            self.lastmods[state["filename"]] = lastmod
+        state["urls"] += 1
+        state["bytes"] += len(entry)
+        self.url_count += 1
+
+    def close(self) -> list:
+        """Finish every open child sitemap.
+
+        Returns:
+            List of written child sitemap file names, in index order.
+        """
+        for page_type in list(self._open):
+            self._finish(page_type)
+        return self.filenames
+
+    def _start(self, page_type: str) -> dict:
+        number = self._numbers.get(page_type, 0) + 1
+        self._numbers[page_type] = number
+        filename = f"sitemap-{page_type}-{number}.xml.gz"
+
+        # mtime=0 keeps the output byte-identical across builds
+        gz = gzip.GzipFile(self.dist_dir / filename, mode="wb", mtime=0)
+        header = (XML_DECLARATION + URLSET_OPEN).encode("utf-8")
+        gz.write(header)
+
+        self.filenames.append(filename)
+        self.lastmods[filename] = ""
+        state = {"file": gz, "filename": filename, "urls": 0, "bytes": len(header)}
+        self._open[page_type] = state
+        return state
+
+    def _finish(self, page_type: str) -> None:
+        state = self._open.pop(page_type)
+        state["file"].write(URLSET_CLOSE.encode("utf-8"))
+        state["file"].close()
+
+
+def write_child_sitemaps(pages, dist_dir: Path, site_url: str,
+                         history: PageHistory = None) -> ChildSitemapWriter:
+    """Write gzip-compressed child sitemaps for every page type.
 
-    output = io.BytesIO()
-    tree.write(output, encoding="UTF-8", xml_declaration=True)
-    return output.getvalue().decode("utf-8")
+    Args:
+        pages: Iterable of relative paths to HTML files.
+        dist_dir: Output directory.
+        site_url: Base URL.
+        history: Optional page history supplying per-URL lastmod/changefreq.
+
+    Returns:
+        The closed writer; its filenames list the children in index order.
+    """
+    # Remove children from a previous, possibly larger, run
+    for stale in dist_dir.glob("sitemap-*.xml.gz"):
+        stale.unlink()
+
+    writer = ChildSitemapWriter(dist_dir, site_url, history=history)
+    for page in pages:
+        writer.add(page)
+    writer.close()
+    return writer
 
 
 def build_robots_txt(site_url: str = None) -> str:
@@ -145,34 +447,88 @@ def build_robots_txt(site_url: str = None) -> str:
         f"User-agent: *\n"
         f"Allow: /\n"
         f"\n"
-        f"Sitemap: {site_url}/sitemap.xml\n"
+        f"Sitemap: {site_url}/{SITEMAP_INDEX_NAME}\n"
     )
 
 
-def generate_sitemap(dist_dir: Path = None, site_url: str = None):
-    """Main entry point: collect pages and generate sitemap.xml + robots.txt.
+def generate_sitemap(dist_dir: Path = None, site_url: str = None, history_path: Path = None,
+                     ctx: BuildContext = None):
+    """Main entry point: collect pages and generate sitemaps + robots.txt.
+
+    Writes gzip-compressed child sitemaps and sitemap_index.xml. A plain
+    sitemap.xml is also written while the catalog fits in a single file.
 
     Args:
         dist_dir: Path to dist directory. Defaults to DIST_DIR.
         site_url: Base URL. Defaults to SITE_URL.
+        history_path: Page history file. Defaults to page-history.json in the build cache.
+        ctx: Optional build context supplying the three defaults above for
+            one site of a multi-site build.
     """
     if dist_dir is None:
-        dist_dir = DIST_DIR
+        dist_dir = ctx.dist_dir if ctx else DIST_DIR
     if site_url is None:
-        site_url = SITE_URL
+        site_url = ctx.site_url if ctx else SITE_URL
+    if history_path is None:
+        history_path = (ctx.cache_dir if ctx else get_cache_dir()) / PAGE_HISTORY_NAME
 
     print("🗺️  Generating sitemap...")
 
-    pages = collect_pages(dist_dir)
-    if not pages:
+    if page_manifest_path(dist_dir).exists():
+        def iter_pages():
+            return iter_manifest_pages(dist_dir)
+
+        records = iter_manifest_records(dist_dir)
+    else:
+        print("  → No page manifest found. Walking dist/ instead.")
+        walked = collect_pages(dist_dir)
+
+        def iter_pages():
+            return iter(walked)
+
+        records = iter_walked_records(dist_dir, walked)
+
+    history = PageHistory.load(history_path)
+
+    def observed_pages():
+        for page, content_hash in records:
+            history.observe(get_page_url(page, site_url), content_hash)
+            yield page
+
+    # Stream child sitemaps + sitemap_index.xml
+    writer = write_child_sitemaps(observed_pages(), dist_dir, site_url, history)
+    children = writer.filenames
+    sitemap_path = dist_dir / "sitemap.xml"
+
+    if not writer.url_count:
+        # Don't leave sitemaps of a previous build pointing at removed pages
+        sitemap_path.unlink(missing_ok=True)
+        (dist_dir / SITEMAP_INDEX_NAME).unlink(missing_ok=True)
         print("  ✗ No pages found in dist/. Aborting sitemap generation.")
         return
 
-    # Generate sitemap.xml
-    sitemap_xml = build_sitemap_xml(pages, site_url)
-    sitemap_path = dist_dir / "sitemap.xml"
-    sitemap_path.write_text(sitemap_xml, encoding="utf-8")
-    print(f"  ✓ Generated sitemap.xml with {len(pages)} URLs")
+    index_xml = build_sitemap_index_xml(
+        [(f"{site_url}/{name}", writer.lastmods[name]) for name in children]
+    )
+    (dist_dir / SITEMAP_INDEX_NAME).write_text(index_xml, encoding="utf-8")
+    print(
+        f"  ✓ Generated {SITEMAP_INDEX_NAME} with {len(children)} child sitemaps "
+        f"({writer.url_count} URLs)"
+    )
+
+    # Keep a single sitemap.xml for small catalogs (footer link, legacy
+    # consumers); otherwise remove any left over from a smaller build
+    written = False
+    if writer.url_count <= MAX_URLS_PER_SITEMAP:
+        with open(sitemap_path, "w", encoding="utf-8") as f:
+            write_sitemap(f, iter_pages(), site_url, history=history)
+        written = sitemap_path.stat().st_size <= MAX_SITEMAP_BYTES
+        if written:
+            print(f"  ✓ Generated sitemap.xml with {writer.url_count} URLs")
+    if not written:
+        sitemap_path.unlink(missing_ok=True)
+
+    history.save(history_path)
 
     # Generate robots.txt (only if not already copied from src/)
     robots_path = dist_dir / "robots.txt"
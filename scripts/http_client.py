@@ -0,0 +1,240 @@
+"""
+Shared HTTP client for every outbound integration.
+
+All scripts talk to the outside world (public-apis, IndexNow, Pinterest,
+Mastodon) through one process-wide HttpClient, which provides:
+
+- keep-alive connection pools, so batched calls to one host reuse a single
+  TLS connection instead of handshaking per request;
+- consistent (connect, read) timeouts;
+- retry with jittered exponential backoff on connection errors and
+  429/5xx responses, honoring Retry-After. Non-idempotent methods (POST)
+  are only retried on 429 unless the caller opts in;
+- optional per-host token-bucket rate limits;
+- per-host request metrics.
+
+FixtureTransport serves recorded responses from a list or JSON file so the
+integrations can be exercised offline.
+"""
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from scripts.utils import TokenBucket
+
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+DEFAULT_RETRIES = 3
+RETRY_BACKOFF = 0.5  # seconds; doubled per attempt, with full jitter
+MAX_RETRY_DELAY = 60
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+POOL_CONNECTIONS = 10  # distinct hosts kept alive
+POOL_MAXSIZE = 16  # connections per host (>= worker threads)
+USER_AGENT = "QuickUtils-Directory-Bot/1.0 (+https://quickutils.top)"
+
+
+def backoff_delay(attempt: int, retry_after: str = None, base: float = RETRY_BACKOFF) -> float:
+    """Seconds to wait before retry number attempt + 1.
+
+    Uses "full jitter" (uniform between 0 and the exponential cap) so that
+    concurrent workers don't retry in lockstep. A numeric Retry-After header
+    takes precedence.
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_RETRY_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(base * (2 ** attempt), MAX_RETRY_DELAY))
+
+
+class HttpClient:
+    """Pooled, retrying, rate-limited HTTP client.
+
+    Args:
+        timeout: Default (connect, read) timeout.
+        retries: Default number of retries after the first attempt.
+        backoff: Base backoff in seconds.
+        transport: Optional requests adapter mounted for http and https
+            (e.g., a FixtureTransport). Defaults to a pooled HTTPAdapter.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 backoff: float = RETRY_BACKOFF, transport: BaseAdapter = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = transport or HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.rate_limits = {}
+        self.metrics = defaultdict(lambda: {"requests": 0, "retries": 0, "errors": 0, "seconds": 0.0})
+        self._lock = threading.Lock()
+
+    def set_rate_limit(self, host: str, rate: float, burst: float = 1) -> None:
+        """Limit requests to host to `rate` per second."""
+        self.rate_limits[host] = TokenBucket(rate, burst)
+
+    def _record(self, host: str, seconds: float, retried: bool = False, error: bool = False) -> None:
+        with self._lock:
+            m = self.metrics[host]
+            m["requests"] += 1
+            m["seconds"] += seconds
+            m["retries"] += int(retried)
+            m["errors"] += int(error)
+
+    def request(self, method: str, url: str, retry: bool = None, retries: int = None,
+                timeout=None, **kwargs) -> requests.Response:
+        """Send a request, retrying transient failures.
+
+        Args:
+            method: HTTP method.
+            url: Absolute URL.
+            retry: Retry 5xx and connection errors. Defaults to True for
+                idempotent methods; 429 is always retried.
+            retries: Override the client's retry count.
+            timeout: Override the client's timeout.
+            **kwargs: Passed to requests.Session.request.
+
+        Returns:
+            The final response (which may still be an error status).
+
+        Raises:
+            requests.RequestException: If the last attempt failed to connect.
+        """
+        method = method.upper()
+        host = urlparse(url).netloc
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        if retries is None:
+            retries = self.retries
+        limiter = self.rate_limits.get(host)
+
+        for attempt in range(retries + 1):
+            if limiter:
+                limiter.acquire()
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                final = not retry or attempt == retries
+                self._record(host, time.monotonic() - start, retried=not final, error=True)
+                if final:
+                    raise
+                time.sleep(backoff_delay(attempt, base=self.backoff))
+                continue
+
+            status = response.status_code
+            should_retry = (
+                attempt < retries
+                and status in RETRYABLE_STATUSES
+                and (retry or status == 429)
+            )
+            self._record(host, time.monotonic() - start, retried=should_retry, error=status >= 400)
+            if not should_retry:
+                return response
+            time.sleep(backoff_delay(attempt, response.headers.get("Retry-After"), self.backoff))
+
+        return response  # pragma: no cover - loop always returns or raises
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def metrics_summary(self) -> list:
+        """One line per host: requests, retries, errors and mean latency."""
+        lines = []
+        with self._lock:
+            for host, m in sorted(self.metrics.items()):
+                mean_ms = 1000 * m["seconds"] / m["requests"] if m["requests"] else 0
+                lines.append(
+                    f"{host}: {m['requests']} requests, {m['retries']} retries, "
+                    f"{m['errors']} errors, {mean_ms:.0f} ms avg"
+                )
+        return lines
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def set_client(client: HttpClient = None) -> None:
+    """Replace the process-wide client (None resets to a fresh default)."""
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client:
+            _client.close()
+        _client = client
+
+
+class FixtureTransport(BaseAdapter):
+    """A requests adapter that replays recorded responses instead of the network.
+
+    Fixtures are dicts with 'method', 'url', and optionally 'status',
+    'headers' and 'body' (a JSON value or string). Fixtures for the same
+    method and URL are served in order; the last one keeps being served once
+    the others are used up. Unmatched requests raise ConnectionError.
+
+    Args:
+        fixtures: A list of fixture dicts, or a path to a JSON file holding one.
+    """
+
+    def __init__(self, fixtures):
+        super().__init__()
+        if isinstance(fixtures, (str, Path)):
+            with open(fixtures, "r", encoding="utf-8") as f:
+                fixtures = json.load(f)
+        self._queues = defaultdict(list)
+        for fixture in fixtures:
+            self._queues[(fixture.get("method", "GET").upper(), fixture["url"])].append(fixture)
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requests.append(request)
+            queue = self._queues.get((request.method, request.url))
+            if not queue:
+                raise requests.ConnectionError(f"No fixture for {request.method} {request.url}", request=request)
+            fixture = queue.pop(0) if len(queue) > 1 else queue[0]
+
+        body = fixture.get("body", "")
+        if not isinstance(body, str):
+            body = json.dumps(body)
+
+        response = requests.Response()
+        response.status_code = fixture.get("status", 200)
+        response.headers = CaseInsensitiveDict(fixture.get("headers", {}))
+        response._content = body.encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "Fixture"
+        return response
+
+    def close(self):
+        pass
@@ -1,39 +1,136 @@
 """Automated Search Engine Pinging via IndexNow Protocol.
 This script automatically pushes all dynamically generated URLs directly to Bing, Yahoo, Yandex, and Seznam.
+
+Single site:  python indexnow_submit.py <host> <dist_dir> <key>
+All sites:    python indexnow_submit.py --config sites.json
+
+Only new or changed URLs are submitted: a ledger of URL, content hash and
+last-submitted time is kept in the build cache, and page hashes come from
+the page manifest written by build_site(). Entries of URLs that left a
+site's sitemap are pruned from the ledger. URLs are sent in protocol-sized
+batches, concurrently, with retry and backoff on 429/5xx responses.
 """
+import gzip
 import json
 import logging
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
 import xml.etree.ElementTree as ET
-from urllib.request import Request, urlopen
-from urllib.error import URLError, HTTPError
 from urllib.parse import urlparse
 
+import requests
+
+# Ensure project root is in sys.path when run as `python scripts/indexnow_submit.py`
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.http_client import get_client
+from scripts.utils import (
+    get_cache_dir,
+    iter_page_manifest,
+    load_json_state,
+    load_sites_config,
+    page_manifest_path,
+    save_json_state,
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
-def parse_sitemap(sitemap_path: str) -> list[str]:
-    """Parse the XML sitemap to extract all URLs."""
+INDEXNOW_ENDPOINT = "https://api.indexnow.org/indexnow"
+
+# IndexNow accepts at most 10,000 URLs per POST
+MAX_URLS_PER_REQUEST = 10_000
+MAX_WORKERS = 4
+MAX_RETRIES = 4
+REQUEST_TIMEOUT = (5, 15)
+
+LEDGER_NAME = "indexnow-ledger.json"
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def _open_sitemap(sitemap_path: str):
+    """Open a sitemap file for binary reading, decompressing .gz transparently."""
+    if str(sitemap_path).endswith(".gz"):
+        return gzip.open(sitemap_path, "rb")
+    return open(sitemap_path, "rb")
+
+
+def _local_child_path(parent_path: str, loc: str) -> str:
+    """Resolve a child sitemap <loc> from an index to a file next to the index."""
+    name = os.path.basename(urlparse(loc).path)
+    return os.path.join(os.path.dirname(parent_path), name)
+
+
+def iter_sitemap_urls(sitemap_path: str):
+    """Stream page URLs from a sitemap, sitemap index or .xml.gz file.
+
+    Elements are cleared as soon as they are read, and child sitemaps listed
+    in a <sitemapindex> are read from the same directory as the index, so
+    memory stays flat regardless of the number of URLs.
+
+    Yields:
+        Page URLs in document order.
+    """
+    with _open_sitemap(sitemap_path) as f:
+        context = ET.iterparse(f, events=("start", "end"))
+        _, root = next(context)
+        is_index = root.tag == f"{SITEMAP_NS}sitemapindex"
+
+        for event, elem in context:
+            if event != "end":
+                continue
+            if elem.tag == f"{SITEMAP_NS}loc":
+                loc = (elem.text or "").strip()
+                if loc and is_index:
+                    yield from iter_sitemap_urls(_local_child_path(sitemap_path, loc))
+                elif loc:
+                    yield loc
+            elif elem.tag in (f"{SITEMAP_NS}url", f"{SITEMAP_NS}sitemap"):
+                # Drop finished entries from the root so the tree never grows
+                root.clear()
+
+
+def parse_sitemap(sitemap_path: str):
+    """Stream URLs from the XML sitemap (or sitemap index), logging parse errors.
+
+    Yields:
+        Page URLs in document order; stops at the first parse error.
+    """
     try:
-        tree = ET.parse(sitemap_path)
-        root = tree.getroot()
-        namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-        urls = [elem.text for elem in root.findall('.//ns:loc', namespace) if elem.text]
-        return urls
+        yield from iter_sitemap_urls(sitemap_path)
     except Exception as e:
         logger.error(f"Failed to parse sitemap: {e}")
-        return []
+
+
+def find_sitemap(dist_dir: str) -> str | None:
+    """Return the sitemap index in dist_dir, falling back to sitemap.xml."""
+    for name in ("sitemap_index.xml", "sitemap.xml"):
+        path = os.path.join(dist_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
 
 def submit_to_indexnow(host: str, key: str, url_list: list[str]) -> bool:
-    """Submit URLs to the unified IndexNow API endpoint."""
+    """Submit one batch of URLs to the unified IndexNow API endpoint.
+
+    The shared HTTP client retries 429/5xx responses and network errors with
+    jittered backoff; IndexNow submissions are idempotent, so POST retries
+    are safe here.
+    """
     if not url_list:
         logger.warning("No URLs found to submit.")
         return False
 
-    api_endpoint = "https://api.indexnow.org/indexnow"
-    
     payload = {
         "host": host,
         "key": key,
@@ -41,53 +138,228 @@ def submit_to_indexnow(host: str, key: str, url_list: list[str]) -> bool:
         "urlList": url_list
     }
 
-    data = json.dumps(payload).encode("utf-8")
-    req = Request(api_endpoint, data=data, headers={"Content-Type": "application/json; charset=utf-8"})
-
     try:
-        with urlopen(req, timeout=15) as response:
-            if response.status in (200, 202):
-                logger.info(f"✅ Successfully submitted {len(url_list)} URLs to IndexNow for {host}!")
-                return True
-            else:
-                logger.error(f"Failed to submit: HTTP {response.status}")
-                return False
-    except HTTPError as e:
-        logger.error(f"HTTPError submitting to IndexNow: {e.code} - {e.reason}")
-        return False
-    except URLError as e:
-        logger.error(f"URLError submitting to IndexNow: {e.reason}")
+        response = get_client().post(
+            INDEXNOW_ENDPOINT,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json; charset=utf-8"},
+            timeout=REQUEST_TIMEOUT,
+            retry=True,
+            retries=MAX_RETRIES,
+        )
+    except requests.RequestException as e:
+        logger.error(f"Network error submitting to IndexNow: {e}")
         return False
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return False
 
-def main():
-    if len(sys.argv) != 4:
-        logger.error("Usage: python indexnow_submit.py <host> <dist_dir> <key>")
-        sys.exit(1)
+    if response.status_code in (200, 202):
+        logger.info(f"✅ Successfully submitted {len(url_list)} URLs to IndexNow for {host}!")
+        return True
+    logger.error(f"Failed to submit: HTTP {response.status_code}")
+    return False
+
+
+def chunk_urls(urls: list[str], size: int = None) -> list[list[str]]:
+    """Split URLs into protocol-sized batches."""
+    size = size or MAX_URLS_PER_REQUEST
+    return [urls[i : i + size] for i in range(0, len(urls), size)]
+
+
+def submit_batches(host: str, key: str, urls: list[str], workers: int = MAX_WORKERS) -> list[str]:
+    """Submit URLs in concurrent batches.
+
+    Returns:
+        The URLs whose batch was accepted.
+    """
+    batches = chunk_urls(urls)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as pool:
+        results = list(pool.map(lambda batch: submit_to_indexnow(host, key, batch), batches))
+
+    return [url for batch, ok in zip(batches, results) if ok for url in batch]
+
+
+def url_to_page(url: str) -> str:
+    """Map a site URL to its dist-relative page path ('/' -> 'index.html')."""
+    return urlparse(url).path.lstrip("/") or "index.html"
+
 
-    host_url = sys.argv[1]
-    dist_dir = sys.argv[2]
-    key = sys.argv[3]
-    
-    # Strip protocols to get pure hostname (e.g., tools.quickutils.top)
+def load_page_hashes(dist_dir: str) -> dict:
+    """Read page path -> content hash from the build's page manifest, if any."""
+    dist_path = Path(dist_dir)
+    if not page_manifest_path(dist_path).is_file():
+        return {}
+    return {record["path"]: record.get("hash", "") for record in iter_page_manifest(dist_path)}
+
+
+def load_ledger(path: Path) -> dict:
+    """Load the submission ledger: URL -> {hash, submitted}."""
+    return load_json_state(path, default={})
+
+
+def select_changed_urls(urls, hashes: dict, ledger: dict, lock: threading.Lock = None) -> list[str]:
+    """Return URLs that were never submitted or whose content hash changed.
+
+    urls may be any iterable, such as parse_sitemap(), and is consumed once.
+    If lock is given it is held only around each ledger read.
+    """
+    changed = []
+    for url in urls:
+        with lock or nullcontext():
+            entry = ledger.get(url)
+        current = hashes.get(url_to_page(url), "")
+        if entry is None or (current and entry.get("hash") != current):
+            changed.append(url)
+    return changed
+
+
+def record_submissions(ledger: dict, urls: list[str], hashes: dict) -> None:
+    """Mark URLs as submitted with their current content hash."""
+    submitted = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    for url in urls:
+        ledger[url] = {"hash": hashes.get(url_to_page(url), ""), "submitted": submitted}
+
+
+def prune_ledger(ledger: dict, host: str, current_urls: set) -> int:
+    """Drop ledger entries of host whose URL is no longer in its sitemap.
+
+    Entries of other hosts are kept, since the ledger is shared by all sites.
+
+    Returns:
+        Number of entries removed.
+    """
+    stale = [url for url in ledger if urlparse(url).netloc == host and url not in current_urls]
+    for url in stale:
+        del ledger[url]
+    return len(stale)
+
+
+def normalize_host(host_url: str) -> str:
+    """Strip protocols to get the pure hostname (e.g., tools.quickutils.top)."""
     parsed_url = urlparse(host_url)
-    host = parsed_url.netloc if parsed_url.netloc else host_url.replace("https://", "").replace("http://", "").strip("/")
+    return parsed_url.netloc if parsed_url.netloc else host_url.replace("https://", "").replace("http://", "").strip("/")
+
+
+def submit_site(host: str, dist_dir: str, key: str, ledger: dict, ledger_lock: threading.Lock) -> dict:
+    """Stream one site's sitemap and submit its new or changed URLs.
+
+    Ledger entries of URLs that left the sitemap are pruned.
+
+    Returns:
+        Summary dict with host, urls, changed, submitted and ok keys.
+    """
+    summary = {"host": host, "urls": 0, "changed": 0, "submitted": 0, "ok": False}
+
+    sitemap_path = find_sitemap(dist_dir)
+    if sitemap_path is None:
+        logger.error(f"Sitemap not found in {dist_dir}. Please run generate_sitemap.py first.")
+        return summary
+
+    current_urls = set()
 
-    sitemap_path = os.path.join(dist_dir, "sitemap.xml")
-    
-    if not os.path.exists(sitemap_path):
-        logger.error(f"Sitemap not found at {sitemap_path}. Please run generate_sitemap.py first.")
+    def counted_urls():
+        for url in parse_sitemap(sitemap_path):
+            summary["urls"] += 1
+            current_urls.add(url)
+            yield url
+
+    hashes = load_page_hashes(dist_dir)
+    changed = select_changed_urls(counted_urls(), hashes, ledger, ledger_lock)
+    with ledger_lock:
+        pruned = prune_ledger(ledger, normalize_host(host), current_urls)
+    if pruned:
+        logger.info(f"Dropped {pruned} URLs no longer in the sitemap of {host} from the ledger.")
+    if not summary["urls"]:
+        return summary
+    summary["changed"] = len(changed)
+
+    if not changed:
+        logger.info(f"No new or changed URLs for {host} since the last submission.")
+        summary["ok"] = True
+        return summary
+
+    logger.info(f"Submitting {len(changed)} of {summary['urls']} URLs (new or changed) for {host}...")
+    submitted = submit_batches(host, key, changed)
+    with ledger_lock:
+        record_submissions(ledger, submitted, hashes)
+
+    summary["submitted"] = len(submitted)
+    summary["ok"] = len(submitted) == len(changed)
+    if not summary["ok"]:
+        logger.error(f"{len(changed) - len(submitted)} URLs failed to submit for {host}; they will be retried next run.")
+    return summary
+
+
+def submit_sites(sites: list, ledger: dict, workers: int = None) -> list:
+    """Submit several sites concurrently over the shared connection pool.
+
+    Args:
+        sites: List of dicts with 'host', 'dist_dir' and 'key'.
+        ledger: Submission ledger shared by all sites.
+        workers: Concurrent sites. Defaults to one worker per site.
+
+    Returns:
+        One summary dict per site, in input order.
+    """
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=workers or max(1, len(sites))) as pool:
+        futures = [
+            pool.submit(submit_site, site["host"], site["dist_dir"], site["key"], ledger, lock)
+            for site in sites
+        ]
+        return [f.result() for f in futures]
+
+
+def log_summary(summaries: list) -> None:
+    """Log one line per host with its submission results."""
+    logger.info("IndexNow summary:")
+    for s in summaries:
+        status = "OK" if s["ok"] else "FAILED"
+        logger.info(
+            f"  {s['host']}: {status} - {s['urls']} URLs, {s['changed']} new/changed, {s['submitted']} submitted"
+        )
+
+
+def sites_from_config(path: str) -> list:
+    """Read IndexNow targets from the multi-site config."""
+    targets = []
+    for site in load_sites_config(path):
+        if not site.get("indexnow_key"):
+            logger.warning(f"Skipping {site['name']}: no indexnow_key configured.")
+            continue
+        targets.append(
+            {"host": normalize_host(site["site_url"]), "dist_dir": site["dist_dir"], "key": site["indexnow_key"]}
+        )
+    return targets
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--config":
+        sites = sites_from_config(sys.argv[2])
+    elif len(sys.argv) == 4:
+        sites = [{"host": normalize_host(sys.argv[1]), "dist_dir": sys.argv[2], "key": sys.argv[3]}]
+    else:
+        logger.error("Usage: python indexnow_submit.py <host> <dist_dir> <key>")
+        logger.error("       python indexnow_submit.py --config sites.json")
         sys.exit(1)
 
-    urls = parse_sitemap(sitemap_path)
-    if not urls:
+    if not sites:
+        logger.error("No sites to submit.")
         sys.exit(1)
 
-    success = submit_to_indexnow(host, key, urls)
-    
-    if not success:
+    ledger_path = get_cache_dir() / LEDGER_NAME
+    ledger = load_ledger(ledger_path)
+
+    summaries = submit_sites(sites, ledger)
+    save_json_state(ledger_path, ledger)
+
+    if len(summaries) > 1:
+        log_summary(summaries)
+    for line in get_client().metrics_summary():
+        logger.info(f"HTTP {line}")
+
+    if not all(s["ok"] for s in summaries):
         sys.exit(1)
 
 if __name__ == "__main__":
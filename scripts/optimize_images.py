@@ -0,0 +1,125 @@
+"""
+Image optimization for dist/images/.
+
+Every PNG/JPEG in src/images/ and src/static/images/ is recompressed into
+dist/images/ under its own name; the smaller of the re-encoded and the
+source bytes is kept. Templates only reference images by URL (og:image,
+Pinterest covers), so no resized variants are produced.
+
+Optimized images are content-addressed in the build cache by a hash of the
+source bytes, so a rebuild only encodes images that changed; the rest are
+copied from the cache. New images are encoded across a process pool.
+
+Pillow is optional: without it images are copied unchanged.
+"""
+import io
+import os
+import shutil
+from pathlib import Path
+
+from scripts.utils import ensure_dir, get_cache_dir, hash_content, process_pool
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_SOURCE_DIRS = ("images", "static/images")
+IMAGE_EXTENSIONS = {".png": "png", ".jpg": "jpeg", ".jpeg": "jpeg"}
+# Bump to re-encode every image after changing the settings below
+IMAGE_VERSION = 2
+JPEG_QUALITY = 85
+
+
+def _encode(img, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "jpeg":
+        img.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        img.save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+def _encode_to_cache(job: tuple) -> str:
+    """Process-pool worker: optimize one source image into the cache."""
+    source, path, source_format = job
+    source_bytes = Path(source).read_bytes()
+
+    with Image.open(io.BytesIO(source_bytes)) as img:
+        img.load()
+        if source_format == "png" and img.mode not in ("RGB", "RGBA", "L", "LA"):
+            img = img.convert("RGBA")
+        encoded = _encode(img, source_format)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encoded if len(encoded) < len(source_bytes) else source_bytes)
+    os.replace(tmp_path, path)
+    return path
+
+
+def iter_source_images(src_dir: Path):
+    """Yield (source path, dist-relative path) for every image to process."""
+    for source_dir in IMAGE_SOURCE_DIRS:
+        root = Path(src_dir) / source_dir
+        if not root.exists():
+            continue
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+                yield path, f"images/{path.relative_to(root).as_posix()}"
+
+
+def optimize_images(src_dir: Path, dist_dir: Path, workers: int = None) -> int:
+    """Optimize every source image (or reuse its cached result) into dist/.
+
+    Args:
+        src_dir: Site source directory (containing images/ and static/images/).
+        dist_dir: Output directory.
+        workers: Process pool size. Defaults to the CPU count; 1 encodes inline.
+
+    Returns:
+        Number of images written to dist/.
+
+    Raises:
+        ValueError: If two source images map to the same dist/ path.
+    """
+    dist_dir = Path(dist_dir)
+    sources = list(iter_source_images(src_dir))
+    seen = {}
+    for source, rel_path in sources:
+        if rel_path in seen:
+            raise ValueError(f"{source} and {seen[rel_path]} would both be written to {rel_path}")
+        seen[rel_path] = source
+    if Image is None:
+        for source, rel_path in sources:
+            ensure_dir((dist_dir / rel_path).parent)
+            shutil.copyfile(source, dist_dir / rel_path)
+        print("  ⚠ Pillow not installed; images copied without optimization")
+        return len(sources)
+
+    cache_dir = get_cache_dir() / "images"
+    ensure_dir(cache_dir)
+    cached_paths = {}
+    jobs = {}
+    for source, rel_path in sources:
+        source_format = IMAGE_EXTENSIONS[source.suffix.lower()]
+        digest = hash_content(source.read_bytes() + f"\0{IMAGE_VERSION}\0{source_format}".encode())
+        path = cache_dir / digest
+        cached_paths[rel_path] = path
+        if not path.exists() and digest not in jobs:
+            jobs[digest] = (str(source), str(path), source_format)
+
+    if jobs:
+        if workers == 1 or len(jobs) == 1:
+            for job in jobs.values():
+                _encode_to_cache(job)
+        else:
+            with process_pool(workers) as pool:
+                list(pool.map(_encode_to_cache, jobs.values()))
+
+    for rel_path, path in cached_paths.items():
+        ensure_dir((dist_dir / rel_path).parent)
+        shutil.copyfile(path, dist_dir / rel_path)
+
+    print(f"  ✓ Images: {len(jobs)} optimized, {len(sources) - len(jobs)} from cache → dist/images/")
+    return len(sources)
@@ -1,9 +1,36 @@
-import json
+"""Cross-site Pinterest pinning for the daily facts and every directory site.
+
+Sources are the daily facts database plus each site with a `database` in
+sites.json (falling back to the legacy BORING_ROOT project layout). Each
+item is routed to a board via the site's optional category -> board map:
+
+    "pinterest": {"default_board": "Free Tools", "boards": {"SEO": "SEO Tools"}}
+
+Every board is pinned by its own worker thread; all workers share one
+token-bucket limiter, so a run takes as long as the rate limit requires
+rather than the sum of per-pin sleeps. Progress is kept per source in the
+build cache, so an interrupted run resumes with the items it had not yet
+pinned.
+"""
+import hashlib
 import os
-import requests
-import time
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import requests
+
+# Ensure project root is in sys.path when run as `python scripts/pinterest_automation.py`
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.board_cache import BOARDS_PAGE_SIZE, BoardCache, BoardListingError, find_board, iter_boards
+from scripts.http_client import get_client
+from scripts.post_pinterest import PIN_BURST, PIN_RATE_PER_SECOND, PinQueue
+from scripts.utils import SITES_CONFIG_PATH, TokenBucket, get_cache_dir, load_database, load_sites_config
+
 # Pinterest Credentials (set these in your environment)
 PINTEREST_APP_ID = os.environ.get("PINTEREST_APP_ID") or "1550101"
 PINTEREST_ACCESS_TOKEN = os.environ.get("PINTEREST_ACCESS_TOKEN")
@@ -14,8 +41,13 @@ if not PINTEREST_ACCESS_TOKEN:
     print("Please set it before running this script.")
 
 # Project Roots
-BORING_ROOT = Path("H:/boring")
-BORINGWEBSITE_ROOT = Path("H:/boringwebsite")
+BORING_ROOT = Path(os.environ.get("BORING_ROOT") or "H:/boring")
+BORINGWEBSITE_ROOT = Path(os.environ.get("BORINGWEBSITE_ROOT") or "H:/boringwebsite")
+
+# Used when there is no sites.json
+LEGACY_DIRECTORIES = ["tools-directory", "opensource-directory", "datasets-directory"]
+AUTOMATION_STATE_NAME = "pinterest-automation.json"
+
 
 def get_headers():
     if not PINTEREST_ACCESS_TOKEN:
@@ -25,18 +57,45 @@ def get_headers():
         "Content-Type": "application/json"
     }
 
-def get_boards():
-    """Fetch all boards for the authenticated user."""
+
+def fetch_boards_page(bookmark=None):
+    """Fetch one page of boards for the authenticated user."""
     url = f"{API_BASE_URL}/boards"
-    response = requests.get(url, headers=get_headers())
+    params = {"page_size": BOARDS_PAGE_SIZE}
+    if bookmark:
+        params["bookmark"] = bookmark
+    response = get_client().get(url, headers=get_headers(), params=params)
     if response.status_code == 200:
-        return response.json().get("items", [])
+        return response.json()
     else:
         print(f"Error fetching boards: {response.text}")
+        return None
+
+
+def get_boards():
+    """Fetch all boards for the authenticated user, across every page."""
+    try:
+        return list(iter_boards(fetch_boards_page))
+    except BoardListingError as e:
+        print(f"Could not list boards: {e}")
         return []
 
+
+def get_board_id(board_name):
+    """Resolve a board ID by name through the shared board cache."""
+    try:
+        return find_board(board_name, fetch_boards_page, BoardCache())
+    except BoardListingError as e:
+        print(f"Could not list boards: {e}")
+        return None
+
+
 def create_pin(board_id, title, description, link, image_url):
-    """Create a new pin on a specific board."""
+    """Create a new pin on a specific board.
+
+    Returns:
+        The created pin, or None if the API rejected it or was unreachable.
+    """
     url = f"{API_BASE_URL}/pins"
     payload = {
         "title": title[:100],
@@ -48,7 +107,11 @@ def create_pin(board_id, title, description, link, image_url):
             "url": image_url
         }
     }
-    response = requests.post(url, headers=get_headers(), json=payload)
+    try:
+        response = get_client().post(url, headers=get_headers(), json=payload)
+    except requests.RequestException as e:
+        print(f"Network error creating pin '{title}': {e}")
+        return None
     if response.status_code == 201:
         print(f"Successfully created pin: {title}")
         return response.json()
@@ -56,55 +119,149 @@ def create_pin(board_id, title, description, link, image_url):
         print(f"Error creating pin '{title}': {response.text}")
         return None
 
+
 def load_daily_facts():
-    database_path = BORING_ROOT / "projects/dailyfacts/data/database.json"
-    if database_path.exists():
-        with open(database_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return load_items(BORING_ROOT / "projects/dailyfacts/data/database.json")
+
 
 def load_directory_items(project_name):
-    database_path = BORING_ROOT / f"projects/{project_name}/data/database.json"
+    return load_items(BORING_ROOT / f"projects/{project_name}/data/database.json")
+
+
+def load_items(database_path):
+    """Load a site's database with its pending journal edits, or [] if it is missing."""
+    database_path = Path(database_path)
     if database_path.exists():
-        with open(database_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_database(database_path)
     return []
 
-def automate_pinning(limit_per_category=5):
-    boards = get_boards()
-    if not boards:
-        print("No boards found. Please create a board on Pinterest first.")
-        return
-
-    # Map categories to boards or use a default one
-    default_board = boards[0]["id"]
-    print(f"Using default board: {boards[0]['name']} ({default_board})")
-
-    # 1. Pin Daily Facts
-    print("\n--- Pinning Daily Facts ---")
-    facts = load_daily_facts()
-    for fact in facts[:limit_per_category]:
-        title = f"Mind-Blowing Fact: {fact['category']}"
-        description = f"{fact['text']} \n\nFound on DailyFacts."
-        link = "https://facts.quickutils.top"
+
+def item_key(item):
+    """Stable identity for progress tracking (facts have no slug)."""
+    if item.get("slug"):
+        return item["slug"]
+    if item.get("id") is not None:
+        return str(item["id"])
+    return hashlib.sha256(item.get("text", "").encode("utf-8")).hexdigest()[:16]
+
+
+def load_pin_sources(config_path=None):
+    """Return the sources to pin: daily facts plus each directory site."""
+    sources = [{"name": "dailyfacts", "kind": "facts", "load": load_daily_facts, "pinterest": {}}]
+
+    config_path = Path(config_path) if config_path else SITES_CONFIG_PATH
+    if config_path.exists():
+        for site in load_sites_config(config_path):
+            if not site.get("database"):
+                continue
+            sources.append({
+                "name": site["name"],
+                "kind": "directory",
+                "site_url": site["site_url"],
+                "load": lambda path=site["database"]: load_items(path),
+                "pinterest": site.get("pinterest", {}),
+            })
+    else:
+        for directory in LEGACY_DIRECTORIES:
+            sources.append({
+                "name": directory,
+                "kind": "directory",
+                "site_url": f"https://{directory.split('-')[0]}.quickutils.top",
+                "load": lambda directory=directory: load_directory_items(directory),
+                "pinterest": {},
+            })
+    return sources
+
+
+def build_pin(source, item):
+    """Return (title, description, link, image_url) for an item from a source."""
+    if source["kind"] == "facts":
         # Placeholder image for now - in production, this should be a high-res infographic URL
-        image_url = "https://facts.quickutils.top/images/og-image.png"
-        create_pin(default_board, title, description, link, image_url)
-        time.sleep(1) # Rate limiting
-
-    # 2. Pin Tools from Directories
-    directories = ["tools-directory", "opensource-directory", "datasets-directory"]
-    for directory in directories:
-        print(f"\n--- Pinning from {directory} ---")
-        items = load_directory_items(directory)
-        for item in items[:limit_per_category]:
-            title = f"Useful Tool: {item['title']}"
-            description = f"{item['description']} \n\nCheck it out on QuickUtils."
-            link = f"https://{directory.split('-')[0]}.quickutils.top/api/{item['slug']}.html"
-            image_url = "https://quickutils.top/images/og-image.png"
-            create_pin(default_board, title, description, link, image_url)
-            time.sleep(1)
+        return (
+            f"Mind-Blowing Fact: {item['category']}",
+            f"{item['text']} \n\nFound on DailyFacts.",
+            "https://facts.quickutils.top",
+            "https://facts.quickutils.top/images/og-image.png",
+        )
+    return (
+        f"Useful Tool: {item['title']}",
+        f"{item['description']} \n\nCheck it out on QuickUtils.",
+        f"{source['site_url']}/api/{item['slug']}.html",
+        "https://quickutils.top/images/og-image.png",
+    )
+
+
+def board_name_for(source, item):
+    """The board configured for an item's category, or None for the default."""
+    config = source.get("pinterest", {})
+    return config.get("boards", {}).get(item.get("category")) or config.get("default_board")
+
+
+def pin_board(board_id, jobs, limiter):
+    """Worker: pin one board's jobs in order, paced by the shared limiter."""
+    pinned = 0
+    for queue, key, pin in jobs:
+        limiter.acquire()
+        if create_pin(board_id, *pin):
+            queue.mark_pinned(key)
+            pinned += 1
+    return pinned
+
+
+def automate_pinning(limit_per_category=5, board_name=None, config_path=None, limiter=None):
+    """Pin up to limit_per_category new items from every source.
+
+    Returns:
+        Number of pins created.
+    """
+    if board_name:
+        default_board = get_board_id(board_name)
+        if not default_board:
+            print(f"Board '{board_name}' not found. Please create it on Pinterest first.")
+            return 0
+        print(f"Using board: {board_name} ({default_board})")
+    else:
+        boards = get_boards()
+        if not boards:
+            print("No boards found. Please create a board on Pinterest first.")
+            return 0
+
+        # Categories without a mapped board go to the first one
+        default_board = boards[0]["id"]
+        print(f"Using default board: {boards[0]['name']} ({default_board})")
+
+    state_path = get_cache_dir() / AUTOMATION_STATE_NAME
+    board_ids = {}
+    jobs = defaultdict(list)
+    for source in load_pin_sources(config_path):
+        items = [dict(item, slug=item_key(item)) for item in source["load"]()]
+        queue = PinQueue(state_path, source["name"])
+        batch = queue.next_batch(items, limit_per_category)
+        queue.save()
+        print(f"--- {source['name']}: {len(batch)} items queued ---")
+
+        for item in batch:
+            name = board_name_for(source, item)
+            if name and name not in board_ids:
+                board_ids[name] = get_board_id(name)
+                if not board_ids[name]:
+                    print(f"Board '{name}' not found; using the default board.")
+            board_id = board_ids.get(name) or default_board
+            jobs[board_id].append((queue, item["slug"], build_pin(source, item)))
+
+    if not jobs:
+        return 0
+
+    limiter = limiter or TokenBucket(PIN_RATE_PER_SECOND, PIN_BURST)
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {board_id: pool.submit(pin_board, board_id, board_jobs, limiter) for board_id, board_jobs in jobs.items()}
+        results = {board_id: f.result() for board_id, f in futures.items()}
+
+    for board_id, pinned in results.items():
+        print(f"Board {board_id}: {pinned}/{len(jobs[board_id])} pinned")
+    return sum(results.values())
+
 
 if __name__ == "__main__":
     # To run: python scripts/pinterest_automation.py
-    automate_pinning(limit_per_category=2) # Small limit for testing
+    automate_pinning(limit_per_category=2, board_name=os.environ.get("PINTEREST_BOARD_NAME")) # Small limit for testing
@@ -1,15 +1,30 @@
 """Pinterest Visual Search API Submitter.
 This script automatically parses the directory JSON and uploads beautiful SVG-to-PNG hero images
 to specific Pinterest Boards via the v5 REST API.
+
+Each run pins the next few items from a persistent per-board queue kept in
+the build cache, so consecutive deploys walk through the whole catalog
+before repeating. Pin creation is paced by a token bucket and items that
+fail to pin stay at the head of the queue for the next run.
 """
 import json
 import logging
 import os
 import sys
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+
+# Ensure project root is in sys.path when run as `python scripts/post_pinterest.py`
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.board_cache import BOARDS_PAGE_SIZE, BoardCache, BoardListingError, find_board
+from scripts.http_client import get_client
+from scripts.social_cards import CARDS_DIR, card_url
+from scripts.utils import TokenBucket, get_cache_dir, load_database, load_json_state, save_json_state
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
@@ -17,10 +32,75 @@ logger = logging.getLogger(__name__)
 PINTEREST_ACCESS_TOKEN = os.environ.get("PINTEREST_ACCESS_TOKEN", "")
 PINTEREST_API_BASE = "https://api.pinterest.com/v5"
 
-def make_pinterest_request(method: str, endpoint: str, payload: dict = None) -> dict:
+PIN_QUEUE_NAME = "pinterest-queue.json"
+PINS_PER_RUN = int(os.environ.get("PINTEREST_PINS_PER_RUN") or 3)
+PIN_WORKERS = 2
+# Pinterest meters write calls per user per minute; one pin a second with a
+# small burst keeps us far below the published v5 write limit.
+PIN_RATE_PER_SECOND = 1.0
+PIN_BURST = 3
+
+
+class PinQueue:
+    """Persistent round-robin queue of catalog slugs for one board.
+
+    State is stored as {board: {"cycle": n, "pinned": [slugs]}}. Once every
+    item in the catalog has been pinned, a new cycle starts from the top.
+    Queues for different boards may share one state file and be saved from
+    concurrent threads, so writes are serialized per file.
+
+    Args:
+        path: JSON state file.
+        board: Board name the queue belongs to.
+    """
+
+    _file_locks = {}
+    _file_locks_guard = threading.Lock()
+
+    def __init__(self, path: Path, board: str):
+        self.path = Path(path)
+        self.board = board
+        entry = load_json_state(self.path, default={}).get(board, {})
+        self.cycle = entry.get("cycle", 0)
+        self.pinned = set(entry.get("pinned", []))
+        with self._file_locks_guard:
+            self._lock = self._file_locks.setdefault(self.path.resolve(), threading.Lock())
+
+    def next_batch(self, items: list, count: int) -> list:
+        """Return up to count items that have not been pinned this cycle."""
+        slugs = {item["slug"] for item in items}
+        # Forget items that have left the catalog
+        self.pinned &= slugs
+
+        pending = [item for item in items if item["slug"] not in self.pinned]
+        if not pending and items:
+            self.cycle += 1
+            self.pinned.clear()
+            pending = list(items)
+            logger.info(f"Catalog fully pinned; starting cycle {self.cycle} for {self.board}.")
+        return pending[:count]
+
+    def mark_pinned(self, slug: str) -> None:
+        """Record a successful pin and persist immediately, so a crash mid-run loses nothing."""
+        with self._lock:
+            self.pinned.add(slug)
+            self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        state = load_json_state(self.path, default={})
+        state[self.board] = {"cycle": self.cycle, "pinned": sorted(self.pinned)}
+        save_json_state(self.path, state)
+
+
+def make_pinterest_request(method: str, endpoint: str, payload: dict = None, token: str = None) -> dict:
+    """Call the Pinterest API, authenticating with token (default PINTEREST_ACCESS_TOKEN)."""
     url = f"{PINTEREST_API_BASE}{endpoint}"
     headers = {
-        "Authorization": f"Bearer {PINTEREST_ACCESS_TOKEN}",
+        "Authorization": f"Bearer {token or PINTEREST_ACCESS_TOKEN}",
         "Content-Type": "application/json"
     }
     
@@ -28,25 +108,38 @@ def make_pinterest_request(method: str, endpoint: str, payload: dict = None) ->
     if payload:
         data = json.dumps(payload).encode("utf-8")
         
-    req = Request(url, data=data, headers=headers, method=method)
     try:
-        with urlopen(req) as response:
-            return json.loads(response.read().decode("utf-8"))
-    except HTTPError as e:
-        logger.error(f"Pinterest API Error ({e.code}): {e.read().decode('utf-8')}")
-        return None
+        response = get_client().request(method, url, data=data, headers=headers)
+        if response.status_code >= 400:
+            logger.error(f"Pinterest API Error ({response.status_code}): {response.text}")
+            return None
+        return response.json()
     except Exception as e:
         logger.error(f"Network error: {e}")
         return None
 
-def get_or_create_board(board_name: str, description: str) -> str:
-    """Fetch all boards and return ID if it exists, otherwise create it."""
-    response = make_pinterest_request("GET", "/boards")
-    if response and "items" in response:
-        for board in response["items"]:
-            if board["name"].lower() == board_name.lower():
-                logger.info(f"Found existing board: {board_name} (ID: {board['id']})")
-                return board["id"]
+def fetch_boards_page(bookmark: str = None) -> dict:
+    """Fetch one page of the user's boards."""
+    params = {"page_size": BOARDS_PAGE_SIZE}
+    if bookmark:
+        params["bookmark"] = bookmark
+    return make_pinterest_request("GET", f"/boards?{urlencode(params)}")
+
+def get_or_create_board(board_name: str, description: str, cache: BoardCache = None) -> str:
+    """Return the ID of the named board (cached, all pages searched), creating it if missing.
+
+    Returns None without creating anything if the board listing failed,
+    since the board may exist on a page that could not be fetched.
+    """
+    cache = cache or BoardCache()
+    try:
+        board_id = find_board(board_name, fetch_boards_page, cache)
+    except BoardListingError as e:
+        logger.error(f"Could not list boards: {e}")
+        return None
+    if board_id:
+        logger.info(f"Found existing board: {board_name} (ID: {board_id})")
+        return board_id
                 
     # Create Board if missing
     logger.info(f"Creating new board: {board_name}...")
@@ -57,11 +150,14 @@ def get_or_create_board(board_name: str, description: str) -> str:
     }
     new_board = make_pinterest_request("POST", "/boards", payload)
     if new_board and "id" in new_board:
+        cache.set(board_name, new_board["id"])
+        cache.save()
         return new_board["id"]
     
     return None
 
-def create_pin(board_id: str, title: str, description: str, link_url: str, image_url: str) -> bool:
+def create_pin(board_id: str, title: str, description: str, link_url: str, image_url: str,
+               token: str = None) -> bool:
     """Creates a visually striking Pin pointing back to our programmatic SEO pages."""
     payload = {
         "board_id": board_id,
@@ -75,12 +171,50 @@ def create_pin(board_id: str, title: str, description: str, link_url: str, image
     }
     
     logger.info(f"Uploading Pin for: {title}")
-    res = make_pinterest_request("POST", "/pins", payload)
+    res = make_pinterest_request("POST", "/pins", payload, token=token)
     if res and "id" in res:
         logger.info(f"✅ Successfully pinned! Pin ID: {res['id']}")
         return True
     return False
 
+def build_pin(item: dict, host_url: str, cards_dir: Path = None) -> tuple:
+    """Return (title, description, link, image_url) for an item's pin.
+
+    Uses the item's own social card when one was built into cards_dir,
+    otherwise the shared OpenGraph header.
+    """
+    if cards_dir and (Path(cards_dir) / f"{item['slug']}.png").exists():
+        image_url = f"{host_url}{card_url(item['slug'])}"
+    else:
+        image_url = f"{host_url}/images/og-image.png"
+    item_url = f"{host_url}/api/{item['slug']}.html"
+
+    # Craft a highly SEO optimized Pinterest Description
+    desc_tags = f"#{item['category'].replace(' ', '')} #FreeTools #Developer"
+    full_desc = f"Discover {item['title']} - {item.get('description', '')}! Perfect for {item.get('category', 'general')} needs. {desc_tags}"
+    return item["title"], full_desc, item_url, image_url
+
+
+def pin_items(board_id: str, items: list, host_url: str, queue: PinQueue,
+              limiter: TokenBucket, workers: int = PIN_WORKERS, cards_dir: Path = None) -> int:
+    """Pin items concurrently, paced by the limiter.
+
+    Returns:
+        Number of items pinned successfully.
+    """
+    def pin_one(item):
+        limiter.acquire()
+        if create_pin(board_id, *build_pin(item, host_url, cards_dir)):
+            queue.mark_pinned(item["slug"])
+            return True
+        return False
+
+    if not items:
+        return 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(pin_one, items))
+
+
 def main():
     if len(sys.argv) != 4:
         logger.error("Usage: python post_pinterest.py <host_url> <board_name> <assets_dir>")
@@ -109,37 +243,32 @@ def main():
         logger.error(f"Could not locate database.json in {assets_dir}/data/ or data/. Skipping.")
         sys.exit(0)
         
-    with open(db_path, "r", encoding="utf-8") as f:
-        items = json.load(f)
-        
+    items = load_database(db_path)
+
     if not items:
         logger.info("No items to pin.")
         sys.exit(0)
 
-    board_id = get_or_create_board(board_name, f"Curated collection of the best free resources for {board_name}.")
+    board_cache = BoardCache()
+    board_id = get_or_create_board(board_name, f"Curated collection of the best free resources for {board_name}.", board_cache)
     if not board_id:
         logger.error("Failed to retrieve or create the Pinterest Board. Aborting.")
         sys.exit(1)
 
-    # Scrape only the 3 most recently updated or first 3 items to avoid rate limiting
-    to_pin = items[:3]
-    pinned_count = 0
-    
-    for item in to_pin:
-        # Instead of generic images, we point to the highly stylized, generated OpenGraph headers
-        image_url = f"{host_url}/images/og-image.png"
-        item_url = f"{host_url}/item/{item['slug']}.html"
-        
-        # Craft a highly SEO optimized Pinterest Description
-        desc_tags = f"#{item['category'].replace(' ', '')} #FreeTools #Developer"
-        full_desc = f"Discover {item['title']} - {item.get('description', '')}! Perfect for {item.get('category', 'general')} needs. {desc_tags}"
-        
-        success = create_pin(board_id, item["title"], full_desc, item_url, image_url)
-        if success:
-            pinned_count += 1
-            # Pinterest strict rate limiting policy mandates a 2-second sleep between bulk creations
-            time.sleep(2)
+    queue = PinQueue(get_cache_dir() / PIN_QUEUE_NAME, board_name)
+    to_pin = queue.next_batch(items, PINS_PER_RUN)
+    queue.save()
+
+    limiter = TokenBucket(PIN_RATE_PER_SECOND, PIN_BURST)
+    cards_dir = Path(assets_dir) / CARDS_DIR
+    pinned_count = pin_items(board_id, to_pin, host_url, queue, limiter, cards_dir=cards_dir)
 
+    if to_pin and pinned_count == 0:
+        # The cached board may have been deleted; look it up again next run
+        board_cache.forget(board_name)
+        board_cache.save()
+    if pinned_count < len(to_pin):
+        logger.warning(f"{len(to_pin) - pinned_count} pins failed; they will be retried on the next run.")
     logger.info(f"🎉 Auto-pinning cycle complete! Pinned {pinned_count} images.")
 
 if __name__ == "__main__":
@@ -1,45 +1,120 @@
 """
 Social Media Bot for the Programmatic SEO Directory.
 
-Picks a random API from the database and posts a promotional message
+Picks the next API in a shuffled rotation and posts a promotional message
 to Mastodon via REST API. Designed to run daily via GitHub Actions.
+
+Every cycle visits each API exactly once in a pseudo-random order. The
+order is a keyed hash of each slug, so the rotation state is just the
+cycle number and the last rank posted: nothing proportional to the catalog
+is stored or loaded, and APIs added mid-cycle simply take their place in
+the current or next cycle. If a new cycle would open with the API that
+closed the previous one, that API is deferred to the second post, so the
+same API is never posted twice in a row. Slugs are the rotation key:
+duplicate slugs are posted once per cycle and reported.
 """
 import hashlib
 import os
-import random
 import sys
 from datetime import datetime, timezone
 
 import requests
 
-from scripts.utils import SITE_URL, load_database, slugify
+from scripts.http_client import get_client
+from scripts.utils import (
+    SITE_URL,
+    get_cache_dir,
+    iter_database,
+    load_json_state,
+    save_json_state,
+    slugify,
+)
 
+ROTATION_STATE_NAME = "social-rotation.json"
+ROTATION_SEED = os.environ.get("SOCIAL_ROTATION_SEED", "quickutils-social")
 
-def get_daily_seed() -> int:
-    """Generate a deterministic seed based on the current date.
 
-    This ensures the same item isn't posted twice on the same day,
-    and provides variety across days.
+def get_today() -> str:
+    """Return today's UTC date as YYYY-MM-DD."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
-    Returns:
-        Integer seed based on the date string hash.
+
+def rotation_rank(slug: str, cycle: int) -> str:
+    """Position of a slug in a cycle's shuffled order.
+
+    A keyed BLAKE2 hash acts as a pseudo-random permutation of slugs; each
+    cycle uses a different key, so each cycle has a fresh order.
     """
-    date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    return int(hashlib.md5(date_str.encode()).hexdigest()[:8], 16)
+    key = f"{ROTATION_SEED}:{cycle}".encode("utf-8")[:64]
+    return hashlib.blake2b(slug.encode("utf-8"), key=key, digest_size=8).hexdigest()
 
 
-def pick_random_item(items: list) -> dict:
-    """Pick a random item using a date-seeded RNG.
+def find_item(iter_items, slug: str):
+    """Stream the catalog and return the item with the given slug, or None."""
+    return next((item for item in iter_items() if item["slug"] == slug), None)
+
+
+def pick_next_item(iter_items, state: dict) -> tuple:
+    """Choose the next item in the rotation.
+
+    Makes one streaming pass over the catalog keeping only the best two
+    candidates: the items with the smallest ranks after the last one posted.
+    When the cycle is exhausted a new cycle begins, and if it would start
+    with the item just posted, the runner-up goes first and the item is
+    recorded as deferred to the next pick. Re-running on the same day
+    returns the item already chosen today.
 
     Args:
-        items: List of item dicts from the database.
+        iter_items: Zero-argument callable returning a fresh item iterator.
+        state: Rotation state dict ({"cycle", "last", "slug", "date"} and
+            optionally "deferred").
 
     Returns:
-        A randomly selected item dict.
+        (item, new_state). item is None when the catalog is empty. The
+        caller saves new_state once the post succeeds.
     """
-    seed = get_daily_seed()
-    rng = random.Random(seed)
-    return rng.choice(items)
+    today = get_today()
+    if state.get("date") == today and state.get("slug"):
+        item = find_item(iter_items, state["slug"])
+        if item:
+            return item, state
+
+    cycle = state.get("cycle", 0)
+    last = state.get("last", "")
+    if state.get("deferred"):
+        item = find_item(iter_items, state["deferred"])
+        if item:
+            return item, {"cycle": cycle, "last": last, "slug": item["slug"], "date": today}
+
+    previous = None
+    for _ in range(2):
+        best = runner_up = None
+        seen, duplicates = set(), set()
+        for item in iter_items():
+            slug = item["slug"]
+            if slug in seen:
+                duplicates.add(slug)
+                continue
+            seen.add(slug)
+            rank = rotation_rank(slug, cycle)
+            if rank <= last:
+                continue
+            if best is None or rank < best[1]:
+                best, runner_up = (item, rank), best
+            elif runner_up is None or rank < runner_up[1]:
+                runner_up = (item, rank)
+        for slug in sorted(duplicates):
+            print(f"  ⚠ Duplicate slug '{slug}' in the catalog; only its first item is posted.")
+        if best:
+            new_state = {"cycle": cycle, "last": best[1], "slug": best[0]["slug"], "date": today}
+            if best[0]["slug"] == previous and runner_up:
+                new_state.update(last=runner_up[1], slug=runner_up[0]["slug"], deferred=previous)
+                return runner_up[0], new_state
+            return best[0], new_state
+        # Everything has been posted this cycle
+        cycle, last, previous = cycle + 1, "", state.get("slug")
+
+    return None, state
 
 
 def format_post(item: dict) -> str:
@@ -81,21 +156,23 @@ def format_post(item: dict) -> str:
     return post
 
 
-def post_to_mastodon(message: str) -> bool:
+def post_to_mastodon(message: str, access_token: str = None, instance_url: str = None) -> bool:
     """Post a status update to Mastodon.
 
-    Requires environment variables:
+    Credentials not passed in are read from the environment:
         MASTODON_ACCESS_TOKEN: API token with write:statuses scope.
         MASTODON_INSTANCE_URL: Instance domain (e.g., mastodon.social).
 
     Args:
         message: The status text to post.
+        access_token: API token. Defaults to MASTODON_ACCESS_TOKEN.
+        instance_url: Instance domain or URL. Defaults to MASTODON_INSTANCE_URL.
 
     Returns:
         True if the post was successful, False otherwise.
     """
-    access_token = os.environ.get("MASTODON_ACCESS_TOKEN")
-    instance_url = os.environ.get("MASTODON_INSTANCE_URL", "mastodon.social")
+    access_token = access_token or os.environ.get("MASTODON_ACCESS_TOKEN")
+    instance_url = instance_url or os.environ.get("MASTODON_INSTANCE_URL", "mastodon.social")
 
     if not access_token:
         print("  ✗ MASTODON_ACCESS_TOKEN not set. Skipping post.")
@@ -110,7 +187,7 @@ def post_to_mastodon(message: str) -> bool:
     data = {"status": message, "visibility": "public"}
 
     try:
-        response = requests.post(api_url, headers=headers, data=data, timeout=30)
+        response = get_client().post(api_url, headers=headers, data=data, timeout=30)
         response.raise_for_status()
         result = response.json()
         print(f"  ✓ Posted to Mastodon: {result.get('url', 'success')}")
@@ -124,13 +201,15 @@ def main():
     """CLI entry point."""
     print("📣 Social media bot starting...")
 
-    items = load_database()
-    if not items:
+    state_path = get_cache_dir() / ROTATION_STATE_NAME
+    state = load_json_state(state_path, default={})
+
+    item, new_state = pick_next_item(iter_database, state)
+    if item is None:
         print("  ✗ No items in database. Aborting.")
         sys.exit(0)
 
-    item = pick_random_item(items)
-    print(f"  → Selected: {item['title']} ({item['category']})")
+    print(f"  → Selected: {item['title']} ({item['category']}), rotation cycle {new_state['cycle']}")
 
     message = format_post(item)
     print(f"  → Post preview ({len(message)} chars):")
@@ -139,6 +218,7 @@ def main():
     success = post_to_mastodon(message)
 
     if success:
+        save_json_state(state_path, new_state)
         print("✅ Social post complete.")
     else:
         print("⚠️  Social post skipped.")
@@ -0,0 +1,183 @@
+"""
+Post-build precompression of text assets.
+
+Writes a `.gz` (and, with the optional brotli package, a `.br`) sibling at
+maximum compression next to every HTML, CSS, JS, XML, JSON, SVG and TXT file
+in dist/. Hosts and servers that support precompressed files (nginx
+gzip_static/brotli_static, scripts/preview_server.py) then serve them
+directly instead of compressing on every request.
+
+Compressed outputs are content-addressed in the build cache by the source
+file's hash, so unchanged files are copied from the cache and only new
+content is compressed, across a process pool. A sibling is only kept when
+it is smaller than the original.
+
+Also writes dist/_headers (Cloudflare Pages / Netlify format) with
+`Vary: Accept-Encoding` and the cache and security headers from
+netlify.toml.
+
+Usage:
+    python -m scripts.precompress [dist_dir ...]
+"""
+import gzip
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Ensure project root is in sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.utils import DIST_DIR, ensure_dir, get_cache_dir, hash_content, process_pool
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+TEXT_EXTENSIONS = {".html", ".css", ".js", ".xml", ".json", ".svg", ".txt"}
+# Bump to recompress everything after changing the settings below
+COMPRESS_VERSION = 1
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+HEADERS_NAME = "_headers"
+# Kept in step with netlify.toml (checked by tests/test_precompress.py), plus Vary
+HEADER_RULES = [
+    ("/*", {
+        "Vary": "Accept-Encoding",
+        "X-Frame-Options": "DENY",
+        "X-Content-Type-Options": "nosniff",
+        "Referrer-Policy": "strict-origin-when-cross-origin",
+        "Permissions-Policy": "camera=(), microphone=(), geolocation=()",
+    }),
+    ("/css/*", {"Cache-Control": "public, max-age=31536000, immutable"}),
+    ("/js/*", {"Cache-Control": "public, max-age=31536000, immutable"}),
+    # Images keep stable names (see FINGERPRINT_DIRS in build_directory.py)
+    ("/images/*", {"Cache-Control": "public, max-age=86400"}),
+    # Static JSON API, fetched by widgets and partner sites
+    ("/data/*", {"Cache-Control": "public, max-age=3600", "Access-Control-Allow-Origin": "*"}),
+]
+
+
+def encodings() -> list:
+    """Return the (suffix, compress function) pairs available here."""
+    pairs = [(".gz", lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))]
+    if brotli is not None:
+        pairs.insert(0, (".br", lambda data: brotli.compress(data, quality=BROTLI_QUALITY, mode=brotli.MODE_TEXT)))
+    return pairs
+
+
+def iter_text_files(dist_dir: Path):
+    """Yield every compressible file under dist_dir."""
+    for path in sorted(Path(dist_dir).rglob("*")):
+        if path.is_file() and path.suffix in TEXT_EXTENSIONS:
+            yield path
+
+
+def _compress_to_cache(job: tuple) -> str:
+    """Process-pool worker: compress one source file into the cache."""
+    source, cache_base = job
+    with open(source, "rb") as f:
+        data = f.read()
+    for suffix, compress in encodings():
+        path = f"{cache_base}{suffix}"
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compress(data))
+        os.replace(tmp_path, path)
+    return cache_base
+
+
+def precompress(dist_dir: Path = None, workers: int = None) -> dict:
+    """Write .br/.gz siblings for every text asset in dist_dir.
+
+    Args:
+        dist_dir: Build output directory. Defaults to dist/.
+        workers: Process pool size. Defaults to the CPU count; 1 compresses inline.
+
+    Returns:
+        Dict with 'files', 'compressed' (cache misses), 'bytes' and the total
+        size written per encoding suffix (e.g. '.br', '.gz').
+    """
+    dist_dir = Path(dist_dir or DIST_DIR)
+    cache_dir = get_cache_dir() / "compressed"
+    ensure_dir(cache_dir)
+    suffixes = [suffix for suffix, _ in encodings()]
+    if brotli is None:
+        print("  ⚠ brotli not installed; writing gzip siblings only")
+
+    sources = {}
+    jobs = {}
+    for path in iter_text_files(dist_dir):
+        with open(path, "rb") as f:
+            digest = hash_content(f.read() + f"\0v{COMPRESS_VERSION}".encode())
+        cache_base = cache_dir / digest
+        sources[path] = cache_base
+        if digest not in jobs and not all(Path(f"{cache_base}{s}").exists() for s in suffixes):
+            jobs[digest] = (str(path), str(cache_base))
+
+    if jobs:
+        if workers == 1 or len(jobs) == 1:
+            for job in jobs.values():
+                _compress_to_cache(job)
+        else:
+            with process_pool(workers) as pool:
+                list(pool.map(_compress_to_cache, jobs.values(), chunksize=64))
+
+    report = {"files": len(sources), "compressed": len(jobs), "bytes": 0, **{s: 0 for s in suffixes}}
+    for path, cache_base in sources.items():
+        size = path.stat().st_size
+        report["bytes"] += size
+        for suffix in suffixes:
+            cached = Path(f"{cache_base}{suffix}")
+            sibling = path.with_name(path.name + suffix)
+            if cached.stat().st_size < size:
+                shutil.copyfile(cached, sibling)
+                report[suffix] += cached.stat().st_size
+            else:
+                # Not worth it; serve the original
+                sibling.unlink(missing_ok=True)
+                report[suffix] += size
+
+    sizes = ", ".join(
+        f"{suffix[1:]} {report[suffix] / report['bytes']:.0%}" for suffix in suffixes if report["bytes"]
+    )
+    print(
+        f"  ✓ Precompressed {len(sources)} files ({len(jobs)} compressed, "
+        f"{len(sources) - len(jobs)} from cache){f'; {sizes} of original' if sizes else ''}"
+    )
+    return report
+
+
+def build_headers_file(rules: list = None) -> str:
+    """Render header rules in the _headers format."""
+    lines = ["# Generated by scripts/precompress.py"]
+    for pattern, headers in rules or HEADER_RULES:
+        lines.append(pattern)
+        lines.extend(f"  {name}: {value}" for name, value in headers.items())
+    return "\n".join(lines) + "\n"
+
+
+def write_headers_file(dist_dir: Path = None) -> Path:
+    """Write dist/_headers."""
+    path = Path(dist_dir or DIST_DIR) / HEADERS_NAME
+    path.write_text(build_headers_file(), encoding="utf-8")
+    return path
+
+
+def main():
+    dist_dirs = [Path(arg) for arg in sys.argv[1:]] or [DIST_DIR]
+    for dist_dir in dist_dirs:
+        if not dist_dir.exists():
+            print(f"✗ {dist_dir} not found. Run the build first.")
+            sys.exit(1)
+        print(f"📦 Precompressing {dist_dir}...")
+        write_headers_file(dist_dir)
+        precompress(dist_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Local preview server for a built site.
+
+Serves dist/ like the production host does: files precompressed by
+scripts/precompress.py are preferred (Brotli, then gzip) when the client
+accepts them, and the rules in dist/_headers are applied to every response.
+
+Usage:
+    python -m scripts.preview_server [--port 8000] [--directory dist]
+"""
+import argparse
+import fnmatch
+import os
+import sys
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Ensure project root is in sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.precompress import HEADERS_NAME
+from scripts.utils import DIST_DIR
+
+# Precompressed sibling suffix -> Content-Encoding, in order of preference
+PRECOMPRESSED = [(".br", "br"), (".gz", "gzip")]
+
+
+def parse_headers_file(path: Path) -> list:
+    """Parse a _headers file into [(pattern, {name: value}), ...]."""
+    rules = []
+    if not Path(path).exists():
+        return rules
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        if not line[0].isspace():
+            rules.append((line.strip(), {}))
+        elif rules and ":" in line:
+            name, value = line.split(":", 1)
+            rules[-1][1][name.strip()] = value.strip()
+    return rules
+
+
+def parse_qvalue(params: str) -> float:
+    """Return the q-value from a coding's parameters; missing or unparsable means 1."""
+    for param in params.split(";"):
+        name, _, value = param.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 1.0
+    return 1.0
+
+
+def accepted_encodings(header: str) -> set:
+    """Return the content codings a client accepts (q=0 means refused)."""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding and parse_qvalue(params) > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """Static file handler that prefers precompressed siblings."""
+
+    header_rules = []
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not self.path.split("?", 1)[0].endswith("/"):
+                return super().send_head()  # Redirects to the trailing-slash URL
+            path = os.path.join(path, "index.html")
+        if not os.path.isfile(path):
+            return super().send_head()
+
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding"))
+        for suffix, coding in PRECOMPRESSED:
+            sibling = path + suffix
+            if coding in accepted and os.path.isfile(sibling):
+                f = open(sibling, "rb")
+                self.send_response(200)
+                self.send_header("Content-Type", self.guess_type(path))
+                self.send_header("Content-Encoding", coding)
+                self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+                self.end_headers()
+                return f
+        return super().send_head()
+
+    def end_headers(self):
+        request_path = self.path.split("?", 1)[0]
+        for pattern, headers in self.header_rules:
+            if fnmatch.fnmatchcase(request_path, pattern):
+                for name, value in headers.items():
+                    self.send_header(name, value)
+        super().end_headers()
+
+
+def make_server(directory: Path = None, port: int = 8000, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Create (but do not start) a preview server for directory."""
+    directory = Path(directory or DIST_DIR)
+    handler = type("Handler", (PreviewHandler,), {"header_rules": parse_headers_file(directory / HEADERS_NAME)})
+    return ThreadingHTTPServer((host, port), partial(handler, directory=str(directory)))
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Preview a built directory site.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--directory", type=Path, default=DIST_DIR)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.directory, args.port, args.host)
+    print(f"→ Serving {args.directory} at http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+"""
+Record/replay harness and benchmark for the outbound integrations.
+
+Record real traffic from any script to a fixture file:
+
+    python -m scripts.replay record fixtures/fetch.json scripts.fetch_data
+
+Replay fixtures through a local server with injected latency, errors and
+rate limiting, and measure an integration under load:
+
+    python -m scripts.replay bench indexnow --calls 200 --workers 8 \\
+        --latency 0.05 --error-rate 0.1 --rate-limit 50
+
+Fixture files use the FixtureTransport format (a JSON list of method, url,
+status, headers and body). Request headers are never recorded, so access
+tokens don't end up in fixtures. Every scenario has built-in default
+fixtures, so benchmarks also run with no recording at all. Error injection
+is keyed on the seed and on each request's method, URL and repeat count,
+so a given seed fails the same requests on every run.
+"""
+import argparse
+import io
+import json
+import logging
+import random
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+# Ensure project root is in sys.path when run as `python scripts/replay.py`
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.http_client import HttpClient, set_client
+from scripts.utils import TokenBucket, ensure_dir
+
+REPLAY_HOST_HEADER = "X-Replay-Host"
+
+
+def _decode_body(raw: bytes):
+    """Decode a body as JSON when possible, otherwise as text."""
+    if not raw:
+        return ""
+    text = raw.decode("utf-8", "replace")
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+class RecordingTransport(HTTPAdapter):
+    """A pooled adapter that also records every exchange as a fixture."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fixtures = []
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        fixture = {
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in ("content-type", "retry-after")},
+            "body": _decode_body(response.content),
+            "request_body": _decode_body(body or b""),
+        }
+        with self._lock:
+            self.fixtures.append(fixture)
+        return response
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        ensure_dir(path.parent)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.fixtures, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        return path
+
+
+@contextmanager
+def record(path):
+    """Record all traffic through the shared HTTP client into a fixture file."""
+    transport = RecordingTransport()
+    set_client(HttpClient(transport=transport))
+    try:
+        yield transport
+    finally:
+        transport.save(path)
+        set_client(None)
+
+
+def load_fixtures(fixtures) -> list:
+    """Accept a fixture list or a path to a fixture file."""
+    if isinstance(fixtures, (str, Path)):
+        with open(fixtures, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return list(fixtures)
+
+
+class LocalHTTPServer:
+    """A threaded HTTP server on a free localhost port.
+
+    Subclasses answer requests by overriding handle(). Also the base of the
+    test suite's fake API server.
+    """
+
+    def __init__(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                status, data, headers = server.handle(self.command, self.path, self.headers, raw)
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    if name.lower() != "content-length":
+                        self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+
+    def handle(self, method: str, path: str, headers, body: bytes) -> tuple:
+        """Return (status, response bytes, headers) for one request."""
+        raise NotImplementedError
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class ReplayServer(LocalHTTPServer):
+    """A local server answering with recorded fixtures under simulated conditions.
+
+    Requests are matched on method, original host and path (with query,
+    falling back to the bare path). Unmatched requests get 404.
+
+    Whether a request fails is decided by the seed, the request's method,
+    host and path, and how many times that request was seen before, so the
+    n-th call to a URL fails the same way on every run, however concurrent
+    callers interleave.
+
+    Args:
+        fixtures: Fixture list or path.
+        latency: Seconds added to every response.
+        error_rate: Probability (0-1) of answering 503 instead.
+        rate_limit: Requests per second before answering 429 (None = unlimited).
+        burst: Token-bucket burst size for rate_limit.
+        seed: Seed for error injection.
+    """
+
+    def __init__(self, fixtures, latency: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: float = None, burst: float = 1, seed: int = 0):
+        self.routes = {}
+        self.path_routes = {}
+        for fixture in load_fixtures(fixtures):
+            parsed = urlparse(fixture["url"])
+            method = fixture.get("method", "GET").upper()
+            path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+            self.routes.setdefault((method, parsed.netloc, path), fixture)
+            # A query-less fixture is the preferred fallback for its path
+            if not parsed.query:
+                self.path_routes[(method, parsed.netloc, parsed.path)] = fixture
+            else:
+                self.path_routes.setdefault((method, parsed.netloc, parsed.path), fixture)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.statuses = Counter()
+        self.seed = seed
+        self._seen = Counter()
+        self._lock = threading.Lock()
+        super().__init__()
+
+    def handle(self, method: str, path: str, headers, body: bytes) -> tuple:
+        status, payload, response_headers = self.respond(method, headers.get(REPLAY_HOST_HEADER, ""), path)
+        data = payload if isinstance(payload, str) else json.dumps(payload)
+        return status, data.encode("utf-8"), response_headers
+
+    def _injected_failure(self, method: str, host: str, path: str) -> bool:
+        with self._lock:
+            count = self._seen[(method, host, path)]
+            self._seen[(method, host, path)] += 1
+        return random.Random(f"{self.seed}:{method}:{host}:{path}:{count}").random() < self.error_rate
+
+    def respond(self, method: str, host: str, path: str) -> tuple:
+        """Return (status, body, headers) for one request."""
+        fail = self._injected_failure(method, host, path)
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.limiter and not self.limiter.try_acquire():
+            result = (429, {"message": "rate limited"}, {"Retry-After": "1"})
+        elif fail:
+            result = (503, {"message": "injected failure"}, {})
+        else:
+            fixture = self.routes.get((method, host, path)) or self.path_routes.get((method, host, path.split("?")[0]))
+            if fixture is None:
+                result = (404, {"message": f"no fixture for {method} {host}{path}"}, {})
+            else:
+                result = (fixture.get("status", 200), fixture.get("body", ""), fixture.get("headers", {}))
+
+        with self._lock:
+            self.statuses[result[0]] += 1
+        return result
+
+
+class ReplayTransport(HTTPAdapter):
+    """A pooled adapter that sends every request to a ReplayServer instead of its real host."""
+
+    def __init__(self, base_url: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    def send(self, request, **kwargs):
+        parsed = urlparse(request.url)
+        request.headers[REPLAY_HOST_HEADER] = parsed.netloc
+        request.url = self.base_url + parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        return super().send(request, **kwargs)
+
+
+@contextmanager
+def replay(fixtures, **server_options):
+    """Serve fixtures locally and route the shared HTTP client to them."""
+    server = ReplayServer(fixtures, **server_options)
+    client = HttpClient(transport=ReplayTransport(server.url, pool_maxsize=64))
+    set_client(client)
+    try:
+        yield server, client
+    finally:
+        set_client(None)
+        server.close()
+
+
+# ---------- Benchmark scenarios ----------
+
+def _bench_indexnow(i: int) -> bool:
+    from scripts.indexnow_submit import submit_to_indexnow
+
+    return submit_to_indexnow("bench.test", "benchkey", [f"https://bench.test/api/{i}-{n}.html" for n in range(100)])
+
+
+def _bench_pinterest(i: int) -> bool:
+    from scripts.post_pinterest import create_pin
+
+    return create_pin("bench-board", f"Item {i}", "Benchmark pin", f"https://bench.test/api/{i}.html",
+                      "https://bench.test/images/og-image.png", token="bench")
+
+
+def _bench_mastodon(i: int) -> bool:
+    from scripts.post_social import post_to_mastodon
+
+    return post_to_mastodon(f"Benchmark post {i}", access_token="bench", instance_url="mastodon.social")
+
+
+def _bench_fetch(i: int) -> bool:
+    from scripts.fetch_data import fetch_from_primary
+
+    return fetch_from_primary() is not None
+
+
+SCENARIOS = {
+    "indexnow": (_bench_indexnow, [
+        {"method": "POST", "url": "https://api.indexnow.org/indexnow", "status": 200, "body": ""},
+    ]),
+    "pinterest": (_bench_pinterest, [
+        {"method": "POST", "url": "https://api.pinterest.com/v5/pins", "status": 201, "body": {"id": "bench"}},
+    ]),
+    "mastodon": (_bench_mastodon, [
+        {"method": "POST", "url": "https://mastodon.social/api/v1/statuses", "status": 200,
+         "body": {"url": "https://mastodon.social/@bench/1"}},
+    ]),
+    "fetch": (_bench_fetch, [
+        {"method": "GET", "url": "https://api.publicapis.org/entries", "status": 200,
+         "body": {"count": 1, "entries": [{"API": "Bench", "Description": "Benchmark", "Category": "Test"}]}},
+    ]),
+}
+
+
+def run_benchmark(scenario: str, calls: int = 100, workers: int = 4, fixtures=None, **server_options) -> dict:
+    """Run one integration `calls` times against the replay server.
+
+    Args:
+        scenario: One of SCENARIOS.
+        calls: Number of integration calls.
+        workers: Concurrent callers.
+        fixtures: Optional recorded fixtures; defaults to the scenario's own.
+        **server_options: latency, error_rate, rate_limit, burst, seed.
+
+    Returns:
+        Report dict with timings, outcomes and HTTP counts.
+    """
+    func, default_fixtures = SCENARIOS[scenario]
+    # Scenarios pass their own dummy credentials; requests go to the local server
+    with replay(fixtures or default_fixtures, **server_options) as (server, client), \
+            redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(func, range(calls)))
+        elapsed = time.perf_counter() - start
+
+        metrics = {"requests": 0, "retries": 0, "errors": 0}
+        for host_metrics in client.metrics.values():
+            for key in metrics:
+                metrics[key] += host_metrics[key]
+
+    succeeded = sum(1 for r in results if r)
+    return {
+        "scenario": scenario,
+        "calls": calls,
+        "workers": workers,
+        "succeeded": succeeded,
+        "failed": calls - succeeded,
+        "seconds": round(elapsed, 3),
+        "calls_per_second": round(calls / elapsed, 1) if elapsed else None,
+        "http_requests": metrics["requests"],
+        "http_retries": metrics["retries"],
+        "http_errors": metrics["errors"],
+        "server_statuses": dict(sorted(server.statuses.items())),
+    }
+
+
+def format_report(report: dict) -> str:
+    return (
+        f"{report['scenario']}: {report['calls']} calls x {report['workers']} workers in {report['seconds']}s "
+        f"({report['calls_per_second']}/s) — {report['succeeded']} ok, {report['failed']} failed; "
+        f"{report['http_requests']} HTTP requests, {report['http_retries']} retries; "
+        f"server statuses {report['server_statuses']}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Run a script module and record its HTTP traffic")
+    rec.add_argument("output", help="Fixture file to write")
+    rec.add_argument("module", help="Module to run, e.g. scripts.fetch_data")
+    rec.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the module")
+
+    bench = sub.add_parser("bench", help="Benchmark an integration against replayed fixtures")
+    bench.add_argument("scenario", choices=sorted(SCENARIOS))
+    bench.add_argument("--calls", type=int, default=100)
+    bench.add_argument("--workers", type=int, default=4)
+    bench.add_argument("--fixtures", help="Recorded fixture file (defaults to built-in responses)")
+    bench.add_argument("--latency", type=float, default=0.0, help="Seconds added per response")
+    bench.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    bench.add_argument("--rate-limit", type=float, default=None, help="Requests/second before 429")
+    bench.add_argument("--burst", type=float, default=1)
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        with record(args.output) as transport:
+            sys.argv = [args.module] + args.args
+            try:
+                runpy.run_module(args.module, run_name="__main__", alter_sys=True)
+            except SystemExit:
+                pass
+        print(f"✓ Recorded {len(transport.fixtures)} exchanges → {args.output}")
+        return
+
+    logging.disable(logging.INFO)  # Per-call success logs would drown the report
+    try:
+        report = run_benchmark(
+            args.scenario,
+            calls=args.calls,
+            workers=args.workers,
+            fixtures=args.fixtures,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            rate_limit=args.rate_limit,
+            burst=args.burst,
+            seed=args.seed,
+        )
+    finally:
+        logging.disable(logging.NOTSET)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Per-site item schemas and the render plans compiled from them.
+
+Each directory stores different fields (auth/https/cors for APIs, license
+and alternative_to for open-source projects, format/size for datasets, ...).
+A schema lists which fields to show and how: the label, the display text
+and tone for each value, the badge shown on listing cards, and whether the
+field is a facet for filtering.
+
+compile_schema() turns a schema into a RenderPlan once per build.
+RenderPlan.present_items() then formats every item once into a `view`
+dict that all pages showing the item share:
+
+    {"properties": [{"key", "label", "text", "tone"}, ...],
+     "badges": [{"text", "css"}, ...],
+     "facets": {key: value, ...}}
+
+Templates only loop over the view, with no per-item conditionals.
+Category pages offer a filter per facet field, built from the facets of
+their items by RenderPlan.facet_options().
+
+A field spec looks like:
+
+    {"key": "auth", "label": "Authentication", "facet": true,
+     "cases": {"None": {"text": "🔓 None Required", "tone": "good",
+                        "badge": "🔓 No Auth", "badge_class": "badge-free"}},
+     "otherwise": {"text": "🔐 {value}", "badge": "🔐 {value}", "badge_class": "badge-auth"}}
+
+Cases are matched on the value as a string ("true"/"false" for booleans).
+"{value}" in a text is replaced by the value (list values are joined with
+commas). A case without "badge" shows no badge. Empty or missing fields are
+skipped.
+"""
+
+DEFAULT_SCHEMA = "api"
+
+SCHEMAS = {
+    "api": {
+        "labels": {
+            "item": "API",
+            "items": "APIs",
+            "visit": "🌐 Visit API Documentation →",
+            "schema_type": "SoftwareApplication",
+        },
+        "fields": [
+            {
+                "key": "auth",
+                "label": "Authentication",
+                "facet": True,
+                "cases": {
+                    "None": {"text": "🔓 None Required", "tone": "good", "badge": "🔓 No Auth", "badge_class": "badge-free"},
+                },
+                "otherwise": {"text": "🔐 {value}", "badge": "🔐 {value}", "badge_class": "badge-auth"},
+            },
+            {
+                "key": "https",
+                "label": "HTTPS",
+                "facet": True,
+                "cases": {
+                    "true": {"text": "✅ Supported", "tone": "good", "badge": "🔒 HTTPS", "badge_class": "badge-https"},
+                    "false": {"text": "⚠️ Not Available", "tone": "warn", "badge": "⚠️ HTTP", "badge_class": "badge-http"},
+                },
+            },
+            {
+                "key": "cors",
+                "label": "CORS",
+                "facet": True,
+                "cases": {
+                    "yes": {"text": "✅ Enabled", "tone": "good", "badge": "✅ CORS", "badge_class": "badge-cors"},
+                    "no": {"text": "❌ Disabled", "tone": "warn"},
+                },
+                "otherwise": {"text": "❓ Unknown"},
+            },
+        ],
+    },
+    "opensource": {
+        "labels": {
+            "item": "Project",
+            "items": "Projects",
+            "visit": "🌐 View Project →",
+            "schema_type": "SoftwareApplication",
+        },
+        "fields": [
+            {
+                "key": "alternative_to",
+                "label": "Alternative To",
+                "otherwise": {"text": "{value}", "badge": "↔ {value}", "badge_class": "badge-https"},
+            },
+            {
+                "key": "license",
+                "label": "License",
+                "facet": True,
+                "otherwise": {"text": "📜 {value}", "tone": "good", "badge": "📜 {value}", "badge_class": "badge-free"},
+            },
+            {"key": "github_repo", "label": "Repository", "otherwise": {"text": "{value}"}},
+            {"key": "tags", "label": "Tags", "otherwise": {"text": "{value}"}},
+        ],
+    },
+    "datasets": {
+        "labels": {
+            "item": "Dataset",
+            "items": "Datasets",
+            "visit": "🌐 Get the Dataset →",
+            "schema_type": "Dataset",
+        },
+        "fields": [
+            {
+                "key": "format",
+                "label": "Format",
+                "facet": True,
+                "otherwise": {"text": "🗂 {value}", "badge": "🗂 {value}", "badge_class": "badge-https"},
+            },
+            {"key": "size", "label": "Size", "otherwise": {"text": "💾 {value}", "badge": "💾 {value}", "badge_class": "badge-auth"}},
+            {
+                "key": "license",
+                "label": "License",
+                "facet": True,
+                "otherwise": {"text": "📜 {value}", "tone": "good", "badge": "📜 {value}", "badge_class": "badge-free"},
+            },
+        ],
+    },
+    "tools": {
+        "labels": {
+            "item": "Tool",
+            "items": "Tools",
+            "visit": "🌐 Open Tool →",
+            "schema_type": "SoftwareApplication",
+        },
+        "fields": [
+            {
+                "key": "pricing",
+                "label": "Pricing",
+                "facet": True,
+                "cases": {
+                    "Free": {"text": "🆓 Free", "tone": "good", "badge": "🆓 Free", "badge_class": "badge-free"},
+                },
+                "otherwise": {"text": "💲 {value}", "badge": "💲 {value}", "badge_class": "badge-auth"},
+            },
+            {
+                "key": "platform",
+                "label": "Platform",
+                "facet": True,
+                "otherwise": {"text": "{value}", "badge": "🖥 {value}", "badge_class": "badge-https"},
+            },
+            {"key": "tool_type", "label": "Type", "facet": True, "otherwise": {"text": "{value}"}},
+            {"key": "tags", "label": "Tags", "otherwise": {"text": "{value}"}},
+        ],
+    },
+}
+
+_plans = {}
+
+
+def _case_key(value) -> str:
+    """Normalize a field value to the string its cases are keyed by."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _display(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+
+def _compile_case(case: dict) -> tuple:
+    """Return (text, tone, badge, badge_class) with defaults filled in."""
+    return (
+        case.get("text", "{value}"),
+        case.get("tone", "neutral"),
+        case.get("badge"),
+        case.get("badge_class", "badge-https"),
+    )
+
+
+class RenderPlan:
+    """A compiled schema: formats items into template-ready views.
+
+    Args:
+        labels: Site wording ('item', 'items', 'visit', 'schema_type').
+        fields: Compiled fields as (key, label, facet, cases, otherwise) tuples.
+    """
+
+    def __init__(self, labels: dict, fields: list):
+        self.labels = labels
+        self.fields = fields
+
+    @property
+    def facet_keys(self) -> list:
+        return [key for key, _, facet, _, _ in self.fields if facet]
+
+    def present(self, item: dict) -> dict:
+        """Format one item's fields into its view."""
+        properties = []
+        badges = []
+        facets = {}
+        for key, label, facet, cases, otherwise in self.fields:
+            value = item.get(key)
+            if value is None or value == "" or value == []:
+                continue
+            case_key = _case_key(value)
+            case = cases.get(case_key, otherwise)
+            if case is None:
+                continue
+            text, tone, badge, badge_class = case
+            shown = _display(value)
+            properties.append({"key": key, "label": label, "text": text.replace("{value}", shown), "tone": tone})
+            if badge:
+                badges.append({"text": badge.replace("{value}", shown), "css": badge_class})
+            if facet:
+                facets[key] = case_key
+        return {"properties": properties, "badges": badges, "facets": facets}
+
+    def present_items(self, items: list) -> list:
+        """Return items with a 'view' key, formatting only those without one."""
+        return [item if "view" in item else dict(item, view=self.present(item)) for item in items]
+
+    def facet_options(self, items: list) -> list:
+        """Collect the filter choices offered by presented items.
+
+        Returns:
+            [{"key", "label", "options": [{"value", "text"}, ...]}, ...] in
+            schema order, options sorted by value. Facets with fewer than two
+            distinct values are left out, as they cannot narrow anything.
+        """
+        labels = {key: label for key, label, facet, _, _ in self.fields if facet}
+        seen = {key: {} for key in labels}
+        for item in items:
+            view = item["view"]
+            texts = {prop["key"]: prop["text"] for prop in view["properties"]}
+            for key, value in view["facets"].items():
+                seen[key].setdefault(value, texts[key])
+        return [
+            {
+                "key": key,
+                "label": labels[key],
+                "options": [
+                    {"value": value, "text": text}
+                    for value, text in sorted(seen[key].items(), key=lambda option: option[0].lower())
+                ],
+            }
+            for key in labels
+            if len(seen[key]) > 1
+        ]
+
+
+def compile_schema(schema: dict) -> RenderPlan:
+    """Compile a schema dict into a RenderPlan.
+
+    Raises:
+        ValueError: If a field has no 'key'.
+    """
+    labels = dict(SCHEMAS[DEFAULT_SCHEMA]["labels"])
+    labels.update(schema.get("labels", {}))
+
+    fields = []
+    for spec in schema.get("fields", []):
+        if not spec.get("key"):
+            raise ValueError(f"Schema field {spec!r} is missing 'key'")
+        cases = {str(k): _compile_case(c) for k, c in spec.get("cases", {}).items()}
+        otherwise = _compile_case(spec["otherwise"]) if "otherwise" in spec else None
+        label = spec.get("label") or spec["key"].replace("_", " ").title()
+        fields.append((spec["key"], label, bool(spec.get("facet")), cases, otherwise))
+    return RenderPlan(labels, fields)
+
+
+def get_render_plan(schema=None) -> RenderPlan:
+    """Return the render plan for a built-in schema name or a schema dict.
+
+    Plans for built-in schemas are compiled once per process.
+
+    Raises:
+        ValueError: If the name is not a built-in schema.
+    """
+    if schema is None:
+        schema = DEFAULT_SCHEMA
+    if isinstance(schema, dict):
+        return compile_schema(schema)
+    if schema not in SCHEMAS:
+        raise ValueError(f"Unknown schema {schema!r}; expected one of {', '.join(sorted(SCHEMAS))}")
+    if schema not in _plans:
+        _plans[schema] = compile_schema(SCHEMAS[schema])
+    return _plans[schema]
@@ -0,0 +1,114 @@
+"""
+Build-time search index for the homepage search box.
+
+Builds an inverted index over item titles, categories and descriptions and
+writes it as prefix shards: every token is stored in dist/search/<p>.json,
+where <p> is its first SHARD_PREFIX_LENGTH characters. The browser
+(src/js/search.js) fetches only the shards for the words being typed, so
+search stays instant on a static host at any catalog size.
+
+Shard format (compact on purpose):
+
+    {"docs": {"<id>": [slug, title, category], ...},
+     "terms": {"<token>": [[id, score], ...], ...}}
+
+Postings are sorted by score (title matches weigh most, then category,
+then description) and capped at MAX_POSTINGS per term. dist/search/meta.json
+lists the shards that exist so the client never requests a missing one.
+"""
+import json
+import re
+import shutil
+import unicodedata
+from pathlib import Path
+
+from scripts.utils import ensure_dir
+
+SEARCH_DIR = "search"
+SHARD_PREFIX_LENGTH = 2
+MIN_TOKEN_LENGTH = 2
+MAX_POSTINGS = 200
+FIELD_WEIGHTS = {"title": 3, "category": 2, "description": 1}
+STOPWORDS = {
+    "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "with", "your",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    """Split text into lowercase ASCII search tokens.
+
+    Mirrors tokenize() in src/js/search.js; keep the two in sync.
+    """
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii").lower()
+    return [t for t in _TOKEN_RE.findall(text) if len(t) >= MIN_TOKEN_LENGTH and t not in STOPWORDS]
+
+
+def score_item(item: dict) -> dict:
+    """Return {token: score} for one item across the weighted fields."""
+    scores = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        # Count each token once per field so long descriptions can't stuff scores
+        for token in set(tokenize(item.get(field, ""))):
+            scores[token] = scores.get(token, 0) + weight
+    return scores
+
+
+def build_shards(items: list) -> dict:
+    """Build the sharded inverted index in memory.
+
+    Returns:
+        Dict mapping shard prefix to its shard dict.
+    """
+    postings = {}
+    for doc_id, item in enumerate(items):
+        for token, score in score_item(item).items():
+            postings.setdefault(token, []).append((doc_id, score))
+
+    shards = {}
+    for token, docs in postings.items():
+        docs.sort(key=lambda posting: (-posting[1], posting[0]))
+        docs = docs[:MAX_POSTINGS]
+        shard = shards.setdefault(token[:SHARD_PREFIX_LENGTH], {"docs": {}, "terms": {}})
+        shard["terms"][token] = [list(posting) for posting in docs]
+        for doc_id, _ in docs:
+            if str(doc_id) not in shard["docs"]:
+                item = items[doc_id]
+                shard["docs"][str(doc_id)] = [item["slug"], item["title"], item.get("category", "")]
+    return shards
+
+
+def build_search_index(items: list, dist_dir: Path) -> int:
+    """Write the search shards and meta.json under dist/search/.
+
+    Args:
+        items: All items from the database.
+        dist_dir: Output directory.
+
+    Returns:
+        Number of shards written.
+    """
+    out_dir = Path(dist_dir) / SEARCH_DIR
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    ensure_dir(out_dir)
+
+    shards = build_shards(items)
+    for prefix, shard in shards.items():
+        with open(out_dir / f"{prefix}.json", "w", encoding="utf-8") as f:
+            json.dump(shard, f, separators=(",", ":"), ensure_ascii=False)
+
+    meta = {
+        "prefix": SHARD_PREFIX_LENGTH,
+        "min_token": MIN_TOKEN_LENGTH,
+        "docs": len(items),
+        "shards": sorted(shards),
+    }
+    with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, separators=(",", ":"))
+
+    terms = sum(len(shard["terms"]) for shard in shards.values())
+    print(f"  ✓ Search index: {terms} terms in {len(shards)} shards → dist/{SEARCH_DIR}/")
+    return len(shards)
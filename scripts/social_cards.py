@@ -0,0 +1,201 @@
+"""
+Per-item social card images for Open Graph, Twitter and Pinterest.
+
+Each item gets a 1200x630 PNG at dist/images/cards/{slug}.png showing its
+title, category and the badges its site's schema gives it (see
+RenderPlan.present()). Cards are content-addressed in the
+build cache by a hash of exactly those inputs, so a rebuild only draws the
+cards whose inputs changed; the rest are copied from the cache. New cards
+are drawn across a process pool.
+
+Pillow is optional: without it no cards are produced and pages fall back
+to the shared og-image.
+"""
+import io
+import json
+import os
+import shutil
+from pathlib import Path
+
+from scripts.schemas import get_render_plan
+from scripts.utils import SITE_NAME, ensure_dir, get_cache_dir, hash_content, process_pool
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = None
+
+CARD_SIZE = (1200, 630)
+CARDS_DIR = "images/cards"
+# Bump to redraw every card after changing the layout below
+CARD_VERSION = 2
+# Badges that fit beside each other on a card
+MAX_CARD_BADGES = 3
+
+BG_COLOR = "#0a0a0f"
+CARD_COLOR = "#1a1a2e"
+TEXT_COLOR = "#f0f0f5"
+MUTED_COLOR = "#a0a0b8"
+ACCENT_COLOR = "#6c63ff"
+GOOD_COLOR = "#00d4aa"
+WARN_COLOR = "#ffaa33"
+FONT_BOLD = "DejaVuSans-Bold.ttf"
+FONT_REGULAR = "DejaVuSans.ttf"
+
+# Badge outline colors by the schema's badge_class
+BADGE_COLORS = {
+    "badge-free": GOOD_COLOR,
+    "badge-https": GOOD_COLOR,
+    "badge-cors": GOOD_COLOR,
+    "badge-auth": WARN_COLOR,
+    "badge-http": WARN_COLOR,
+}
+
+
+def _badge_text(text: str) -> str:
+    """Drop a leading emoji, which the card fonts cannot draw."""
+    head, _, rest = text.partition(" ")
+    return rest if rest and not any(c.isalnum() for c in head) else text
+
+
+def card_fields(item: dict, site_name: str = SITE_NAME) -> dict:
+    """Return the item and site fields drawn on its card.
+
+    Badges come from the item's view, presented with the default schema if
+    the item has none.
+    """
+    view = item.get("view") or get_render_plan().present(item)
+    return {
+        "title": item["title"],
+        "category": item.get("category", ""),
+        "badges": [[_badge_text(b["text"]), b["css"]] for b in view["badges"][:MAX_CARD_BADGES]],
+        "site": site_name,
+    }
+
+
+def card_hash(item: dict, site_name: str = SITE_NAME) -> str:
+    """Hash of everything that affects a card's pixels."""
+    fields = dict(card_fields(item, site_name), version=CARD_VERSION)
+    return hash_content(json.dumps(fields, sort_keys=True))
+
+
+def card_url(slug: str) -> str:
+    """Site-relative URL of an item's card."""
+    return f"/{CARDS_DIR}/{slug}.png"
+
+
+def _font(name: str, size: int):
+    try:
+        return ImageFont.truetype(name, size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+
+def _wrap(draw, text: str, font, max_width: int, max_lines: int) -> list:
+    """Greedy word wrap by rendered width, ellipsizing past max_lines."""
+    lines = []
+    for word in text.split():
+        candidate = f"{lines[-1]} {word}" if lines else word
+        if lines and draw.textlength(candidate, font=font) <= max_width:
+            lines[-1] = candidate
+        else:
+            lines.append(word)
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = lines[-1].rstrip(".,;:") + "…"
+    return lines
+
+
+def _badge(draw, x: int, y: int, text: str, color: str, font) -> int:
+    """Draw a pill badge and return the x position after it."""
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    width = right - left + 40
+    draw.rounded_rectangle((x, y, x + width, y + 56), radius=28, outline=color, width=3)
+    draw.text((x + 20, y + 28), text, fill=color, font=font, anchor="lm")
+    return x + width + 16
+
+
+def render_card(fields: dict) -> bytes:
+    """Draw a card and return it as PNG bytes."""
+    width, height = CARD_SIZE
+    img = Image.new("RGB", CARD_SIZE, BG_COLOR)
+    draw = ImageDraw.Draw(img)
+    draw.rounded_rectangle((40, 40, width - 40, height - 40), radius=32, fill=CARD_COLOR)
+
+    small = _font(FONT_BOLD, 30)
+    draw.text((96, 110), fields["category"].upper(), fill=ACCENT_COLOR, font=small)
+    draw.rectangle((96, 156, 196, 162), fill=ACCENT_COLOR)
+
+    title_font = _font(FONT_BOLD, 64)
+    y = 190
+    for line in _wrap(draw, fields["title"], title_font, width - 192, 3):
+        draw.text((96, y), line, fill=TEXT_COLOR, font=title_font)
+        y += 80
+
+    x = 96
+    for text, css in fields["badges"]:
+        x = _badge(draw, x, 480, text, BADGE_COLORS.get(css, MUTED_COLOR), small)
+
+    draw.text((width - 96, 508), fields.get("site", SITE_NAME), fill=MUTED_COLOR, font=_font(FONT_REGULAR, 26), anchor="rm")
+
+    buf = io.BytesIO()
+    img.save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+def _render_to_cache(job: tuple) -> str:
+    """Process-pool worker: draw one card into the cache."""
+    fields, path = job
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(render_card(fields))
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_social_cards(items: list, dist_dir: Path, workers: int = None, site_name: str = SITE_NAME) -> dict:
+    """Render (or reuse) a card for every item and copy it into dist/.
+
+    Args:
+        items: All items from the database.
+        dist_dir: Output directory; cards go to dist_dir/images/cards/.
+        workers: Process pool size. Defaults to the CPU count; 1 renders inline.
+        site_name: Site name printed on the cards.
+
+    Returns:
+        Dict mapping slug to the card's site-relative URL. Empty when Pillow
+        is not installed.
+    """
+    if Image is None:
+        print("  ⚠ Pillow not installed; skipping social cards")
+        return {}
+
+    cache_dir = get_cache_dir() / "cards"
+    ensure_dir(cache_dir)
+    out_dir = Path(dist_dir) / CARDS_DIR
+    ensure_dir(out_dir)
+
+    cached_paths = {}
+    jobs = {}
+    for item in items:
+        digest = card_hash(item, site_name)
+        path = cache_dir / f"{digest}.png"
+        cached_paths[item["slug"]] = path
+        if not path.exists() and digest not in jobs:
+            jobs[digest] = (card_fields(item, site_name), str(path))
+
+    if jobs:
+        if workers == 1 or len(jobs) == 1:
+            for job in jobs.values():
+                _render_to_cache(job)
+        else:
+            with process_pool(workers) as pool:
+                list(pool.map(_render_to_cache, jobs.values(), chunksize=32))
+
+    cards = {}
+    for slug, path in cached_paths.items():
+        shutil.copyfile(path, out_dir / f"{slug}.png")
+        cards[slug] = card_url(slug)
+
+    print(f"  ✓ Social cards: {len(jobs)} rendered, {len(cards) - len(jobs)} from cache → dist/{CARDS_DIR}/")
+    return cards
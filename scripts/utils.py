@@ -1,10 +1,17 @@
 """
 Shared utilities for the Programmatic SEO Directory.
 """
+import hashlib
 import json
+import multiprocessing
 import os
 import re
+import threading
+import time
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 
 # Project root is one level up from scripts/
@@ -14,10 +21,30 @@ DIST_DIR = PROJECT_ROOT / "dist"
 SRC_DIR = PROJECT_ROOT / "src"
 TEMPLATES_DIR = SRC_DIR / "templates"
 
+# Persistent build state (page history, ledgers, caches). Kept out of dist/
+# so it survives clean builds; CI restores it with actions/cache.
+DEFAULT_CACHE_DIR = PROJECT_ROOT / ".cache"
+
 SITE_URL = os.environ.get("SITE_URL", "https://directory.quickutils.top")
 SITE_NAME = "QuickUtils API Directory"
 SITE_DESCRIPTION = "The Ultimate Directory of Free, Open APIs — searchable, categorized, and always up-to-date."
 
+# Items per category listing page; later items go to category/<slug>/page-N.html
+CATEGORY_PAGE_SIZE = int(os.environ.get("CATEGORY_PAGE_SIZE", "60"))
+
+# Item summaries per page of the static JSON API's data/all-N.json
+DATA_PAGE_SIZE = int(os.environ.get("DATA_PAGE_SIZE", "500"))
+
+# Written by build_site() into the build state dir (see build_state_dir()),
+# read by generate_sitemap() and indexnow_submit
+PAGE_MANIFEST_NAME = "page-manifest.jsonl"
+
+# Written by copy_static_assets() into the build state dir: source path -> fingerprinted path
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+
+# Multi-site configuration (one entry per directory site)
+SITES_CONFIG_PATH = PROJECT_ROOT / "sites.json"
+
 
 def slugify(text: str) -> str:
     """Convert text to a URL-safe slug.
@@ -46,6 +73,9 @@ def slugify(text: str) -> str:
 def load_database(path: Path = None) -> list:
     """Load the database JSON file and return a list of items.
 
+    Pending edits in the database's journal (see journal_path()) are
+    replayed on top of the snapshot.
+
     Args:
         path: Optional path to the database file. Defaults to data/database.json.
 
@@ -65,24 +95,329 @@ def load_database(path: Path = None) -> list:
     if not isinstance(data, list):
         raise ValueError("database.json must contain a JSON array")
 
-    return data
+    return list(_replay_journal(data, path))
+
+
+def iter_database(path: Path = None, chunk_size: int = 1 << 16):
+    """Stream items from the database JSON array one at a time.
+
+    Unlike load_database(), memory use is bounded by the largest single
+    item rather than the whole catalog (plus any pending journal edits,
+    which are replayed as items stream past).
+
+    Args:
+        path: Optional path to the database file. Defaults to data/database.json.
+        chunk_size: Characters read from disk per refill.
+
+    Yields:
+        Item dictionaries in file order.
+
+    Raises:
+        FileNotFoundError: If the database file does not exist.
+        ValueError: If the file is not a JSON array.
+    """
+    if path is None:
+        path = DATA_DIR / "database.json"
+
+    yield from _replay_journal(_iter_snapshot(path, chunk_size), path)
+
+
+def _iter_snapshot(path: Path, chunk_size: int):
+    """Stream items from a database snapshot without applying its journal."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+        started = False
+        while True:
+            # Skip whitespace and separators, refilling the buffer as needed
+            while pos < len(buf) and (buf[pos].isspace() or (started and buf[pos] == ",")):
+                pos += 1
+            if pos == len(buf):
+                if eof:
+                    raise ValueError("database.json ended before the closing ']'")
+                buf, pos = f.read(chunk_size), 0
+                eof = len(buf) < chunk_size
+                continue
+
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("database.json must contain a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more = f.read(chunk_size)
+                eof = len(more) < chunk_size
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield item
+            pos = end
 
 
 def save_database(items: list, path: Path = None) -> None:
     """Save items to the database JSON file with deterministic sorting.
 
+    The file is replaced atomically. A full save supersedes any pending
+    journal edits, so the journal is removed.
+
     Args:
         items: List of item dictionaries.
         path: Optional path. Defaults to data/database.json.
     """
     if path is None:
         path = DATA_DIR / "database.json"
+    path = Path(path)
 
     ensure_dir(path.parent)
+    with _journal_lock(path):
+        _write_snapshot(items, path)
+        journal = journal_path(path)
+        if journal.exists():
+            journal.unlink()
 
-    with open(path, "w", encoding="utf-8") as f:
+
+def _write_snapshot(items, path: Path) -> None:
+    """Atomically replace a database snapshot (write to a temp file, then rename)."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(items, f, indent=2, sort_keys=True, ensure_ascii=False)
         f.write("\n")
+    os.replace(tmp_path, path)
+
+
+# ---------- Catalog journal ----------
+#
+# Small edits to a large catalog are appended to <name>.journal.jsonl next to
+# the database instead of rewriting it. Each line is one operation:
+#
+#   {"op": "insert", "slug": ..., "item": {...}}   add unless the slug exists
+#   {"op": "upsert", "slug": ..., "item": {...}}   add or replace
+#   {"op": "update", "slug": ..., "fields": {...}} merge into an existing item
+#   {"op": "delete", "slug": ...}                  remove if present
+#
+# Every operation sets state rather than adjusting it, so replaying the
+# journal over a snapshot that already contains its effects is harmless;
+# compaction relies on this if interrupted between its two steps.
+#
+# Appends, compaction and full saves hold _journal_lock(), so an append can
+# never land between compaction writing the snapshot and removing the
+# journal. Readers do not lock: they only ever see whole appended lines
+# plus, at worst, a torn final line, which they skip.
+
+JOURNAL_OPS = {"insert", "upsert", "update", "delete"}
+
+
+def journal_path(path: Path = None) -> Path:
+    """Return the journal file belonging to a database file."""
+    if path is None:
+        path = DATA_DIR / "database.json"
+    path = Path(path)
+    return path.with_name(f"{path.stem}.journal.jsonl")
+
+
+@contextmanager
+def _journal_lock(path: Path = None):
+    """Hold an exclusive inter-process lock on a database's journal.
+
+    Uses an OS file lock on <name>.journal.lock, which is released
+    automatically if the holder crashes.
+    """
+    lock_path = journal_path(path).with_suffix(".lock")
+    ensure_dir(lock_path.parent)
+    with open(lock_path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after ~10 seconds; keep waiting
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _trim_torn_tail(journal: Path) -> None:
+    """Cut a journal back to its last newline, dropping a torn final line.
+
+    Without this, the next append would be written onto the end of the torn
+    line, leaving an unparsable line in the middle of the journal.
+    """
+    with open(journal, "r+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        pos = end
+        while pos > 0:
+            step = min(1 << 16, pos)
+            pos -= step
+            f.seek(pos)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                f.truncate(pos + newline + 1)
+                return
+        f.truncate(0)
+
+
+def iter_journal(path: Path = None):
+    """Yield the operations recorded in a database's journal, oldest first.
+
+    A torn final line (from a crash mid-append) is ignored.
+
+    Raises:
+        ValueError: If a line other than the last is not a valid operation.
+    """
+    journal = journal_path(path)
+    if not journal.exists():
+        return
+    with open(journal, "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            if number == len(lines):
+                return
+            raise ValueError(f"{journal.name}:{number} is not valid JSON")
+        if record.get("op") not in JOURNAL_OPS or not record.get("slug"):
+            raise ValueError(f"{journal.name}:{number} is not a valid journal operation")
+        yield record
+
+
+def _apply_ops(item, ops: list):
+    """Apply one slug's journal operations to its snapshot item (or None)."""
+    for op in ops:
+        kind = op["op"]
+        if kind == "delete":
+            item = None
+        elif kind == "upsert" or (kind == "insert" and item is None):
+            item = op["item"]
+        elif kind == "update" and item is not None:
+            item = {**item, **op["fields"]}
+    return item
+
+
+def _replay_journal(items, path: Path):
+    """Yield snapshot items with the journal applied; new items come last."""
+    pending = {}
+    for op in iter_journal(path):
+        pending.setdefault(op["slug"], []).append(op)
+
+    for item in items:
+        slug = item.get("slug")
+        if slug in pending:
+            item = _apply_ops(item, pending.pop(slug))
+            if item is None:
+                continue
+        yield item
+
+    for ops in pending.values():
+        item = _apply_ops(None, ops)
+        if item is not None:
+            yield item
+
+
+def append_journal(ops: list, path: Path = None) -> int:
+    """Durably append operations to a database's journal.
+
+    Args:
+        ops: Operation dicts (see the journal format above).
+        path: Database path. Defaults to data/database.json.
+
+    Returns:
+        Number of operations written.
+
+    Raises:
+        ValueError: If an operation is malformed.
+    """
+    for op in ops:
+        if op.get("op") not in JOURNAL_OPS or not op.get("slug"):
+            raise ValueError(f"Invalid journal operation: {op!r}")
+        if op["op"] in ("insert", "upsert") and not isinstance(op.get("item"), dict):
+            raise ValueError(f"Journal {op['op']} needs an 'item': {op!r}")
+        if op["op"] == "update" and not isinstance(op.get("fields"), dict):
+            raise ValueError(f"Journal update needs 'fields': {op!r}")
+    if not ops:
+        return 0
+
+    journal = journal_path(path)
+    ensure_dir(journal.parent)
+    data = "".join(json.dumps(op, sort_keys=True, ensure_ascii=False) + "\n" for op in ops)
+    with _journal_lock(path):
+        if journal.exists():
+            _trim_torn_tail(journal)
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    return len(ops)
+
+
+def journal_insert(items: list, path: Path = None) -> int:
+    """Journal new items; items whose slug already exists are left alone."""
+    return append_journal([{"op": "insert", "slug": i["slug"], "item": i} for i in items], path)
+
+
+def journal_upsert(items: list, path: Path = None) -> int:
+    """Journal items to add or replace by slug."""
+    return append_journal([{"op": "upsert", "slug": i["slug"], "item": i} for i in items], path)
+
+
+def journal_update(slug: str, fields: dict, path: Path = None) -> int:
+    """Journal a partial update of one item."""
+    return append_journal([{"op": "update", "slug": slug, "fields": fields}], path)
+
+
+def journal_delete(slugs: list, path: Path = None) -> int:
+    """Journal item deletions by slug."""
+    return append_journal([{"op": "delete", "slug": slug} for slug in slugs], path)
+
+
+def compact_database(path: Path = None) -> int:
+    """Fold the journal into the database snapshot.
+
+    Returns:
+        Number of journal operations folded in (0 if there was no journal).
+    """
+    if path is None:
+        path = DATA_DIR / "database.json"
+    path = Path(path)
+    with _journal_lock(path):
+        folded = sum(1 for _ in iter_journal(path))
+        if not folded:
+            return 0
+        # Snapshot first, then drop the journal; replay is idempotent if we stop between
+        _write_snapshot(load_database(path), path)
+        journal_path(path).unlink()
+    return folded
 
 
 def ensure_dir(path: Path) -> None:
@@ -90,6 +425,214 @@ def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+def get_cache_dir() -> Path:
+    """Return the persistent build cache directory, creating it if needed.
+
+    Honors the BUILD_CACHE_DIR environment variable, defaulting to .cache/.
+    """
+    path = Path(os.environ.get("BUILD_CACHE_DIR") or DEFAULT_CACHE_DIR)
+    ensure_dir(path)
+    return path
+
+
+def load_json_state(path: Path, default=None):
+    """Load a JSON state file, returning default if it is missing or corrupt."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def save_json_state(path: Path, data) -> None:
+    """Atomically write a JSON state file (write to a temp file, then rename)."""
+    ensure_dir(path.parent)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def process_pool(workers: int = None) -> ProcessPoolExecutor:
+    """Return a process pool whose workers are spawned, not forked.
+
+    build_sites() runs site builds on threads, and a child forked from a
+    multithreaded process can inherit a lock another thread was holding
+    and deadlock. Spawned workers start clean and re-import their task.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so short
+    bursts are allowed while the long-run rate never exceeds `rate`.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Maximum burst size. Defaults to one token.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available without waiting."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Block until tokens are available and take them.
+
+        Returns:
+            Total seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def load_sites_config(path: Path = None) -> list:
+    """Load the multi-site configuration.
+
+    Each entry describes one directory site and must have 'name', 'site_url'
+    and 'dist_dir'. Relative paths are resolved against the config file's
+    directory. Optional keys include 'indexnow_key' and 'database'.
+
+    Args:
+        path: Path to the config file. Defaults to sites.json in the project root.
+
+    Returns:
+        List of site dicts.
+
+    Raises:
+        FileNotFoundError: If the config file does not exist.
+        ValueError: If the config is not a list of valid site entries.
+    """
+    if path is None:
+        path = SITES_CONFIG_PATH
+    path = Path(path)
+
+    with open(path, "r", encoding="utf-8") as f:
+        sites = json.load(f)
+
+    if not isinstance(sites, list):
+        raise ValueError(f"{path.name} must contain a JSON array of sites")
+
+    base = path.resolve().parent
+    for site in sites:
+        missing = [k for k in ("name", "site_url", "dist_dir") if not site.get(k)]
+        if missing:
+            raise ValueError(f"Site entry {site!r} is missing: {', '.join(missing)}")
+        site["site_url"] = site["site_url"].rstrip("/")
+        for key in ("dist_dir", "database", "src_dir", "templates_dir"):
+            if site.get(key):
+                site[key] = str(base / site[key])
+
+    return sites
+
+
+@dataclass(frozen=True)
+class BuildContext:
+    """Everything that differs between directory sites during a build.
+
+    Build and sitemap functions take a context instead of reading the module
+    globals above, so several sites can be built in one process, even
+    concurrently. Contexts are immutable.
+
+    Args:
+        name: Short site name (e.g., 'tools'); empty for the default site.
+        site_url: Base URL without trailing slash.
+        site_name: Display name used in titles and cards.
+        site_description: Meta description for the homepage.
+        dist_dir: Output directory.
+        src_dir: Static assets directory.
+        templates_dir: Jinja2 templates directory.
+        database: Path to the site's database.json (None = data/database.json).
+        schema: Item schema name or dict (see scripts/schemas.py); None = 'api'.
+        category_page_size: Items per category listing page.
+        data_page_size: Item summaries per data/all-N.json page.
+        assets: Asset manifest from copy_static_assets() ('css/styles.css' ->
+            'css/styles.3fa9c1d2.css'); None until the assets are copied.
+        critical_css: CriticalCss extractor (see scripts/critical_css.py)
+            used to inline per-page-type critical CSS; None renders pages
+            with a plain stylesheet link.
+    """
+
+    name: str
+    site_url: str
+    site_name: str = SITE_NAME
+    site_description: str = SITE_DESCRIPTION
+    dist_dir: Path = DIST_DIR
+    src_dir: Path = SRC_DIR
+    templates_dir: Path = TEMPLATES_DIR
+    database: Path = None
+    schema: object = None
+    category_page_size: int = CATEGORY_PAGE_SIZE
+    data_page_size: int = DATA_PAGE_SIZE
+    assets: dict = field(default=None, compare=False)
+    critical_css: object = field(default=None, compare=False)
+
+    @classmethod
+    def from_site(cls, site: dict) -> "BuildContext":
+        """Create a context from a load_sites_config() entry."""
+        src_dir = Path(site.get("src_dir") or SRC_DIR)
+        return cls(
+            name=site["name"],
+            site_url=site["site_url"].rstrip("/"),
+            site_name=site.get("site_name") or SITE_NAME,
+            site_description=site.get("site_description") or SITE_DESCRIPTION,
+            dist_dir=Path(site["dist_dir"]),
+            src_dir=src_dir,
+            templates_dir=Path(site.get("templates_dir") or src_dir / "templates"),
+            database=Path(site["database"]) if site.get("database") else None,
+            schema=site.get("schema"),
+            category_page_size=int(site.get("category_page_size") or CATEGORY_PAGE_SIZE),
+            data_page_size=int(site.get("data_page_size") or DATA_PAGE_SIZE),
+        )
+
+    @property
+    def cache_dir(self) -> Path:
+        """Per-site persistent state directory inside the build cache."""
+        path = get_cache_dir()
+        if self.name:
+            path = path / "sites" / self.name
+            ensure_dir(path)
+        return path
+
+    def template_globals(self) -> dict:
+        """Site-specific template variables, passed at render time."""
+        return {
+            "site_name": self.site_name,
+            "site_url": self.site_url,
+            "site_description": self.site_description,
+            "asset_manifest": self.assets or {},
+        }
+
+
 def get_categories(items: list) -> dict:
     """Group items by category.
 
@@ -117,3 +660,64 @@ def truncate(text: str, max_length: int = 160) -> str:
     if len(text) <= max_length:
         return text
     return text[: max_length - 3].rsplit(" ", 1)[0] + "..."
+
+
+def hash_content(content) -> str:
+    """Return the SHA-256 hex digest of a str or bytes payload."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def build_state_dir(dist_dir: Path) -> Path:
+    """Return the build cache directory holding a dist directory's manifests.
+
+    Manifests describe the build but are not part of the site, so they are
+    kept out of dist/ (and out of the deploy), keyed by the dist path.
+    """
+    key = hash_content(str(Path(dist_dir).resolve()))[:16]
+    path = get_cache_dir() / "builds" / key
+    ensure_dir(path)
+    return path
+
+
+def page_manifest_path(dist_dir: Path) -> Path:
+    """Return the page manifest file of a dist directory."""
+    return build_state_dir(dist_dir) / PAGE_MANIFEST_NAME
+
+
+def save_page_manifest(records: list, dist_dir: Path) -> Path:
+    """Write the page manifest as JSON lines, one record per generated page.
+
+    Args:
+        records: List of dicts with 'path', 'type' and 'hash' keys.
+        dist_dir: The dist directory the pages were written to.
+
+    Returns:
+        Path to the written manifest file.
+    """
+    path = page_manifest_path(dist_dir)
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, sort_keys=True, ensure_ascii=False))
+            f.write("\n")
+    return path
+
+
+def iter_page_manifest(dist_dir: Path):
+    """Yield page manifest records of dist_dir, one at a time.
+
+    Args:
+        dist_dir: The dist directory the manifest describes.
+
+    Yields:
+        Dicts with 'path', 'type' and 'hash' keys.
+
+    Raises:
+        FileNotFoundError: If no manifest was written to dist_dir.
+    """
+    with open(page_manifest_path(dist_dir), "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
@@ -0,0 +1,130 @@
+/* ==========================================================================
+   QuickUtils API Directory — Category Filter
+   Filters every item of a category (across all of its listing pages) by text
+   and facet selects, using the static data/category/<slug>.json API file
+   written at build time
+   ========================================================================== */
+
+(function () {
+    'use strict';
+
+    const input = document.getElementById('category-search');
+    const grid = document.getElementById('items-grid');
+    const countEl = document.getElementById('visible-count');
+    const noResults = document.getElementById('no-results');
+    const pagination = document.getElementById('pagination');
+    const selects = Array.prototype.slice.call(document.querySelectorAll('.filter-select'));
+    if (!input || !grid || !grid.dataset.itemsUrl || !window.fetch) return;
+
+    const MAX_DESC = 160;
+    const pageCards = Array.prototype.slice.call(grid.children);
+    const pageCount = countEl ? countEl.textContent : '';
+    let payload = null;
+
+    function load() {
+        if (!payload) {
+            payload = fetch(grid.dataset.itemsUrl)
+                .then(function (res) { return res.ok ? res.json() : { items: [] }; })
+                .then(function (data) {
+                    // Item summaries -> add a lowercased haystack once
+                    return data.items.map(function (entry) {
+                        return { entry: entry, text: (entry.title + ' ' + entry.description).toLowerCase() };
+                    });
+                })
+                .catch(function () { return []; });
+        }
+        return payload;
+    }
+
+    // Mirrors truncate() in scripts/utils.py
+    function truncate(text) {
+        if (text.length <= MAX_DESC) return text;
+        const cut = text.slice(0, MAX_DESC - 3);
+        const space = cut.lastIndexOf(' ');
+        return (space > 0 ? cut.slice(0, space) : cut) + '...';
+    }
+
+    function card(entry) {
+        const link = document.createElement('a');
+        link.href = '/api/' + entry.slug + '.html';
+        link.className = 'item-card';
+        link.id = 'item-' + entry.slug;
+
+        const header = document.createElement('div');
+        header.className = 'item-card-header';
+        const title = document.createElement('h3');
+        title.className = 'item-title';
+        title.textContent = entry.title;
+        const category = document.createElement('span');
+        category.className = 'item-category-badge small';
+        category.textContent = grid.dataset.category || '';
+        header.appendChild(title);
+        header.appendChild(category);
+
+        const desc = document.createElement('p');
+        desc.className = 'item-desc';
+        desc.textContent = truncate(entry.description);
+
+        const meta = document.createElement('div');
+        meta.className = 'item-meta';
+        (entry.badges || []).forEach(function (badge) {
+            const span = document.createElement('span');
+            span.className = 'meta-badge ' + badge.css;
+            span.textContent = badge.text;
+            meta.appendChild(span);
+        });
+
+        link.appendChild(header);
+        link.appendChild(desc);
+        link.appendChild(meta);
+        return link;
+    }
+
+    function show(cards, count) {
+        grid.textContent = '';
+        cards.forEach(function (el) { grid.appendChild(el); });
+        if (countEl) countEl.textContent = count;
+        if (noResults) noResults.style.display = cards.length === 0 ? '' : 'none';
+    }
+
+    // Selected facet values as [key, value] pairs
+    function activeFacets() {
+        return selects
+            .filter(function (select) { return select.value; })
+            .map(function (select) { return [select.dataset.facet, select.value]; });
+    }
+
+    function state() {
+        return JSON.stringify([input.value.toLowerCase().trim(), activeFacets()]);
+    }
+
+    function matches(item, query, facets) {
+        const values = item.entry.facets || {};
+        return item.text.indexOf(query) !== -1 && facets.every(function (facet) {
+            return values[facet[0]] === facet[1];
+        });
+    }
+
+    function run() {
+        const query = input.value.toLowerCase().trim();
+        const facets = activeFacets();
+        if (!query && !facets.length) {
+            // Back to the server-rendered page
+            show(pageCards, pageCount);
+            if (pagination) pagination.hidden = false;
+            return;
+        }
+        const current = state();
+        load().then(function (items) {
+            if (state() !== current) return;
+            const found = items.filter(function (item) { return matches(item, query, facets); });
+            show(found.map(function (item) { return card(item.entry); }), found.length);
+            if (pagination) pagination.hidden = true;
+        });
+    }
+
+    input.addEventListener('input', run);
+    selects.forEach(function (select) { select.addEventListener('change', run); });
+    // Start fetching as soon as the user shows intent to filter
+    input.addEventListener('focus', load, { once: true });
+})();
@@ -0,0 +1,176 @@
+/* ==========================================================================
+   QuickUtils API Directory — Homepage Search
+   Queries the prefix-sharded index written by scripts/search_index.py
+   ========================================================================== */
+
+(function () {
+    'use strict';
+
+    const input = document.getElementById('hero-search');
+    const wrapper = document.getElementById('search-wrapper');
+    if (!input || !wrapper || !window.fetch) return;
+
+    const MAX_RESULTS = 8;
+    // Keep in sync with STOPWORDS in scripts/search_index.py
+    const STOPWORDS = new Set(['an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it',
+        'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with', 'your']);
+
+    const shards = new Map();
+    let meta = null;
+    let results = [];
+    let active = -1;
+    let pending = 0;
+
+    const list = document.createElement('ul');
+    list.className = 'search-results';
+    list.id = 'search-results';
+    list.setAttribute('role', 'listbox');
+    list.hidden = true;
+    wrapper.appendChild(list);
+    input.setAttribute('aria-controls', list.id);
+
+    // ---------- Index loading ----------
+    function loadMeta() {
+        if (!meta) {
+            meta = fetch('/search/meta.json')
+                .then(function (res) { return res.ok ? res.json() : null; })
+                .catch(function () { return null; });
+        }
+        return meta;
+    }
+
+    function loadShard(prefix) {
+        if (!shards.has(prefix)) {
+            shards.set(prefix, fetch('/search/' + prefix + '.json')
+                .then(function (res) { return res.ok ? res.json() : null; })
+                .catch(function () { return null; }));
+        }
+        return shards.get(prefix);
+    }
+
+    // Mirrors tokenize() in scripts/search_index.py
+    function tokenize(text, minLength) {
+        const words = text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase().match(/[a-z0-9]+/g) || [];
+        return words.filter(function (w) { return w.length >= minLength && !STOPWORDS.has(w); });
+    }
+
+    // ---------- Matching & ranking ----------
+    // Each query word matches index terms it prefixes; an exact term match
+    // scores in full, a prefix match scores half. Documents must match every
+    // word and are ranked by their summed score.
+    function matchWord(shard, word) {
+        const scores = new Map();
+        if (!shard) return scores;
+        Object.keys(shard.terms).forEach(function (term) {
+            if (term.indexOf(word) !== 0) return;
+            const weight = term === word ? 1 : 0.5;
+            shard.terms[term].forEach(function (posting) {
+                const id = posting[0];
+                scores.set(id, Math.max(scores.get(id) || 0, posting[1] * weight));
+            });
+        });
+        return scores;
+    }
+
+    function search(query) {
+        return loadMeta().then(function (info) {
+            if (!info) return [];
+            const words = tokenize(query, info.min_token);
+            if (!words.length) return [];
+            const available = new Set(info.shards);
+            return Promise.all(words.map(function (word) {
+                const prefix = word.slice(0, info.prefix);
+                return available.has(prefix) ? loadShard(prefix) : Promise.resolve(null);
+            })).then(function (loaded) {
+                let totals = null;
+                const docs = {};
+                words.forEach(function (word, i) {
+                    const scores = matchWord(loaded[i], word);
+                    if (loaded[i]) Object.assign(docs, loaded[i].docs);
+                    if (totals === null) {
+                        totals = scores;
+                        return;
+                    }
+                    totals.forEach(function (score, id) {
+                        if (scores.has(id)) totals.set(id, score + scores.get(id));
+                        else totals.delete(id);
+                    });
+                });
+                return Array.from(totals.entries())
+                    .sort(function (a, b) { return b[1] - a[1] || a[0] - b[0]; })
+                    .slice(0, MAX_RESULTS)
+                    .map(function (entry) {
+                        const doc = docs[entry[0]];
+                        return { slug: doc[0], title: doc[1], category: doc[2] };
+                    });
+            });
+        });
+    }
+
+    // ---------- Rendering ----------
+    function render(found) {
+        results = found;
+        active = -1;
+        list.textContent = '';
+        found.forEach(function (doc, i) {
+            const li = document.createElement('li');
+            li.setAttribute('role', 'option');
+            li.id = 'search-result-' + i;
+            const link = document.createElement('a');
+            link.href = '/api/' + doc.slug + '.html';
+            const title = document.createElement('span');
+            title.className = 'search-result-title';
+            title.textContent = doc.title;
+            const category = document.createElement('span');
+            category.className = 'search-result-category';
+            category.textContent = doc.category;
+            link.appendChild(title);
+            link.appendChild(category);
+            li.appendChild(link);
+            list.appendChild(li);
+        });
+        list.hidden = found.length === 0;
+    }
+
+    function highlight(index) {
+        const items = list.children;
+        if (!items.length) return;
+        active = (index + items.length) % items.length;
+        Array.prototype.forEach.call(items, function (li, i) {
+            li.classList.toggle('active', i === active);
+            li.setAttribute('aria-selected', i === active);
+        });
+        input.setAttribute('aria-activedescendant', items[active].id);
+    }
+
+    function run() {
+        const ticket = ++pending;
+        search(input.value).then(function (found) {
+            // Ignore answers to queries the user has already typed past
+            if (ticket === pending) render(found);
+        });
+    }
+
+    input.addEventListener('input', run);
+    input.addEventListener('keydown', function (e) {
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            highlight(active + (e.key === 'ArrowDown' ? 1 : -1));
+        } else if (e.key === 'Enter' && results.length) {
+            e.preventDefault();
+            window.location.href = '/api/' + results[Math.max(active, 0)].slug + '.html';
+        } else if (e.key === 'Escape') {
+            list.hidden = true;
+        }
+    });
+    document.addEventListener('click', function (e) {
+        if (!wrapper.contains(e.target)) list.hidden = true;
+    });
+
+    // Support the SearchAction URL (/?q=term) advertised in the JSON-LD
+    const query = new URLSearchParams(window.location.search).get('q');
+    if (query) {
+        input.value = query;
+        run();
+    }
+})();
@@ -4,7 +4,9 @@ Shared test fixtures for the Programmatic SEO Directory test suite.
 import json
 import os
 import sys
+import threading
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -13,6 +15,26 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from scripts.replay import LocalHTTPServer
+
+
+@pytest.fixture(autouse=True)
+def isolated_build_cache(tmp_path, monkeypatch):
+    """Point the persistent build cache at a per-test temp directory."""
+    cache_dir = tmp_path / "build-cache"
+    monkeypatch.setenv("BUILD_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def retry_sleep():
+    """Skip HTTP retry backoff and give each test a fresh shared client."""
+    from scripts.http_client import set_client
+
+    with patch("scripts.http_client.time.sleep") as mock_sleep:
+        yield mock_sleep
+    set_client(None)
+
 
 @pytest.fixture
 def sample_items():
@@ -162,6 +184,9 @@ def templates_dir(tmp_path):
         "{% for rel in related_items %}"
         '<a href="/api/{{ rel.slug }}.html">{{ rel.title }}</a>'
         "{% endfor %}"
+        "{% for entry in also_listed %}"
+        '<a class="also-listed" href="{{ entry.url }}">{{ entry.site_name }}</a>'
+        "{% endfor %}"
         "{% endblock %}",
         encoding="utf-8",
     )
@@ -194,3 +219,40 @@ def templates_dir(tmp_path):
     )
 
     return tpl_dir
+
+
+class FakeHTTPServer(LocalHTTPServer):
+    """A local HTTP endpoint that records requests and replays scripted responses.
+
+    Queue responses with respond(status, body, headers); once the queue is
+    empty every request gets the default 200 response.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self._responses = []
+        self._lock = threading.Lock()
+        super().__init__()
+
+    def handle(self, method, path, headers, raw):
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = raw.decode("utf-8", "replace")
+        with self._lock:
+            self.requests.append({"method": method, "path": path, "headers": dict(headers), "body": body})
+            status, payload, extra = self._responses.pop(0) if self._responses else (200, {}, {})
+        return status, json.dumps(payload).encode("utf-8"), {"Content-Type": "application/json", **extra}
+
+    def respond(self, status: int = 200, body=None, headers: dict = None):
+        """Queue a response for the next unanswered request."""
+        with self._lock:
+            self._responses.append((status, body if body is not None else {}, headers or {}))
+
+
+@pytest.fixture
+def fake_http_server():
+    """A local fake HTTP API for integration tests (no network access)."""
+    server = FakeHTTPServer()
+    yield server
+    server.close()
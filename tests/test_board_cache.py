@@ -0,0 +1,89 @@
+"""Tests for scripts/board_cache.py"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from scripts.board_cache import BOARD_CACHE_NAME, BoardCache, BoardListingError, find_board, iter_boards
+
+
+def _pages(*pages):
+    """A fetch_page stub serving pages keyed by bookmark."""
+    by_bookmark = {}
+    for i, items in enumerate(pages):
+        by_bookmark[None if i == 0 else f"b{i}"] = {
+            "items": items,
+            "bookmark": f"b{i + 1}" if i + 1 < len(pages) else None,
+        }
+    return MagicMock(side_effect=lambda bookmark: by_bookmark[bookmark])
+
+
+class TestBoardCache:
+    """Test the board name -> ID cache."""
+
+    def test_round_trip_is_case_insensitive(self, tmp_path):
+        cache = BoardCache(tmp_path / "boards.json")
+        cache.set("Web Tools", "b1")
+        cache.save()
+        assert BoardCache(tmp_path / "boards.json").get("web tools") == "b1"
+
+    def test_entries_expire(self, tmp_path):
+        cache = BoardCache(tmp_path / "boards.json", ttl=60)
+        with patch("scripts.board_cache.time.time", return_value=1000):
+            cache.set("A", "b1")
+        with patch("scripts.board_cache.time.time", return_value=1059):
+            assert cache.get("A") == "b1"
+        with patch("scripts.board_cache.time.time", return_value=1061):
+            assert cache.get("A") is None
+
+    def test_defaults_to_build_cache(self, isolated_build_cache):
+        cache = BoardCache()
+        cache.set("A", "b1")
+        cache.save()
+        assert (isolated_build_cache / BOARD_CACHE_NAME).exists()
+
+
+class TestIterBoards:
+    """Test bookmark pagination."""
+
+    def test_follows_bookmarks(self):
+        fetch = _pages([{"id": "1", "name": "A"}], [{"id": "2", "name": "B"}], [{"id": "3", "name": "C"}])
+        assert [b["id"] for b in iter_boards(fetch)] == ["1", "2", "3"]
+        assert fetch.call_count == 3
+
+    def test_raises_on_error(self):
+        with pytest.raises(BoardListingError):
+            list(iter_boards(lambda bookmark: None))
+
+    def test_stops_on_repeated_bookmark(self):
+        fetch = MagicMock(return_value={"items": [{"id": "1", "name": "A"}], "bookmark": "same"})
+        assert len(list(iter_boards(fetch))) == 2
+        assert fetch.call_count == 2
+
+
+class TestFindBoard:
+    """Test cached board resolution."""
+
+    def test_finds_board_on_later_page(self, tmp_path):
+        cache = BoardCache(tmp_path / "boards.json")
+        fetch = _pages([{"id": "1", "name": "A"}], [{"id": "2", "name": "Target"}])
+        assert find_board("target", fetch, cache) == "2"
+        # Every board seen is cached
+        assert cache.get("A") == "1"
+
+    def test_cache_hit_skips_api(self, tmp_path):
+        cache = BoardCache(tmp_path / "boards.json")
+        cache.set("Target", "2")
+        fetch = MagicMock()
+        assert find_board("Target", fetch, cache) == "2"
+        fetch.assert_not_called()
+
+    def test_missing_board(self, tmp_path):
+        cache = BoardCache(tmp_path / "boards.json")
+        assert find_board("Nope", _pages([{"id": "1", "name": "A"}]), cache) is None
+
+    def test_incomplete_listing_raises_but_caches_seen_boards(self, tmp_path):
+        cache = BoardCache(tmp_path / "boards.json")
+        fetch = MagicMock(side_effect=[{"items": [{"id": "1", "name": "A"}], "bookmark": "b1"}, None])
+        with pytest.raises(BoardListingError):
+            find_board("Target", fetch, cache)
+        assert BoardCache(tmp_path / "boards.json").get("A") == "1"
@@ -1,4 +1,5 @@
 """Tests for scripts/build_directory.py"""
+import json
 import shutil
 from pathlib import Path
 from unittest.mock import patch
@@ -8,13 +9,29 @@ import pytest
 from scripts.build_directory import (
     build_404_page,
     build_category_pages,
+    build_data_index,
     build_index_page,
     build_item_pages,
     build_site,
+    build_sites,
+    category_page_path,
     copy_static_assets,
     create_jinja_env,
+    fingerprint_name,
+    main,
+    page_links,
+    print_build_report,
+    render_page,
+)
+from scripts.critical_css import CriticalCss
+from scripts.utils import (
+    BuildContext,
+    build_state_dir,
+    get_categories,
+    hash_content,
+    iter_page_manifest,
+    load_database,
 )
-from scripts.utils import get_categories
 
 
 class TestCreateJinjaEnv:
@@ -119,6 +136,111 @@ class TestBuildCategoryPages:
         assert "Dog API" in content
         assert "Cat Facts" in content
 
+    def test_paginates_large_categories(self, tmp_path, templates_dir, sample_items):
+        dist_dir = tmp_path / "dist"
+        ctx = BuildContext(name="", site_url="https://test.com", dist_dir=dist_dir,
+                           templates_dir=templates_dir, category_page_size=1)
+        manifest = []
+
+        build_category_pages(create_jinja_env(ctx), get_categories(sample_items), manifest, ctx)
+
+        first = (dist_dir / "category" / "animals.html").read_text(encoding="utf-8")
+        second = (dist_dir / "category" / "animals" / "page-2.html").read_text(encoding="utf-8")
+        assert ("Dog API" in first) != ("Dog API" in second)
+        assert ("Cat Facts" in first) != ("Cat Facts" in second)
+        assert not (dist_dir / "category" / "animals" / "page-3.html").exists()
+        assert "category/animals/page-2.html" in {record["path"] for record in manifest}
+
+    def test_writes_filter_payload(self, tmp_path, templates_dir, sample_items):
+        dist_dir = tmp_path / "dist"
+        ctx = BuildContext(name="", site_url="https://test.com", dist_dir=dist_dir,
+                           templates_dir=templates_dir, category_page_size=1)
+
+        build_category_pages(create_jinja_env(ctx), get_categories(sample_items), ctx=ctx)
+
+        # The filter searches the static API file; no separate payload is written
+        assert not (dist_dir / "category" / "animals.json").exists()
+
+        payload = json.loads((dist_dir / "data" / "category" / "animals.json").read_text(encoding="utf-8"))
+        assert sorted(entry["slug"] for entry in payload["items"]) == ["cat-facts", "dog-api"]
+        entry = payload["items"][0]
+        assert entry["description"]
+        assert {"text": "🔓 No Auth", "css": "badge-free"} in entry["badges"]
+        assert entry["facets"] == {"auth": "None", "https": "true", "cors": "yes"}
+
+
+class TestStaticDataApi:
+    """Test the data/ JSON mirror written alongside the HTML pages."""
+
+    def _ctx(self, tmp_path, templates_dir, **kwargs):
+        return BuildContext(name="", site_url="https://test.com", dist_dir=tmp_path / "dist",
+                            templates_dir=templates_dir, **kwargs)
+
+    def test_item_records(self, tmp_path, templates_dir, sample_items):
+        ctx = self._ctx(tmp_path, templates_dir)
+        manifest = []
+
+        build_item_pages(create_jinja_env(ctx), sample_items, get_categories(sample_items), manifest, ctx=ctx)
+
+        record = json.loads((ctx.dist_dir / "data" / "api" / "dog-api.json").read_text(encoding="utf-8"))
+        assert record["title"] == "Dog API"
+        assert record["url"] == "https://dog.ceo/dog-api/"
+        assert record["page_url"] == "https://test.com/api/dog-api.html"
+        assert "view" not in record
+        types = {r["path"]: r["type"] for r in manifest}
+        assert types["data/api/dog-api.json"] == "data"
+        assert types["api/dog-api.html"] == "api"
+
+    def test_category_summaries(self, tmp_path, templates_dir, sample_items):
+        ctx = self._ctx(tmp_path, templates_dir, category_page_size=1)
+
+        build_category_pages(create_jinja_env(ctx), get_categories(sample_items), ctx=ctx)
+
+        payload = json.loads((ctx.dist_dir / "data" / "category" / "animals.json").read_text(encoding="utf-8"))
+        assert payload["name"] == "Animals"
+        assert payload["count"] == 2
+        # Every item, not just the first listing page
+        assert [item["slug"] for item in payload["items"]] == ["dog-api", "cat-facts"]
+        assert payload["items"][0]["data_url"] == "https://test.com/data/api/dog-api.json"
+
+    def test_paginated_listing(self, tmp_path, templates_dir, sample_items):
+        ctx = self._ctx(tmp_path, templates_dir, data_page_size=2)
+        manifest = []
+
+        build_data_index(sample_items, manifest, ctx)
+
+        pages = sorted(r["path"] for r in manifest)
+        expected = -(-len(sample_items) // 2)
+        assert pages == sorted(f"data/all-{n}.json" for n in range(1, expected + 1))
+        first = json.loads((ctx.dist_dir / "data" / "all-1.json").read_text(encoding="utf-8"))
+        assert first["total"] == len(sample_items)
+        assert first["pages"] == expected
+        assert first["prev_url"] is None
+        assert first["next_url"] == "https://test.com/data/all-2.json"
+        assert [item["slug"] for item in first["items"]] == [item["slug"] for item in sample_items[:2]]
+        last = json.loads((ctx.dist_dir / "data" / f"all-{expected}.json").read_text(encoding="utf-8"))
+        assert last["next_url"] is None
+
+    def test_empty_listing_has_one_page(self, tmp_path, templates_dir):
+        ctx = self._ctx(tmp_path, templates_dir)
+        build_data_index([], ctx=ctx)
+        payload = json.loads((ctx.dist_dir / "data" / "all-1.json").read_text(encoding="utf-8"))
+        assert payload["items"] == [] and payload["pages"] == 1
+
+
+class TestPageLinks:
+    """Test the pagination bar page numbers."""
+
+    def test_small_count_lists_every_page(self):
+        assert page_links(2, 3) == [1, 2, 3]
+
+    def test_gaps_around_window(self):
+        assert page_links(10, 20) == [1, None, 8, 9, 10, 11, 12, None, 20]
+
+    def test_page_paths(self):
+        assert category_page_path("animals", 1) == "category/animals.html"
+        assert category_page_path("animals", 3) == "category/animals/page-3.html"
+
 
 class TestBuildIndexPage:
     """Test homepage generation."""
@@ -193,13 +315,113 @@ class TestCopyStaticAssets:
 
         css_dir = src_dir / "css"
         css_dir.mkdir(parents=True)
-        (css_dir / "styles.css").write_text("body{}", encoding="utf-8")
+        (css_dir / "print.css").write_text("body{}", encoding="utf-8")
 
         with patch("scripts.build_directory.SRC_DIR", src_dir), \
              patch("scripts.build_directory.DIST_DIR", dist_dir):
-            copy_static_assets()
+            manifest = copy_static_assets()
+
+        fingerprinted = manifest["css/print.css"]
+        assert fingerprinted == f"css/print.{hash_content(b'body{}')[:8]}.css"
+        assert (dist_dir / fingerprinted).read_text(encoding="utf-8") == "body{}"
+        assert not (dist_dir / "css" / "print.css").exists()
+        assert json.loads((build_state_dir(dist_dir) / "asset-manifest.json").read_text(encoding="utf-8")) == manifest
+
+    def test_images_keep_their_names(self, tmp_path):
+        src_dir = tmp_path / "src"
+        dist_dir = tmp_path / "dist"
+        (src_dir / "images").mkdir(parents=True)
+        (src_dir / "images" / "logo.svg").write_text("<svg/>", encoding="utf-8")
+        (src_dir / "images" / "og-image.png").write_bytes(b"png")
 
-        assert (dist_dir / "css" / "styles.css").exists()
+        manifest = copy_static_assets(BuildContext(name="", site_url="https://t.test", src_dir=src_dir, dist_dir=dist_dir))
+
+        assert manifest == {}
+        assert (dist_dir / "images" / "logo.svg").exists()
+        # Raster images are written by optimize_images() instead
+        assert not (dist_dir / "images" / "og-image.png").exists()
+
+    def test_unchanged_content_keeps_fingerprint(self, tmp_path):
+        src_dir = tmp_path / "src"
+        (src_dir / "js").mkdir(parents=True)
+        (src_dir / "js" / "main.js").write_text("a()", encoding="utf-8")
+        ctx = BuildContext(name="", site_url="https://t.test", src_dir=src_dir, dist_dir=tmp_path / "dist")
+
+        first = copy_static_assets(ctx)
+        assert copy_static_assets(ctx) == first
+        (src_dir / "js" / "main.js").write_text("b()", encoding="utf-8")
+        assert copy_static_assets(ctx) != first
+
+
+class TestBundles:
+    """Test minified asset bundles and critical CSS rendering."""
+
+    def test_builds_bundles(self, tmp_path):
+        src_dir = tmp_path / "src"
+        (src_dir / "css").mkdir(parents=True)
+        (src_dir / "js").mkdir()
+        (src_dir / "css" / "styles.css").write_text("/* theme */\nbody {\n    margin: 0;\n}\n", encoding="utf-8")
+        js = "/* menu */ const html = `\n  // not a comment\n`;\n"
+        (src_dir / "js" / "main.js").write_text(js, encoding="utf-8")
+        ctx = BuildContext(name="", site_url="https://t.test", src_dir=src_dir, dist_dir=tmp_path / "dist")
+
+        manifest = copy_static_assets(ctx)
+
+        assert (ctx.dist_dir / manifest["css/bundle.css"]).read_text(encoding="utf-8") == "body{margin:0}"
+        # JavaScript is bundled as written
+        assert (ctx.dist_dir / manifest["js/bundle.js"]).read_text(encoding="utf-8") == js
+
+    def test_bundle_sources_are_not_published_separately(self, tmp_path):
+        src_dir = tmp_path / "src"
+        (src_dir / "js").mkdir(parents=True)
+        (src_dir / "js" / "main.js").write_text("a()", encoding="utf-8")
+        (src_dir / "js" / "search.js").write_text("b()", encoding="utf-8")
+        ctx = BuildContext(name="", site_url="https://t.test", src_dir=src_dir, dist_dir=tmp_path / "dist")
+
+        manifest = copy_static_assets(ctx)
+
+        assert set(manifest) == {"js/bundle.js", "js/search.js"}
+        assert sorted(p.name for p in (ctx.dist_dir / "js").iterdir()) == sorted(
+            [manifest["js/bundle.js"].split("/")[1], manifest["js/search.js"].split("/")[1]]
+        )
+
+    def test_render_page_samples_each_type_once(self, tmp_path, templates_dir):
+        css = "body{margin:0}.used{color:red}.unused{color:blue}"
+        ctx = BuildContext(name="", site_url="https://t.test", templates_dir=templates_dir,
+                           critical_css=CriticalCss(css, templates_dir, tmp_path / "critical"))
+        template = create_jinja_env(ctx).from_string(
+            '<style>{{ critical_css }}</style><body><p class="{{ cls }}"></p></body>'
+        )
+
+        with patch.object(ctx.critical_css, "extract", wraps=ctx.critical_css.extract) as spy:
+            first = render_page(template, "api", ctx, cls="used")
+            second = render_page(template, "api", ctx, cls="other")
+
+        assert spy.call_count == 1
+        assert ".used{color:red}" in first and ".unused" not in first
+        assert second.startswith(first[:first.index("</style>")])
+
+    def test_render_page_without_critical_css(self, templates_dir):
+        ctx = BuildContext(name="", site_url="https://t.test", templates_dir=templates_dir)
+        template = create_jinja_env(ctx).from_string("[{{ critical_css }}]")
+        assert render_page(template, "api", ctx) == "[]"
+
+
+class TestAssetUrls:
+    """Test fingerprinted names and the asset_url() template global."""
+
+    def test_fingerprint_name(self):
+        digest = hash_content(b"x")[:8]
+        assert fingerprint_name("css/styles.css", b"x") == f"css/styles.{digest}.css"
+        assert fingerprint_name("js/vendor/lib.min.js", b"x") == f"js/vendor/lib.min.{digest}.js"
+        assert fingerprint_name("js/LICENSE", b"x") == f"js/LICENSE.{digest}"
+
+    def test_asset_url(self, templates_dir):
+        env = create_jinja_env(BuildContext(name="", site_url="https://t.test", templates_dir=templates_dir))
+        tpl = env.from_string("{{ asset_url('css/styles.css') }} {{ asset_url('/js/main.js') }}")
+
+        assert tpl.render() == "/css/styles.css /js/main.js"
+        assert tpl.render(asset_manifest={"css/styles.css": "css/styles.abc.css"}) == "/css/styles.abc.css /js/main.js"
 
     def test_copies_ads_txt(self, tmp_path):
         src_dir = tmp_path / "src"
@@ -245,6 +467,31 @@ class TestBuildSite:
         assert (dist_dir / "api").is_dir()
         assert (dist_dir / "category").is_dir()
 
+    def test_writes_page_manifest(self, tmp_path, templates_dir, sample_database_path, sample_items):
+        dist_dir = tmp_path / "dist"
+
+        with patch("scripts.build_directory.TEMPLATES_DIR", templates_dir), \
+             patch("scripts.build_directory.DIST_DIR", dist_dir), \
+             patch("scripts.build_directory.SRC_DIR", templates_dir.parent):
+            build_site(sample_database_path)
+
+        records = list(iter_page_manifest(dist_dir))
+        paths = {r["path"] for r in records}
+        assert "index.html" in paths
+        assert "404.html" in paths
+        assert "category/animals.html" in paths
+        assert all(f"api/{item['slug']}.html" in paths for item in sample_items)
+        assert all(f"data/api/{item['slug']}.json" in paths for item in sample_items)
+        assert "data/all-1.json" in paths
+
+        # Hashes match the bytes actually written
+        for record in records:
+            written = (dist_dir / record["path"]).read_text(encoding="utf-8")
+            assert record["hash"] == hash_content(written)
+
+        # Build manifests stay out of the deployed site
+        assert not list(dist_dir.glob("*manifest*"))
+
     def test_empty_database(self, tmp_path, templates_dir):
         dist_dir = tmp_path / "dist"
         empty_db = tmp_path / "empty.json"
@@ -270,3 +517,138 @@ class TestBuildSite:
             build_site(sample_database_path)
 
         assert not old_file.exists()
+
+    def test_returns_report(self, tmp_path, templates_dir, sample_database_path, sample_items):
+        with patch("scripts.build_directory.TEMPLATES_DIR", templates_dir), \
+             patch("scripts.build_directory.DIST_DIR", tmp_path / "dist"), \
+             patch("scripts.build_directory.SRC_DIR", templates_dir.parent):
+            report = build_site(sample_database_path)
+
+        assert report["items"] == len(sample_items)
+        records = list(iter_page_manifest(tmp_path / "dist"))
+        assert report["pages"] == sum(1 for r in records if r["type"] != "data")
+        assert report["data_files"] == sum(1 for r in records if r["type"] == "data") > 0
+        assert set(report["timings"]) == {"load", "assets", "images", "cards", "pages", "search", "manifest"}
+
+
+def _context(tmp_path, templates_dir, database, name):
+    return BuildContext(
+        name=name,
+        site_url=f"https://{name}.test",
+        site_name=f"{name.title()} Directory",
+        dist_dir=tmp_path / name / "dist",
+        src_dir=templates_dir.parent,
+        templates_dir=templates_dir,
+        database=database,
+    )
+
+
+class TestBuildSites:
+    """Test building several sites in one run."""
+
+    def test_builds_each_site_with_its_settings(self, tmp_path, templates_dir, sample_database_path):
+        contexts = [_context(tmp_path, templates_dir, sample_database_path, name) for name in ("alpha", "beta")]
+
+        with patch("scripts.build_directory.create_jinja_env", wraps=create_jinja_env) as spy:
+            reports = build_sites(contexts)
+
+        # One shared environment for the shared templates directory
+        assert spy.call_count == 1
+        assert [r["site"] for r in reports] == ["alpha", "beta"]
+        for ctx in contexts:
+            index = (ctx.dist_dir / "index.html").read_text(encoding="utf-8")
+            assert ctx.site_url in index
+            assert ctx.site_name in index
+            assert (ctx.dist_dir / "sitemap_index.xml").exists()
+            assert ctx.site_url in (ctx.dist_dir / "sitemap.xml").read_text(encoding="utf-8")
+            assert (ctx.cache_dir / "page-history.json").exists()
+        assert "alpha.test" not in (contexts[1].dist_dir / "index.html").read_text(encoding="utf-8")
+
+    def test_sites_build_concurrently(self, tmp_path, templates_dir, sample_database_path):
+        import threading
+
+        contexts = [_context(tmp_path, templates_dir, sample_database_path, name) for name in ("alpha", "beta")]
+        barrier = threading.Barrier(2, timeout=5)
+
+        def load(path):
+            barrier.wait()  # Deadlocks unless both sites build at once
+            return load_database(path)
+
+        with patch("scripts.build_directory.load_database", side_effect=load):
+            reports = build_sites(contexts, sitemaps=False)
+        assert all(reports)
+        assert "sitemap" not in reports[0]["timings"]
+
+    def test_skipped_site_reports_none(self, tmp_path, templates_dir, sample_database_path):
+        empty = tmp_path / "empty.json"
+        empty.write_text("[]", encoding="utf-8")
+        reports = build_sites([
+            _context(tmp_path, templates_dir, sample_database_path, "alpha"),
+            _context(tmp_path, templates_dir, empty, "beta"),
+        ])
+        assert reports[0] is not None
+        assert reports[1] is None
+
+    def test_uses_site_schema(self, tmp_path, templates_dir, sample_database_path):
+        from dataclasses import replace
+
+        ctx = replace(_context(tmp_path, templates_dir, sample_database_path, "alpha"), schema="tools")
+        build_sites([ctx], sitemaps=False)
+
+        html = (ctx.dist_dir / "category" / "animals.html").read_text(encoding="utf-8")
+        assert "Animals Tools - Free &amp; Open" in html
+
+    def test_links_items_listed_on_other_sites(self, tmp_path, templates_dir, sample_database_path):
+        contexts = [_context(tmp_path, templates_dir, sample_database_path, name) for name in ("alpha", "beta")]
+        build_sites(contexts, sitemaps=False)
+
+        html = (contexts[0].dist_dir / "api" / "dog-api.html").read_text(encoding="utf-8")
+        assert '<a class=also-listed href=https://beta.test/api/dog-api.html>Beta Directory</a>' in html
+        assert "also-listed href=https://alpha.test" not in html
+
+    def test_single_site_build_uses_saved_entity_index(self, tmp_path, templates_dir, sample_database_path):
+        from scripts.entity_index import build_entity_index
+
+        alpha, beta = (_context(tmp_path, templates_dir, sample_database_path, name) for name in ("alpha", "beta"))
+        build_entity_index([alpha, beta])
+
+        with patch("scripts.build_directory.load_database", side_effect=load_database) as spy:
+            build_site(ctx=alpha)
+        spy.assert_called_once()  # Only alpha's own database
+        html = (alpha.dist_dir / "api" / "dog-api.html").read_text(encoding="utf-8")
+        assert "https://beta.test/api/dog-api.html" in html
+
+    def test_print_build_report(self, capsys):
+        print_build_report([{"site": "alpha", "pages": 3, "seconds": 1.5, "timings": {"pages": 1.5}}, None], 2.0)
+        out = capsys.readouterr().out
+        assert "alpha: 3 pages in 1.50s (pages 1.50s)" in out
+        assert "Total wall time: 2.00s" in out
+
+    def test_main_with_config(self, tmp_path, templates_dir, sample_database_path, capsys):
+        import json
+
+        config = tmp_path / "sites.json"
+        config.write_text(json.dumps([
+            {"name": "alpha", "site_url": "https://alpha.test", "dist_dir": "alpha-dist",
+             "database": str(sample_database_path), "src_dir": str(templates_dir.parent)},
+        ]), encoding="utf-8")
+
+        with patch("sys.argv", ["build_directory", "--config", str(config)]):
+            main()
+
+        assert (tmp_path / "alpha-dist" / "index.html").exists()
+        assert "alpha:" in capsys.readouterr().out
+
+    def test_main_exits_when_a_site_fails(self, tmp_path, templates_dir):
+        import json
+
+        empty = tmp_path / "empty.json"
+        empty.write_text("[]", encoding="utf-8")
+        config = tmp_path / "sites.json"
+        config.write_text(json.dumps([
+            {"name": "alpha", "site_url": "https://alpha.test", "dist_dir": "alpha-dist",
+             "database": str(empty), "src_dir": str(templates_dir.parent)},
+        ]), encoding="utf-8")
+
+        with patch("sys.argv", ["build_directory", "--config", str(config)]), pytest.raises(SystemExit):
+            main()
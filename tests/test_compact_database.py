@@ -0,0 +1,22 @@
+"""Tests for scripts/compact_database.py"""
+from unittest.mock import patch
+
+from scripts.compact_database import main
+from scripts.utils import journal_delete, journal_path, load_database
+
+
+def test_compacts_given_databases(sample_database_path, capsys):
+    journal_delete(["dog-api"], sample_database_path)
+
+    with patch("sys.argv", ["compact_database", str(sample_database_path)]):
+        main()
+
+    assert not journal_path(sample_database_path).exists()
+    assert "dog-api" not in {i["slug"] for i in load_database(sample_database_path)}
+    assert "folded 1 journal operations" in capsys.readouterr().out
+
+
+def test_defaults_to_project_database(tmp_path, capsys):
+    with patch("scripts.compact_database.DATA_DIR", tmp_path), patch("sys.argv", ["compact_database"]):
+        main()
+    assert "no pending journal edits" in capsys.readouterr().out
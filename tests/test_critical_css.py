@@ -0,0 +1,103 @@
+"""Tests for scripts/critical_css.py"""
+from scripts.critical_css import (
+    CriticalCss,
+    extract_critical,
+    html_tokens,
+    minify_css,
+    parse_css,
+    selector_used,
+)
+
+CSS = """
+/* Design tokens */
+:root { --accent: #6c63ff; }
+body { margin: 0; }
+.hero { animation: fadeIn 1s; }
+.unused-card > .title { color: red; }
+.btn:hover, .missing { color: var(--accent); }
+[data-theme="light"] .hero { background: white; }
+@media (max-width: 768px) {
+    .hero { padding: 0; }
+    .sidebar { display: none; }
+}
+@media print { .sidebar { display: none; } }
+@keyframes fadeIn { from { opacity: 0; } to { opacity: 1; } }
+@keyframes spin { to { transform: rotate(360deg); } }
+@font-face { font-family: "Local"; src: url(local.woff2); }
+"""
+
+HTML = '<body><section class="hero" id="hero"><a class="btn primary">Go</a></section></body>'
+
+
+class TestMinifyCss:
+    """Test parsing and minification."""
+
+    def test_strips_comments_and_whitespace(self):
+        assert minify_css("/* c */ a > b ,  .c { color : red ;  margin: 0 auto ; }") == "a>b,.c{color:red;margin:0 auto}"
+
+    def test_keeps_strings_intact(self):
+        assert minify_css("a::after { content: 'a: b ;  c'; }") == "a::after{content:'a: b ;  c'}"
+
+    def test_nested_groups_and_statements(self):
+        css = '@import url(x.css); @media (min-width: 1px) { a { color: red; } }'
+        assert minify_css(css) == "@import url(x.css);@media (min-width: 1px){a{color:red}}"
+
+    def test_parse_node_kinds(self):
+        kinds = [node[0] for node in parse_css(CSS)]
+        assert kinds.count("group") == 2
+        assert kinds.count("at") == 3
+
+
+class TestExtract:
+    """Test selecting the rules a page uses."""
+
+    def test_html_tokens(self):
+        tokens = html_tokens(HTML + "<p class=lead>")
+        assert {"body", "section", "a", "p", "hero", "btn", "primary", "lead"} <= tokens
+
+    def test_selector_used(self):
+        used = {"hero", "btn", "body"}
+        assert selector_used(".btn:hover, .missing", used)
+        assert selector_used('[data-theme="light"] .hero', used)
+        assert selector_used(":root", used)
+        assert not selector_used(".unused-card > .title", used)
+
+    def test_extract_critical(self):
+        css = extract_critical(parse_css(CSS), html_tokens(HTML))
+
+        assert ":root{--accent:#6c63ff}" in css
+        assert ".btn:hover,.missing{" in css
+        assert "unused-card" not in css
+        assert "@media (max-width: 768px){.hero{padding:0}}" in css
+        assert "sidebar" not in css and "@media print" not in css
+        assert "@keyframes fadeIn" in css
+        assert "@keyframes spin" not in css
+        assert "@font-face" in css
+
+
+class TestCriticalCss:
+    """Test the per-page-type cache."""
+
+    def test_extracts_once_and_persists(self, tmp_path):
+        templates = tmp_path / "templates"
+        templates.mkdir()
+        (templates / "item.html").write_text('<div class="sidebar"></div>', encoding="utf-8")
+
+        critical = CriticalCss(CSS, templates, tmp_path / "cache")
+        assert critical.get("api") is None
+        css = critical.extract("api", HTML, ("item.html",))
+        # Words in the page's templates count as used
+        assert ".sidebar{display:none}" in css
+
+        reloaded = CriticalCss(CSS, templates, tmp_path / "cache")
+        assert reloaded.get("api") == css
+        assert reloaded.get("index") is None
+
+    def test_template_change_invalidates(self, tmp_path):
+        templates = tmp_path / "templates"
+        templates.mkdir()
+        (templates / "base.html").write_text("<body></body>", encoding="utf-8")
+        CriticalCss(CSS, templates, tmp_path / "cache").extract("api", HTML)
+
+        (templates / "base.html").write_text("<body><main></main></body>", encoding="utf-8")
+        assert CriticalCss(CSS, templates, tmp_path / "cache").get("api") is None
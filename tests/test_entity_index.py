@@ -0,0 +1,105 @@
+"""Tests for scripts/entity_index.py"""
+import json
+from unittest.mock import patch
+
+import pytest
+
+from scripts.entity_index import EntityIndex, build_entity_index, entity_keys, main, normalize_url
+from scripts.utils import BuildContext
+
+
+class TestNormalizeUrl:
+    """Test URL normalization."""
+
+    @pytest.mark.parametrize("url", [
+        "https://github.com/VideoLAN/vlc",
+        "http://www.github.com/videolan/vlc/",
+        "https://github.com/videolan/vlc?tab=readme#top",
+        "github.com/videolan/vlc",
+    ])
+    def test_equivalent_urls(self, url):
+        assert normalize_url(url) == "github.com/videolan/vlc"
+
+    def test_no_host(self):
+        assert normalize_url("") is None
+        assert normalize_url(None) is None
+        assert normalize_url("https://") is None
+
+    def test_entity_keys(self):
+        keys = entity_keys({"slug": "vlc", "url": "https://videolan.org/", "github_repo": "https://github.com/videolan/vlc"})
+        assert keys == {"slug:vlc", "url:videolan.org", "url:github.com/videolan/vlc"}
+
+
+def _site(tmp_path, name, items):
+    db = tmp_path / f"{name}.json"
+    db.write_text(json.dumps(items), encoding="utf-8")
+    return BuildContext(name=name, site_url=f"https://{name}.test", site_name=name.title(), database=db)
+
+
+@pytest.fixture
+def contexts(tmp_path):
+    return [
+        _site(tmp_path, "api", [
+            {"slug": "gh-api", "title": "GitHub API", "url": "https://api.github.com/"},
+            {"slug": "dog-api", "title": "Dog API", "url": "https://dog.ceo/dog-api/"},
+        ]),
+        _site(tmp_path, "opensource", [
+            {"slug": "dogs", "title": "Dogs", "url": "https://example.org", "github_repo": "https://dog.ceo/dog-api"},
+            {"slug": "only-here", "title": "Only Here", "url": "https://only.test/"},
+        ]),
+        _site(tmp_path, "tools", [
+            {"slug": "dog-api", "title": "Dog Tool", "url": "https://other.test/"},
+        ]),
+    ]
+
+
+class TestEntityIndex:
+    """Test building and querying the cross-site index."""
+
+    def test_keeps_only_shared_keys(self, contexts):
+        index = EntityIndex.build(contexts)
+        assert set(index.entries) == {"url:dog.ceo/dog-api", "slug:dog-api"}
+        assert index.sites["https://api.test"] == "Api"
+
+    def test_also_listed_excludes_own_site(self, contexts):
+        index = EntityIndex.build(contexts)
+        item = {"slug": "dog-api", "url": "https://dog.ceo/dog-api"}
+        listed = index.also_listed("https://api.test", item)
+        assert listed == [
+            {"site_name": "Opensource", "url": "https://opensource.test/api/dogs.html", "title": "Dogs"},
+            {"site_name": "Tools", "url": "https://tools.test/api/dog-api.html", "title": "Dog Tool"},
+        ]
+        assert index.also_listed("https://api.test", {"slug": "gh-api", "url": "https://api.github.com"}) == []
+
+    def test_duplicates(self, contexts):
+        groups = EntityIndex.build(contexts).duplicates()
+        assert groups[(("https://api.test", "dog-api"), ("https://opensource.test", "dogs"))] == ["url:dog.ceo/dog-api"]
+        assert groups[(("https://api.test", "dog-api"), ("https://tools.test", "dog-api"))] == ["slug:dog-api"]
+
+    def test_missing_database_is_skipped(self, contexts, tmp_path, capsys):
+        missing = BuildContext(name="gone", site_url="https://gone.test", database=tmp_path / "nope.json")
+        index = EntityIndex.build(contexts + [missing])
+        assert "https://gone.test" not in index.sites
+        assert "gone: database not found" in capsys.readouterr().out
+
+    def test_save_and_load(self, contexts, tmp_path):
+        path = build_entity_index(contexts, tmp_path / "index.json")
+        loaded = EntityIndex.load(tmp_path / "index.json")
+        assert loaded.entries == EntityIndex.build(contexts).entries
+        assert path is not None
+
+    def test_load_without_index_is_empty(self):
+        assert EntityIndex.load().also_listed("https://a.test", {"slug": "x"}) == []
+
+    def test_main(self, contexts, tmp_path, capsys):
+        config = tmp_path / "sites.json"
+        config.write_text(json.dumps([
+            {"name": c.name, "site_url": c.site_url, "site_name": c.site_name, "dist_dir": "dist",
+             "database": str(c.database)} for c in contexts
+        ]), encoding="utf-8")
+        with patch("sys.argv", ["entity_index", str(config)]):
+            main()
+        out = capsys.readouterr().out
+        assert "2 entities listed on more than one of 3 sites" in out
+        assert "Api:dog-api, Tools:dog-api (slug:dog-api)" in out
+        assert EntityIndex.load().entries
@@ -1,16 +1,34 @@
 """Tests for scripts/generate_sitemap.py"""
+import gzip
+import io
+import json
+from datetime import date
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from scripts.generate_sitemap import (
+    PageHistory,
     build_robots_txt,
-    build_sitemap_xml,
+    build_sitemap_index_xml,
     collect_pages,
     generate_sitemap,
     get_changefreq,
+    get_page_type,
     get_priority,
+    iter_manifest_pages,
+    write_sitemap,
+    write_child_sitemaps,
 )
+from scripts.utils import save_page_manifest
+
+
+def sitemap_xml(pages, site_url):
+    """Render a whole sitemap document to a string."""
+    output = io.StringIO()
+    write_sitemap(output, pages, site_url)
+    return output.getvalue()
 
 
 @pytest.fixture
@@ -66,6 +84,41 @@ class TestCollectPages:
         assert pages == []
 
 
+class TestIterManifestPages:
+    """Test reading pages from the build manifest."""
+
+    def test_reads_manifest_in_order(self, tmp_path):
+        save_page_manifest(
+            [
+                {"path": "api/b.html", "type": "api", "hash": "1"},
+                {"path": "api/a.html", "type": "api", "hash": "2"},
+                {"path": "index.html", "type": "index", "hash": "3"},
+            ],
+            tmp_path,
+        )
+        assert list(iter_manifest_pages(tmp_path)) == ["api/b.html", "api/a.html", "index.html"]
+
+    def test_excludes_404(self, tmp_path):
+        save_page_manifest(
+            [
+                {"path": "index.html", "type": "index", "hash": "1"},
+                {"path": "404.html", "type": "404", "hash": "2"},
+            ],
+            tmp_path,
+        )
+        assert list(iter_manifest_pages(tmp_path)) == ["index.html"]
+
+    def test_excludes_data_files(self, tmp_path):
+        save_page_manifest(
+            [
+                {"path": "api/a.html", "type": "api", "hash": "1"},
+                {"path": "data/api/a.json", "type": "data", "hash": "2"},
+            ],
+            tmp_path,
+        )
+        assert list(iter_manifest_pages(tmp_path)) == ["api/a.html"]
+
+
 class TestGetPriority:
     """Test priority assignment."""
 
@@ -75,6 +128,9 @@ class TestGetPriority:
     def test_category_high(self):
         assert get_priority("category/animals.html") == "0.8"
 
+    def test_category_later_pages_lower(self):
+        assert get_priority("category/animals/page-2.html") == "0.5"
+
     def test_api_medium(self):
         assert get_priority("api/dog-api.html") == "0.6"
 
@@ -95,48 +151,212 @@ class TestGetChangefreq:
         assert get_changefreq("api/dog-api.html") == "monthly"
 
 
-class TestBuildSitemapXml:
+class TestPageHistory:
+    """Test content-hash based lastmod and changefreq."""
+
+    def test_new_page_uses_today(self):
+        history = PageHistory(today=date(2025, 3, 1))
+        history.observe("https://t.com/a.html", "h1")
+        assert history.lastmod("https://t.com/a.html") == "2025-03-01"
+
+    def test_unchanged_hash_keeps_lastmod(self):
+        history = PageHistory(today=date(2025, 3, 1))
+        history.observe("https://t.com/a.html", "h1")
+        later = PageHistory(history.records, today=date(2025, 4, 1))
+        later.observe("https://t.com/a.html", "h1")
+        assert later.lastmod("https://t.com/a.html") == "2025-03-01"
+        assert later.records["https://t.com/a.html"]["changes"] == 0
+
+    def test_changed_hash_moves_lastmod(self):
+        history = PageHistory(today=date(2025, 3, 1))
+        history.observe("https://t.com/a.html", "h1")
+        later = PageHistory(history.records, today=date(2025, 4, 1))
+        later.observe("https://t.com/a.html", "h2")
+        assert later.lastmod("https://t.com/a.html") == "2025-04-01"
+        assert later.records["https://t.com/a.html"]["changes"] == 1
+
+    def test_unknown_url_falls_back_to_rules(self):
+        history = PageHistory(today=date(2025, 3, 1))
+        assert history.changefreq("https://t.com/api/x.html", "api/x.html") == "monthly"
+
+    def test_new_page_falls_back_to_rules(self):
+        history = PageHistory(today=date(2025, 3, 1))
+        history.observe("https://t.com/", "h1")
+        assert history.changefreq("https://t.com/", "index.html") == "weekly"
+
+    @pytest.mark.parametrize(
+        "days,changes,expected",
+        [(10, 10, "daily"), (30, 6, "weekly"), (60, 3, "monthly"), (400, 1, "yearly"), (60, 0, "yearly"), (20, 0, "monthly")],
+    )
+    def test_observed_change_rate(self, days, changes, expected):
+        first_seen = date.fromordinal(date(2025, 3, 1).toordinal() - days).isoformat()
+        records = {"u": {"hash": "h", "lastmod": first_seen, "first_seen": first_seen, "changes": changes}}
+        history = PageHistory(records, today=date(2025, 3, 1))
+        assert history.changefreq("u", "api/x.html") == expected
+
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "history.json"
+        history = PageHistory(today=date(2025, 3, 1))
+        history.observe("u", "h")
+        history.save(path)
+        assert PageHistory.load(path).records == history.records
+
+    def test_save_drops_unseen_urls(self, tmp_path):
+        path = tmp_path / "history.json"
+        history = PageHistory(today=date(2025, 3, 1))
+        history.observe("kept", "h")
+        history.observe("removed", "h")
+        history.save(path)
+
+        later = PageHistory.load(path, today=date(2025, 4, 1))
+        later.observe("kept", "h")
+        later.save(path)
+        assert list(PageHistory.load(path).records) == ["kept"]
+
+    def test_load_missing_file(self, tmp_path):
+        assert PageHistory.load(tmp_path / "missing.json").records == {}
+
+
+class TestWriteSitemap:
     """Test sitemap XML generation."""
 
     def test_valid_xml(self):
         pages = ["index.html", "api/test.html"]
-        xml = build_sitemap_xml(pages, "https://test.com")
+        xml = sitemap_xml(pages, "https://test.com")
         assert '<?xml version' in xml
         assert "http://www.sitemaps.org/schemas/sitemap/0.9" in xml
 
     def test_contains_all_urls(self):
         pages = ["index.html", "api/dog.html", "category/animals.html"]
-        xml = build_sitemap_xml(pages, "https://test.com")
+        xml = sitemap_xml(pages, "https://test.com")
         assert "https://test.com/" in xml
         assert "https://test.com/api/dog.html" in xml
         assert "https://test.com/category/animals.html" in xml
 
     def test_index_url_is_root(self):
         pages = ["index.html"]
-        xml = build_sitemap_xml(pages, "https://test.com")
+        xml = sitemap_xml(pages, "https://test.com")
         assert "<loc>https://test.com/</loc>" in xml
 
     def test_contains_lastmod(self):
         pages = ["index.html"]
-        xml = build_sitemap_xml(pages, "https://test.com")
+        xml = sitemap_xml(pages, "https://test.com")
         assert "<lastmod>" in xml
 
     def test_contains_priority(self):
         pages = ["index.html"]
-        xml = build_sitemap_xml(pages, "https://test.com")
+        xml = sitemap_xml(pages, "https://test.com")
         assert "<priority>1.0</priority>" in xml
 
     def test_empty_pages(self):
-        xml = build_sitemap_xml([], "https://test.com")
+        xml = sitemap_xml([], "https://test.com")
         assert '<?xml version' in xml
 
+    def test_matches_elementtree_output(self):
+        """The streaming writer stays byte-compatible with the old ElementTree output."""
+        from xml.etree.ElementTree import Element, ElementTree, SubElement, indent
+
+        pages = ["index.html", "api/a&b.html", "category/c.html"]
+        urlset = Element("urlset")
+        urlset.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
+        for page in pages:
+            url = SubElement(urlset, "url")
+            SubElement(url, "loc").text = "https://test.com/" if page == "index.html" else f"https://test.com/{page}"
+            SubElement(url, "lastmod").text = "2025-01-01"
+            SubElement(url, "changefreq").text = get_changefreq(page)
+            SubElement(url, "priority").text = get_priority(page)
+        indent(urlset, space="  ")
+        expected = io.BytesIO()
+        ElementTree(urlset).write(expected, encoding="UTF-8", xml_declaration=True)
+
+        output = io.StringIO()
+        write_sitemap(output, iter(pages), "https://test.com", "2025-01-01")
+        assert output.getvalue() == expected.getvalue().decode("utf-8")
+
+    def test_empty_matches_elementtree_output(self):
+        output = io.StringIO()
+        assert write_sitemap(output, [], "https://test.com", "2025-01-01") == 0
+        assert output.getvalue() == (
+            "<?xml version='1.0' encoding='UTF-8'?>\n"
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" />'
+        )
+
+
+class TestGetPageType:
+    """Test child sitemap grouping."""
+
+    def test_page_types(self):
+        assert get_page_type("api/dog.html") == "api"
+        assert get_page_type("category/animals.html") == "category"
+        assert get_page_type("index.html") == "pages"
+
+
+class TestWriteChildSitemaps:
+    """Test gzip child sitemap output."""
+
+    def test_writes_gzip_children(self, tmp_path):
+        names = write_child_sitemaps(["index.html", "api/dog.html"], tmp_path, "https://test.com").filenames
+        assert names == ["sitemap-pages-1.xml.gz", "sitemap-api-1.xml.gz"]
+        xml = gzip.decompress((tmp_path / "sitemap-api-1.xml.gz").read_bytes()).decode("utf-8")
+        assert "<loc>https://test.com/api/dog.html</loc>" in xml
+
+    def test_chunks_at_url_limit(self, tmp_path):
+        pages = [f"api/{i}.html" for i in range(5)]
+        with patch("scripts.generate_sitemap.MAX_URLS_PER_SITEMAP", 2):
+            names = write_child_sitemaps(pages, tmp_path, "https://test.com").filenames
+        assert names == ["sitemap-api-1.xml.gz", "sitemap-api-2.xml.gz", "sitemap-api-3.xml.gz"]
+
+    def test_interleaved_types_stay_grouped(self, tmp_path):
+        pages = ["api/a.html", "category/c.html", "api/b.html"]
+        names = write_child_sitemaps(pages, tmp_path, "https://test.com").filenames
+        assert names == ["sitemap-api-1.xml.gz", "sitemap-category-1.xml.gz"]
+        xml = gzip.decompress((tmp_path / "sitemap-api-1.xml.gz").read_bytes()).decode("utf-8")
+        assert xml == sitemap_xml(["api/a.html", "api/b.html"], "https://test.com")
+
+    def test_splits_oversized_files(self, tmp_path):
+        pages = [f"api/{i}.html" for i in range(4)]
+        one_page = len(sitemap_xml(pages[:1], "https://test.com").encode("utf-8"))
+        with patch("scripts.generate_sitemap.MAX_SITEMAP_BYTES", one_page + 50):
+            names = write_child_sitemaps(pages, tmp_path, "https://test.com").filenames
+        assert len(names) == 4
+
+    def test_tracks_newest_lastmod_per_child(self, tmp_path):
+        records = {
+            "https://test.com/api/a.html": {"hash": "h", "lastmod": "2025-01-05", "first_seen": "2025-01-01", "changes": 1},
+            "https://test.com/api/b.html": {"hash": "h", "lastmod": "2025-02-01", "first_seen": "2025-01-01", "changes": 1},
+            "https://test.com/category/c.html": {"hash": "h", "lastmod": "2025-01-03", "first_seen": "2025-01-01", "changes": 0},
+        }
+        history = PageHistory(records, today=date(2025, 3, 1))
+        pages = ["api/a.html", "category/c.html", "api/b.html"]
+        writer = write_child_sitemaps(pages, tmp_path, "https://test.com", history)
+        assert writer.lastmods == {
+            "sitemap-api-1.xml.gz": "2025-02-01",
+            "sitemap-category-1.xml.gz": "2025-01-03",
+        }
+
+    def test_removes_stale_children(self, tmp_path):
+        stale = tmp_path / "sitemap-api-9.xml.gz"
+        stale.write_bytes(b"")
+        write_child_sitemaps(["api/dog.html"], tmp_path, "https://test.com")
+        assert not stale.exists()
+
+
+class TestBuildSitemapIndexXml:
+    """Test sitemap index generation."""
+
+    def test_lists_children(self):
+        xml = build_sitemap_index_xml([("https://test.com/sitemap-api-1.xml.gz", "2025-01-02")])
+        assert "<sitemapindex" in xml
+        assert "<loc>https://test.com/sitemap-api-1.xml.gz</loc>" in xml
+        assert "<lastmod>2025-01-02</lastmod>" in xml
+
 
 class TestBuildRobotsTxt:
     """Test robots.txt generation."""
 
     def test_contains_sitemap(self):
         result = build_robots_txt("https://test.com")
-        assert "Sitemap: https://test.com/sitemap.xml" in result
+        assert "Sitemap: https://test.com/sitemap_index.xml" in result
 
     def test_allows_all(self):
         result = build_robots_txt("https://test.com")
@@ -171,6 +391,68 @@ class TestGenerateSitemap:
         generate_sitemap(empty_dist, "https://test.com")
         assert not (empty_dist / "sitemap.xml").exists()
 
+    def test_prefers_manifest_over_walk(self, mock_dist):
+        save_page_manifest(
+            [{"path": "api/only-in-manifest.html", "type": "api", "hash": "1"}],
+            mock_dist,
+        )
+        generate_sitemap(mock_dist, "https://test.com")
+        content = (mock_dist / "sitemap.xml").read_text(encoding="utf-8")
+        assert "only-in-manifest.html" in content
+        assert "dog-api.html" not in content
+
+    def test_creates_sitemap_index(self, mock_dist):
+        generate_sitemap(mock_dist, "https://test.com")
+        index = (mock_dist / "sitemap_index.xml").read_text(encoding="utf-8")
+        assert "https://test.com/sitemap-api-1.xml.gz" in index
+        assert "https://test.com/sitemap-category-1.xml.gz" in index
+        assert (mock_dist / "sitemap-api-1.xml.gz").exists()
+
+    def test_skips_single_sitemap_for_large_catalogs(self, mock_dist):
+        with patch("scripts.generate_sitemap.MAX_URLS_PER_SITEMAP", 1):
+            generate_sitemap(mock_dist, "https://test.com")
+        assert not (mock_dist / "sitemap.xml").exists()
+        assert (mock_dist / "sitemap-api-2.xml.gz").exists()
+
+    def test_removes_stale_single_sitemap_when_catalog_grows(self, mock_dist):
+        generate_sitemap(mock_dist, "https://test.com")
+        assert (mock_dist / "sitemap.xml").exists()
+
+        with patch("scripts.generate_sitemap.MAX_URLS_PER_SITEMAP", 1):
+            generate_sitemap(mock_dist, "https://test.com")
+        assert not (mock_dist / "sitemap.xml").exists()
+        assert (mock_dist / "sitemap_index.xml").exists()
+
+    def test_removes_stale_sitemaps_when_catalog_empties(self, mock_dist):
+        generate_sitemap(mock_dist, "https://test.com")
+        save_page_manifest([], mock_dist)
+
+        generate_sitemap(mock_dist, "https://test.com")
+        assert not (mock_dist / "sitemap.xml").exists()
+        assert not (mock_dist / "sitemap_index.xml").exists()
+        assert not list(mock_dist.glob("sitemap-*.xml.gz"))
+
+    def test_lastmod_from_history(self, mock_dist, tmp_path):
+        history_path = tmp_path / "history.json"
+        manifest = [{"path": "api/dog-api.html", "type": "api", "hash": "same"}]
+        save_page_manifest(manifest, mock_dist)
+        history_path.write_text(json.dumps({
+            "https://test.com/api/dog-api.html": {
+                "hash": "same", "lastmod": "2020-01-01", "first_seen": "2020-01-01", "changes": 0,
+            }
+        }), encoding="utf-8")
+
+        generate_sitemap(mock_dist, "https://test.com", history_path)
+
+        content = (mock_dist / "sitemap.xml").read_text(encoding="utf-8")
+        assert "<lastmod>2020-01-01</lastmod>" in content
+        assert "<changefreq>yearly</changefreq>" in content
+
+    def test_history_persisted(self, mock_dist, isolated_build_cache):
+        generate_sitemap(mock_dist, "https://test.com")
+        records = json.loads((isolated_build_cache / "page-history.json").read_text(encoding="utf-8"))
+        assert "https://test.com/api/dog-api.html" in records
+
     def test_sitemap_all_pages_included(self, mock_dist):
         generate_sitemap(mock_dist, "https://test.com")
         content = (mock_dist / "sitemap.xml").read_text(encoding="utf-8")
@@ -0,0 +1,135 @@
+"""Tests for scripts/http_client.py"""
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from scripts.http_client import (
+    POOL_MAXSIZE,
+    FixtureTransport,
+    HttpClient,
+    backoff_delay,
+    get_client,
+    set_client,
+)
+from scripts.utils import TokenBucket
+
+
+class TestBackoffDelay:
+    """Test retry delay calculation."""
+
+    def test_full_jitter_within_cap(self):
+        for attempt in range(4):
+            assert 0 <= backoff_delay(attempt, base=1.0) <= 2 ** attempt
+
+    def test_honors_retry_after(self):
+        assert backoff_delay(0, "7") == 7.0
+
+    def test_ignores_http_date_retry_after(self):
+        assert backoff_delay(0, "Wed, 21 Oct 2015 07:28:00 GMT", base=1.0) <= 1.0
+
+
+class TestHttpClient:
+    """Test retries, limits and metrics against a local server."""
+
+    def test_get_retries_5xx(self, fake_http_server, retry_sleep):
+        fake_http_server.respond(502)
+        fake_http_server.respond(200, {"ok": True})
+        response = HttpClient().get(fake_http_server.url)
+        assert response.json() == {"ok": True}
+        assert len(fake_http_server.requests) == 2
+        assert retry_sleep.call_count == 1
+
+    def test_post_not_retried_on_5xx_by_default(self, fake_http_server):
+        fake_http_server.respond(500)
+        assert HttpClient().post(fake_http_server.url).status_code == 500
+        assert len(fake_http_server.requests) == 1
+
+    def test_post_retried_on_429(self, fake_http_server, retry_sleep):
+        fake_http_server.respond(429, headers={"Retry-After": "2"})
+        fake_http_server.respond(201)
+        assert HttpClient().post(fake_http_server.url).status_code == 201
+        retry_sleep.assert_called_once_with(2.0)
+
+    def test_post_retry_opt_in(self, fake_http_server):
+        fake_http_server.respond(503)
+        assert HttpClient().post(fake_http_server.url, retry=True).status_code == 200
+
+    def test_gives_up_and_returns_last_response(self, fake_http_server):
+        for _ in range(5):
+            fake_http_server.respond(503)
+        assert HttpClient(retries=2).get(fake_http_server.url).status_code == 503
+        assert len(fake_http_server.requests) == 3
+
+    def test_connection_error_retried_then_raised(self, retry_sleep):
+        client = HttpClient(retries=2, transport=FixtureTransport([]))
+        with pytest.raises(requests.ConnectionError):
+            client.get("http://nowhere.test/")
+        assert retry_sleep.call_count == 2
+        assert client.metrics["nowhere.test"]["errors"] == 3
+
+    def test_rate_limit_applies_per_host(self, fake_http_server):
+        client = HttpClient()
+        host = fake_http_server.url.split("//")[1]
+        client.set_rate_limit(host, rate=100)
+        assert isinstance(client.rate_limits[host], TokenBucket)
+        client.rate_limits[host] = MagicMock()
+        client.get(fake_http_server.url)
+        client.get(fake_http_server.url)
+        assert client.rate_limits[host].acquire.call_count == 2
+
+    def test_reuses_connection(self, fake_http_server):
+        client = HttpClient()
+        for _ in range(3):
+            client.get(fake_http_server.url)
+        adapter = client.session.get_adapter(fake_http_server.url)
+        assert adapter._pool_maxsize == POOL_MAXSIZE
+        assert len(adapter.poolmanager.pools) == 1
+
+    def test_metrics_summary(self, fake_http_server):
+        client = HttpClient()
+        fake_http_server.respond(404)
+        client.get(fake_http_server.url)
+        client.get(fake_http_server.url)
+        host = fake_http_server.url.split("//")[1]
+        assert client.metrics[host]["requests"] == 2
+        assert client.metrics[host]["errors"] == 1
+        assert client.metrics_summary()[0].startswith(f"{host}: 2 requests, 0 retries, 1 errors")
+
+
+class TestSharedClient:
+    """Test the process-wide client."""
+
+    def test_get_client_is_shared(self):
+        assert get_client() is get_client()
+
+    def test_set_client_replaces_and_resets(self):
+        custom = HttpClient()
+        set_client(custom)
+        assert get_client() is custom
+        set_client(None)
+        assert get_client() is not custom
+
+
+class TestFixtureTransport:
+    """Test offline replay of recorded responses."""
+
+    def test_replays_in_order_then_repeats_last(self):
+        client = HttpClient(transport=FixtureTransport([
+            {"url": "https://api.test/x", "body": {"n": 1}},
+            {"url": "https://api.test/x", "body": {"n": 2}},
+        ]))
+        assert [client.get("https://api.test/x").json()["n"] for _ in range(3)] == [1, 2, 2]
+
+    def test_loads_fixture_file(self, tmp_path):
+        path = tmp_path / "fixtures.json"
+        path.write_text(json.dumps([
+            {"method": "POST", "url": "https://api.test/y", "status": 201, "headers": {"X-Id": "9"}, "body": "created"}
+        ]))
+        transport = FixtureTransport(path)
+        response = HttpClient(transport=transport).post("https://api.test/y", data="payload")
+        assert response.status_code == 201
+        assert response.headers["x-id"] == "9"
+        assert response.text == "created"
+        assert transport.requests[0].body == "payload"
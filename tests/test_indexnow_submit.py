@@ -1,79 +1,145 @@
+import gzip
 import json
 import os
 import sys
+import threading
 from unittest.mock import patch, mock_open, MagicMock
-from urllib.error import HTTPError, URLError
 
 import pytest
+import requests
 
-from scripts.indexnow_submit import parse_sitemap, submit_to_indexnow, main
+from scripts.indexnow_submit import (
+    chunk_urls,
+    find_sitemap,
+    iter_sitemap_urls,
+    load_page_hashes,
+    main,
+    parse_sitemap,
+    prune_ledger,
+    record_submissions,
+    select_changed_urls,
+    submit_batches,
+    submit_sites,
+    submit_to_indexnow,
+    url_to_page,
+)
+from scripts.utils import save_page_manifest
 
 
-def test_parse_sitemap_success():
+def test_parse_sitemap_success(tmp_path):
     xml_data = """<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
   <url><loc>http://example.com/page1</loc></url>
   <url><loc>http://example.com/page2</loc></url>
 </urlset>"""
-    
-    with patch("xml.etree.ElementTree.parse") as mock_parse:
-        mock_tree = MagicMock()
-        root = MagicMock()
-        mock_elem1 = MagicMock()
-        mock_elem1.text = "http://example.com/page1"
-        mock_elem2 = MagicMock()
-        mock_elem2.text = "http://example.com/page2"
-        
-        root.findall.return_value = [mock_elem1, mock_elem2]
-        mock_tree.getroot.return_value = root
-        mock_parse.return_value = mock_tree
-        
-        urls = parse_sitemap("sitemap.xml")
-        assert len(urls) == 2
-        assert urls[0] == "http://example.com/page1"
+    path = tmp_path / "sitemap.xml"
+    path.write_text(xml_data, encoding="utf-8")
+
+    urls = list(parse_sitemap(str(path)))
+    assert len(urls) == 2
+    assert urls[0] == "http://example.com/page1"
+
+
+def test_parse_sitemap_gzip(tmp_path):
+    path = tmp_path / "sitemap-api-1.xml.gz"
+    path.write_bytes(gzip.compress(
+        b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        b"<url><loc>http://example.com/a</loc></url></urlset>"
+    ))
+    assert list(parse_sitemap(str(path))) == ["http://example.com/a"]
+
+
+def test_parse_sitemap_index_follows_children(tmp_path):
+    for name, page in [("sitemap-api-1.xml.gz", "a"), ("sitemap-api-2.xml.gz", "b")]:
+        (tmp_path / name).write_bytes(gzip.compress(
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f"<url><loc>http://example.com/{page}</loc></url></urlset>".encode("utf-8")
+        ))
+    (tmp_path / "sitemap_index.xml").write_text(
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        "<sitemap><loc>http://example.com/sitemap-api-1.xml.gz</loc><lastmod>2025-01-01</lastmod></sitemap>"
+        "<sitemap><loc>http://example.com/sitemap-api-2.xml.gz</loc></sitemap>"
+        "</sitemapindex>",
+        encoding="utf-8",
+    )
+    assert list(parse_sitemap(str(tmp_path / "sitemap_index.xml"))) == [
+        "http://example.com/a", "http://example.com/b",
+    ]
+
+
+def test_iter_sitemap_urls_is_lazy(tmp_path):
+    path = tmp_path / "sitemap.xml"
+    path.write_text(
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + "".join(f"<url><loc>http://example.com/{i}</loc></url>" for i in range(1000))
+        + "</urlset>",
+        encoding="utf-8",
+    )
+    urls = iter_sitemap_urls(str(path))
+    assert next(urls) == "http://example.com/0"
+    assert next(urls) == "http://example.com/1"
+
+
+def test_reads_generated_sitemaps(tmp_path):
+    from scripts.generate_sitemap import generate_sitemap
+
+    dist = tmp_path / "dist"
+    dist.mkdir()
+    save_page_manifest(
+        [{"path": "index.html", "type": "index", "hash": "1"},
+         {"path": "api/a.html", "type": "api", "hash": "2"}],
+        dist,
+    )
+    generate_sitemap(dist, "https://test.com")
+    assert find_sitemap(str(dist)) == str(dist / "sitemap_index.xml")
+    assert sorted(parse_sitemap(find_sitemap(str(dist)))) == [
+        "https://test.com/", "https://test.com/api/a.html",
+    ]
+
+
+def test_find_sitemap_missing(tmp_path):
+    assert find_sitemap(str(tmp_path)) is None
 
 
 def test_parse_sitemap_error():
     with patch("xml.etree.ElementTree.parse", side_effect=Exception("File not found")):
-        urls = parse_sitemap("invalid.xml")
+        urls = list(parse_sitemap("invalid.xml"))
         assert urls == []
 
 
-@patch("scripts.indexnow_submit.urlopen")
-def test_submit_to_indexnow_success(mock_urlopen):
-    mock_response = MagicMock()
-    mock_response.status = 200
-    mock_urlopen.return_value.__enter__.return_value = mock_response
+@patch("scripts.indexnow_submit.get_client")
+def test_submit_to_indexnow_success(mock_client):
+    mock_client.return_value.post.return_value = MagicMock(status_code=200)
 
     success = submit_to_indexnow("test.com", "key123", ["http://test.com/page1"])
     assert success is True
 
 
-@patch("scripts.indexnow_submit.urlopen")
-def test_submit_to_indexnow_failure_status(mock_urlopen):
-    mock_response = MagicMock()
-    mock_response.status = 500
-    mock_urlopen.return_value.__enter__.return_value = mock_response
+@patch("scripts.indexnow_submit.get_client")
+def test_submit_to_indexnow_failure_status(mock_client):
+    mock_client.return_value.post.return_value = MagicMock(status_code=500, headers={})
 
     success = submit_to_indexnow("test.com", "key123", ["http://test.com/page1"])
     assert success is False
 
 
-@patch("scripts.indexnow_submit.urlopen")
-def test_submit_to_indexnow_generic_exception(mock_urlopen):
-    mock_urlopen.side_effect = Exception("Generic Error")
+@patch("scripts.indexnow_submit.get_client")
+def test_submit_to_indexnow_generic_exception(mock_client):
+    mock_client.return_value.post.side_effect = Exception("Generic Error")
     success = submit_to_indexnow("test.com", "key123", ["http://test.com/page1"])
     assert success is False
 
-@patch("scripts.indexnow_submit.urlopen")
-def test_submit_to_indexnow_http_error(mock_urlopen):
-    mock_urlopen.side_effect = HTTPError("url", 404, "Not Found", {}, None)
+@patch("scripts.indexnow_submit.get_client")
+def test_submit_to_indexnow_http_error(mock_client):
+    mock_client.return_value.post.return_value = MagicMock(status_code=404, headers={})
     success = submit_to_indexnow("test.com", "key123", ["http://test.com/page1"])
     assert success is False
+    assert mock_client.return_value.post.call_count == 1
+    assert mock_client.return_value.post.call_args.kwargs["retry"] is True
 
-@patch("scripts.indexnow_submit.urlopen")
-def test_submit_to_indexnow_url_error(mock_urlopen):
-    mock_urlopen.side_effect = URLError("Reason")
+@patch("scripts.indexnow_submit.get_client")
+def test_submit_to_indexnow_connection_error(mock_client):
+    mock_client.return_value.post.side_effect = requests.ConnectionError("Reason")
     success = submit_to_indexnow("test.com", "key123", ["http://test.com/page1"])
     assert success is False
 
@@ -148,3 +214,221 @@ def test_main_host_parsing(mock_submit, mock_parse, mock_exists):
     mock_submit.return_value = True
     main()
     mock_submit.assert_called_with("test.com", "key123", ["http://test.com/page1"])
+
+
+def test_submit_retries_5xx_then_succeeds(fake_http_server, retry_sleep):
+    fake_http_server.respond(503)
+    fake_http_server.respond(429, headers={"Retry-After": "3"})
+    fake_http_server.respond(202)
+    with patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", f"{fake_http_server.url}/indexnow"):
+        assert submit_to_indexnow("test.com", "key123", ["https://test.com/a"]) is True
+
+    assert len(fake_http_server.requests) == 3
+    body = fake_http_server.requests[0]["body"]
+    assert body["host"] == "test.com"
+    assert body["keyLocation"] == "https://test.com/key123.txt"
+    assert body["urlList"] == ["https://test.com/a"]
+    # Jittered backoff, then Retry-After
+    delays = [c.args[0] for c in retry_sleep.call_args_list]
+    assert len(delays) == 2
+    assert 0 <= delays[0] <= 0.5
+    assert delays[1] == 3.0
+
+
+def test_submit_gives_up_after_max_retries(fake_http_server):
+    for _ in range(10):
+        fake_http_server.respond(500)
+    with patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", fake_http_server.url), \
+         patch("scripts.indexnow_submit.MAX_RETRIES", 2):
+        assert submit_to_indexnow("test.com", "key123", ["https://test.com/a"]) is False
+    assert len(fake_http_server.requests) == 3
+
+
+def test_submit_does_not_retry_4xx(fake_http_server):
+    fake_http_server.respond(422)
+    with patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", fake_http_server.url):
+        assert submit_to_indexnow("test.com", "key123", ["https://test.com/a"]) is False
+    assert len(fake_http_server.requests) == 1
+
+
+def test_chunk_urls():
+    assert chunk_urls(["a", "b", "c"], 2) == [["a", "b"], ["c"]]
+    assert chunk_urls([], 2) == []
+
+
+def test_submit_batches_splits_requests(fake_http_server):
+    urls = [f"https://test.com/{i}" for i in range(5)]
+    with patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", fake_http_server.url), \
+         patch("scripts.indexnow_submit.MAX_URLS_PER_REQUEST", 2):
+        submitted = submit_batches("test.com", "key123", urls)
+
+    assert sorted(submitted) == sorted(urls)
+    sizes = sorted(len(r["body"]["urlList"]) for r in fake_http_server.requests)
+    assert sizes == [1, 2, 2]
+
+
+def test_submit_batches_reports_only_accepted(fake_http_server):
+    fake_http_server.respond(400)
+    with patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", fake_http_server.url), \
+         patch("scripts.indexnow_submit.MAX_URLS_PER_REQUEST", 2):
+        submitted = submit_batches("test.com", "key123", ["a", "b", "c", "d"], workers=1)
+    assert submitted == ["c", "d"]
+
+
+def test_url_to_page():
+    assert url_to_page("https://test.com/") == "index.html"
+    assert url_to_page("https://test.com") == "index.html"
+    assert url_to_page("https://test.com/api/dog.html") == "api/dog.html"
+
+
+def test_load_page_hashes(tmp_path):
+    assert load_page_hashes(str(tmp_path)) == {}
+    save_page_manifest([{"path": "index.html", "type": "index", "hash": "h1"}], tmp_path)
+    assert load_page_hashes(str(tmp_path)) == {"index.html": "h1"}
+
+
+def test_select_changed_urls():
+    hashes = {"index.html": "h1", "api/a.html": "new", "api/b.html": "same"}
+    ledger = {
+        "https://t.com/api/a.html": {"hash": "old", "submitted": "x"},
+        "https://t.com/api/b.html": {"hash": "same", "submitted": "x"},
+        "https://t.com/api/c.html": {"hash": "", "submitted": "x"},
+    }
+    urls = ["https://t.com/", "https://t.com/api/a.html", "https://t.com/api/b.html", "https://t.com/api/c.html"]
+    assert select_changed_urls(urls, hashes, ledger) == ["https://t.com/", "https://t.com/api/a.html"]
+    assert select_changed_urls(iter(urls), hashes, ledger, threading.Lock()) == [
+        "https://t.com/", "https://t.com/api/a.html",
+    ]
+
+
+def test_record_submissions():
+    ledger = {}
+    record_submissions(ledger, ["https://t.com/"], {"index.html": "h1"})
+    assert ledger["https://t.com/"]["hash"] == "h1"
+    assert ledger["https://t.com/"]["submitted"]
+
+
+def test_prune_ledger_drops_only_removed_urls_of_host():
+    ledger = {
+        "https://t.com/api/a.html": {"hash": "1"},
+        "https://t.com/api/gone.html": {"hash": "1"},
+        "https://other.com/api/x.html": {"hash": "1"},
+    }
+    assert prune_ledger(ledger, "t.com", {"https://t.com/api/a.html"}) == 1
+    assert set(ledger) == {"https://t.com/api/a.html", "https://other.com/api/x.html"}
+
+
+def _write_site(dist, pages):
+    dist.mkdir(exist_ok=True)
+    save_page_manifest([{"path": p, "type": "api", "hash": h} for p, h in pages.items()], dist)
+    locs = "".join(f"<url><loc>https://test.com/{p}</loc></url>" for p in pages)
+    (dist / "sitemap.xml").write_text(
+        f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>',
+        encoding="utf-8",
+    )
+
+
+def test_main_submits_only_delta(tmp_path, fake_http_server):
+    dist = tmp_path / "dist"
+    _write_site(dist, {"api/a.html": "1", "api/b.html": "1"})
+    argv = ["indexnow.py", "https://test.com", str(dist), "key123"]
+
+    with patch("sys.argv", argv), patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", fake_http_server.url):
+        main()
+        assert fake_http_server.requests[-1]["body"]["urlList"] == [
+            "https://test.com/api/a.html", "https://test.com/api/b.html",
+        ]
+
+        # Nothing changed: no request at all
+        main()
+        assert len(fake_http_server.requests) == 1
+
+        # One page changed, one added
+        _write_site(dist, {"api/a.html": "2", "api/b.html": "1", "api/c.html": "1"})
+        main()
+        assert fake_http_server.requests[-1]["body"]["urlList"] == [
+            "https://test.com/api/a.html", "https://test.com/api/c.html",
+        ]
+
+
+def test_main_prunes_ledger_of_removed_pages(tmp_path, fake_http_server, isolated_build_cache):
+    dist = tmp_path / "dist"
+    _write_site(dist, {"api/a.html": "1", "api/b.html": "1"})
+    argv = ["indexnow.py", "https://test.com", str(dist), "key123"]
+
+    with patch("sys.argv", argv), patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", fake_http_server.url):
+        main()
+        _write_site(dist, {"api/a.html": "1"})
+        main()
+
+    ledger = json.loads((isolated_build_cache / "indexnow-ledger.json").read_text(encoding="utf-8"))
+    assert set(ledger) == {"https://test.com/api/a.html"}
+
+
+def test_main_failed_batch_is_retried_next_run(tmp_path, fake_http_server):
+    dist = tmp_path / "dist"
+    _write_site(dist, {"api/a.html": "1"})
+    argv = ["indexnow.py", "https://test.com", str(dist), "key123"]
+    fake_http_server.respond(403)
+
+    with patch("sys.argv", argv), patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", fake_http_server.url):
+        with pytest.raises(SystemExit) as exc:
+            main()
+        assert exc.value.code == 1
+
+        main()
+        assert len(fake_http_server.requests) == 2
+
+
+def _write_host_sitemap(root, host, slugs):
+    dist = root / host
+    dist.mkdir(parents=True)
+    entries = "".join(f"<url><loc>https://{host}/api/{s}.html</loc></url>" for s in slugs)
+    (dist / "sitemap.xml").write_text(
+        f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+    )
+    return dist
+
+
+def test_submit_sites_shares_ledger(tmp_path, fake_http_server):
+    sites = [
+        {"host": "a.test", "dist_dir": str(_write_host_sitemap(tmp_path, "a.test", ["x", "y"])), "key": "ka"},
+        {"host": "b.test", "dist_dir": str(_write_host_sitemap(tmp_path, "b.test", ["z"])), "key": "kb"},
+    ]
+    ledger = {}
+    with patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", fake_http_server.url):
+        summaries = submit_sites(sites, ledger)
+
+    assert [s["host"] for s in summaries] == ["a.test", "b.test"]
+    assert all(s["ok"] for s in summaries)
+    assert [s["urls"] for s in summaries] == [2, 1]
+    assert [s["submitted"] for s in summaries] == [2, 1]
+    assert sorted(r["body"]["host"] for r in fake_http_server.requests) == ["a.test", "b.test"]
+    assert set(ledger) == {"https://a.test/api/x.html", "https://a.test/api/y.html", "https://b.test/api/z.html"}
+
+
+def test_submit_sites_isolates_failures(tmp_path, fake_http_server):
+    sites = [
+        {"host": "a.test", "dist_dir": str(_write_host_sitemap(tmp_path, "a.test", ["x"])), "key": "ka"},
+        {"host": "b.test", "dist_dir": str(tmp_path / "missing"), "key": "kb"},
+    ]
+    with patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", fake_http_server.url):
+        summaries = submit_sites(sites, {})
+    assert [s["ok"] for s in summaries] == [True, False]
+
+
+def test_main_config_submits_every_site(tmp_path, fake_http_server):
+    a = _write_host_sitemap(tmp_path, "a.test", ["x"])
+    b = _write_host_sitemap(tmp_path, "b.test", ["y"])
+    config = tmp_path / "sites.json"
+    config.write_text(json.dumps([
+        {"name": "a", "site_url": "https://a.test/", "dist_dir": str(a), "indexnow_key": "ka"},
+        {"name": "b", "site_url": "https://b.test", "dist_dir": str(b), "indexnow_key": "kb"},
+        {"name": "c", "site_url": "https://c.test", "dist_dir": str(b)},
+    ]))
+    with patch("sys.argv", ["indexnow.py", "--config", str(config)]), \
+         patch("scripts.indexnow_submit.INDEXNOW_ENDPOINT", fake_http_server.url):
+        main()
+
+    keys = sorted(r["body"]["key"] for r in fake_http_server.requests)
+    assert keys == ["ka", "kb"]
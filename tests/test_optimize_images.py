@@ -0,0 +1,78 @@
+"""Tests for scripts/optimize_images.py"""
+from unittest.mock import patch
+
+import pytest
+
+from scripts import optimize_images as optimize_module
+from scripts.optimize_images import optimize_images
+
+
+@pytest.fixture
+def src_dir(tmp_path):
+    """Site sources with a PNG in images/ and a JPEG in static/images/."""
+    Image = pytest.importorskip("PIL.Image")
+    src = tmp_path / "src"
+    (src / "images").mkdir(parents=True)
+    (src / "static" / "images").mkdir(parents=True)
+    Image.new("RGB", (700, 350), (30, 60, 90)).save(src / "images" / "hero.png")
+    Image.new("RGB", (200, 100), (200, 100, 50)).save(src / "static" / "images" / "cover.jpg")
+    return src
+
+
+class TestOptimizeImages:
+    """Test encoding, caching and output."""
+
+    def test_writes_images_under_their_names(self, src_dir, tmp_path):
+        from PIL import Image
+
+        dist = tmp_path / "dist"
+        assert optimize_images(src_dir, dist, workers=1) == 2
+
+        assert sorted(p.name for p in (dist / "images").iterdir()) == ["cover.jpg", "hero.png"]
+        with Image.open(dist / "images" / "hero.png") as img:
+            assert img.size == (700, 350)
+        with Image.open(dist / "images" / "cover.jpg") as img:
+            assert img.format == "JPEG"
+
+    def test_never_grows_an_image(self, src_dir, tmp_path):
+        source = src_dir / "images" / "hero.png"
+        optimize_images(src_dir, tmp_path / "dist", workers=1)
+        assert (tmp_path / "dist" / "images" / "hero.png").stat().st_size <= source.stat().st_size
+
+    def test_encodes_only_changed_images(self, src_dir, tmp_path):
+        from PIL import Image
+
+        real_encode = optimize_module._encode_to_cache
+        encoded = []
+
+        def spy(job):
+            encoded.append(job[0])
+            return real_encode(job)
+
+        with patch.object(optimize_module, "_encode_to_cache", spy):
+            optimize_images(src_dir, tmp_path / "dist", workers=1)
+            assert len(encoded) == 2
+
+            Image.new("RGB", (700, 350), (90, 60, 30)).save(src_dir / "images" / "hero.png")
+            optimize_images(src_dir, tmp_path / "dist2", workers=1)
+
+        assert encoded[2:] == [str(src_dir / "images" / "hero.png")]
+        assert (tmp_path / "dist2" / "images" / "cover.jpg").exists()
+
+    def test_duplicate_names_are_rejected(self, src_dir, tmp_path):
+        (src_dir / "images" / "cover.jpg").write_bytes((src_dir / "static" / "images" / "cover.jpg").read_bytes())
+        with pytest.raises(ValueError, match="images/cover.jpg"):
+            optimize_images(src_dir, tmp_path / "dist", workers=1)
+
+    def test_encodes_in_parallel(self, src_dir, tmp_path):
+        assert optimize_images(src_dir, tmp_path / "dist", workers=2) == 2
+        assert (tmp_path / "dist" / "images" / "cover.jpg").exists()
+
+    def test_copies_without_pillow(self, tmp_path):
+        src = tmp_path / "src"
+        (src / "images").mkdir(parents=True)
+        (src / "images" / "og-image.png").write_bytes(b"png")
+
+        with patch.object(optimize_module, "Image", None):
+            assert optimize_images(src, tmp_path / "dist") == 1
+        assert (tmp_path / "dist" / "images" / "og-image.png").read_bytes() == b"png"
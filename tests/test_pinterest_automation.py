@@ -1,16 +1,30 @@
 import os
 import json
 import pytest
+import requests
 from unittest.mock import patch, MagicMock
 from pathlib import Path
+from scripts.http_client import FixtureTransport, HttpClient, set_client
 from scripts.pinterest_automation import (
     get_headers,
     get_boards,
+    get_board_id,
     create_pin,
     load_daily_facts,
     load_directory_items,
     automate_pinning
 )
+from scripts.utils import journal_insert
+
+BOARDS_URL = "https://api.pinterest.com/v5/boards?page_size=250"
+PINS_URL = "https://api.pinterest.com/v5/pins"
+
+
+def use_fixtures(*fixtures):
+    """Route the shared HTTP client through recorded responses."""
+    transport = FixtureTransport(list(fixtures))
+    set_client(HttpClient(transport=transport))
+    return transport
 
 def test_get_headers_no_token():
     with patch.dict(os.environ, {}, clear=True):
@@ -25,83 +39,100 @@ def test_get_headers_with_token():
         assert headers["Authorization"] == "Bearer test_token"
         assert headers["Content-Type"] == "application/json"
 
-@patch("requests.get")
-def test_get_boards_success(mock_get):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"items": [{"id": "board1", "name": "Board 1"}]}
-    mock_get.return_value = mock_response
+def test_get_boards_success():
+    use_fixtures({"url": BOARDS_URL, "body": {"items": [{"id": "board1", "name": "Board 1"}]}})
 
     boards = get_boards()
     assert len(boards) == 1
     assert boards[0]["id"] == "board1"
 
-@patch("requests.get")
-def test_get_boards_failure(mock_get):
-    mock_response = MagicMock()
-    mock_response.status_code = 401
-    mock_response.text = "Unauthorized"
-    mock_get.return_value = mock_response
+def test_get_boards_follows_bookmark():
+    transport = use_fixtures(
+        {"url": BOARDS_URL, "body": {"items": [{"id": "board1", "name": "Board 1"}], "bookmark": "abc"}},
+        {"url": BOARDS_URL + "&bookmark=abc", "body": {"items": [{"id": "board2", "name": "Board 2"}], "bookmark": None}},
+    )
+
+    boards = get_boards()
+    assert [b["id"] for b in boards] == ["board1", "board2"]
+    assert len(transport.requests) == 2
+
+def test_get_board_id_uses_cache():
+    transport = use_fixtures({"url": BOARDS_URL, "body": {"items": [{"id": "board1", "name": "Board 1"}]}})
+
+    assert get_board_id("board 1") == "board1"
+    assert get_board_id("Board 1") == "board1"
+    assert len(transport.requests) == 1
+
+def test_get_boards_failure():
+    use_fixtures({"url": BOARDS_URL, "status": 401, "body": "Unauthorized"})
 
     boards = get_boards()
     assert boards == []
 
-@patch("requests.post")
-def test_create_pin_success(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 201
-    mock_response.json.return_value = {"id": "pin1"}
-    mock_post.return_value = mock_response
+def test_create_pin_success():
+    transport = use_fixtures({"method": "POST", "url": PINS_URL, "status": 201, "body": {"id": "pin1"}})
 
     result = create_pin("board1", "Title", "Desc", "link", "img")
     assert result == {"id": "pin1"}
+    assert json.loads(transport.requests[0].body)["board_id"] == "board1"
 
-@patch("requests.post")
-def test_create_pin_failure(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 400
-    mock_response.text = "Bad Request"
-    mock_post.return_value = mock_response
+def test_create_pin_failure():
+    use_fixtures({"method": "POST", "url": PINS_URL, "status": 400, "body": "Bad Request"})
 
     result = create_pin("board1", "Title", "Desc", "link", "img")
     assert result is None
 
-# Better approach for file loading tests
-def test_load_daily_facts_exists():
+def test_create_pin_network_error():
+    # No fixture matches, so the transport raises ConnectionError
+    use_fixtures()
+
+    assert create_pin("board1", "Title", "Desc", "link", "img") is None
+
+def _write_project(root, name, items):
+    db = root / "projects" / name / "data" / "database.json"
+    db.parent.mkdir(parents=True)
+    db.write_text(json.dumps(items), encoding="utf-8")
+    return db
+
+def test_load_daily_facts_exists(tmp_path):
     mock_data = [{"id": 1, "text": "Fact"}]
-    with patch("pathlib.Path.exists", return_value=True):
-        with patch("builtins.open", MagicMock()):
-            with patch("json.load", return_value=mock_data):
-                facts = load_daily_facts()
-                assert facts == mock_data
-
-def test_load_daily_facts_not_exists():
-    with patch("pathlib.Path.exists", return_value=False):
-        facts = load_daily_facts()
-        assert facts == []
-
-def test_load_directory_items_exists():
-    mock_data = [{"title": "Tool"}]
-    with patch("pathlib.Path.exists", return_value=True):
-        with patch("builtins.open", MagicMock()):
-            with patch("json.load", return_value=mock_data):
-                items = load_directory_items("tools-directory")
-                assert items == mock_data
+    _write_project(tmp_path, "dailyfacts", mock_data)
+    with patch("scripts.pinterest_automation.BORING_ROOT", tmp_path):
+        assert load_daily_facts() == mock_data
+
+def test_load_daily_facts_not_exists(tmp_path):
+    with patch("scripts.pinterest_automation.BORING_ROOT", tmp_path):
+        assert load_daily_facts() == []
+
+def test_load_directory_items_exists(tmp_path):
+    mock_data = [{"title": "Tool", "slug": "tool"}]
+    _write_project(tmp_path, "tools-directory", mock_data)
+    with patch("scripts.pinterest_automation.BORING_ROOT", tmp_path):
+        assert load_directory_items("tools-directory") == mock_data
+
+def test_load_directory_items_includes_journal(tmp_path):
+    db = _write_project(tmp_path, "tools-directory", [{"title": "Tool", "slug": "tool"}])
+    journal_insert([{"title": "New", "slug": "new"}], db)
+    with patch("scripts.pinterest_automation.BORING_ROOT", tmp_path):
+        assert [i["slug"] for i in load_directory_items("tools-directory")] == ["tool", "new"]
 
 @patch("scripts.pinterest_automation.get_boards")
 @patch("scripts.pinterest_automation.load_daily_facts")
 @patch("scripts.pinterest_automation.load_directory_items")
 @patch("scripts.pinterest_automation.create_pin")
-@patch("time.sleep")
-def test_automate_pinning(mock_sleep, mock_create, mock_load_dir, mock_load_facts, mock_get_boards):
+@patch("scripts.pinterest_automation.SITES_CONFIG_PATH", Path("/nonexistent/sites.json"))
+def test_automate_pinning(mock_create, mock_load_dir, mock_load_facts, mock_get_boards):
     mock_get_boards.return_value = [{"id": "board1", "name": "Default"}]
     mock_load_facts.return_value = [{"category": "Cat", "text": "Fact"}]
     mock_load_dir.return_value = [{"title": "Tool", "description": "Desc", "slug": "slug"}]
-    
-    automate_pinning(limit_per_category=1)
-    
-    assert mock_create.call_count >= 2 # One for daily facts, one for at least one directory
-    mock_sleep.assert_called()
+    limiter = MagicMock()
+
+    automate_pinning(limit_per_category=1, limiter=limiter)
+
+    assert mock_create.call_count == 4  # Daily facts plus the three legacy directories
+    assert limiter.acquire.call_count == 4
+    links = {c.args[3] for c in mock_create.call_args_list}
+    assert "https://tools.quickutils.top/api/slug.html" in links
 
 @patch("scripts.pinterest_automation.get_boards")
 def test_automate_pinning_no_boards(mock_get_boards):
@@ -109,3 +140,107 @@ def test_automate_pinning_no_boards(mock_get_boards):
     with patch("scripts.pinterest_automation.create_pin") as mock_create:
         automate_pinning()
         mock_create.assert_not_called()
+
+
+def _write_sites(tmp_path, sites):
+    for site in sites:
+        db = tmp_path / site["name"] / "database.json"
+        db.parent.mkdir()
+        db.write_text(json.dumps(site.pop("items")), encoding="utf-8")
+        site.update({"site_url": f"https://{site['name']}.test", "dist_dir": "dist", "database": str(db)})
+    config = tmp_path / "sites.json"
+    config.write_text(json.dumps(sites), encoding="utf-8")
+    return config
+
+
+def _tools(n, category="Dev"):
+    return [{"title": f"T{i}", "description": "D", "category": category, "slug": f"t{i}"} for i in range(n)]
+
+
+@patch("scripts.pinterest_automation.load_daily_facts", return_value=[])
+@patch("scripts.pinterest_automation.create_pin")
+@patch("scripts.pinterest_automation.get_board_id", side_effect=lambda name: f"id-{name}")
+def test_routes_categories_to_boards(mock_board, mock_create, mock_facts, tmp_path):
+    config = _write_sites(tmp_path, [
+        {"name": "a", "items": _tools(2, "SEO") + [
+            {"title": "X", "description": "D", "category": "Other", "slug": "x"}],
+         "pinterest": {"default_board": "A Board", "boards": {"SEO": "SEO Board"}}},
+        {"name": "b", "items": _tools(1)},
+    ])
+    pinned = automate_pinning(limit_per_category=5, board_name="Fallback", config_path=config, limiter=MagicMock())
+
+    assert pinned == 4
+    boards = sorted((c.args[0], c.args[3]) for c in mock_create.call_args_list)
+    assert boards == [
+        ("id-A Board", "https://a.test/api/x.html"),
+        ("id-Fallback", "https://b.test/api/t0.html"),
+        ("id-SEO Board", "https://a.test/api/t0.html"),
+        ("id-SEO Board", "https://a.test/api/t1.html"),
+    ]
+
+
+@patch("scripts.pinterest_automation.load_daily_facts", return_value=[])
+@patch("scripts.pinterest_automation.get_board_id", return_value="b1")
+def test_interrupted_run_resumes(mock_board, mock_facts, tmp_path):
+    config = _write_sites(tmp_path, [{"name": "a", "items": _tools(3)}])
+    transport = use_fixtures(
+        {"method": "POST", "url": PINS_URL, "status": 201, "body": {"id": "p1"}},
+        {"method": "POST", "url": PINS_URL, "status": 500, "body": "boom"},
+    )
+    assert automate_pinning(limit_per_category=2, board_name="B", config_path=config, limiter=MagicMock()) == 1
+
+    use_fixtures({"method": "POST", "url": PINS_URL, "status": 201, "body": {"id": "p2"}})
+    with patch("scripts.pinterest_automation.create_pin", wraps=create_pin) as spy:
+        automate_pinning(limit_per_category=2, board_name="B", config_path=config, limiter=MagicMock())
+    # t0 was pinned on the first run; t1 failed and comes first now
+    assert [c.args[3] for c in spy.call_args_list] == ["https://a.test/api/t1.html", "https://a.test/api/t2.html"]
+
+
+@patch("scripts.pinterest_automation.load_daily_facts", return_value=[])
+@patch("scripts.pinterest_automation.get_board_id", side_effect=lambda name: f"id-{name}")
+def test_boards_pin_concurrently(mock_board, mock_facts, tmp_path):
+    import threading
+
+    config = _write_sites(tmp_path, [
+        {"name": "a", "items": _tools(1), "pinterest": {"default_board": "A"}},
+        {"name": "b", "items": _tools(1), "pinterest": {"default_board": "B"}},
+    ])
+    barrier = threading.Barrier(2, timeout=5)
+
+    def create(board_id, *args):
+        barrier.wait()  # Deadlocks unless both boards are pinned at once
+        return {"id": board_id}
+
+    with patch("scripts.pinterest_automation.create_pin", side_effect=create):
+        assert automate_pinning(limit_per_category=1, board_name="A", config_path=config, limiter=MagicMock()) == 2
+
+
+@patch("scripts.pinterest_automation.load_daily_facts", return_value=[])
+@patch("scripts.pinterest_automation.get_board_id", return_value="b1")
+def test_network_error_does_not_abort_run(mock_board, mock_facts, tmp_path, capsys):
+    config = _write_sites(tmp_path, [{"name": "a", "items": _tools(2)}])
+    client = MagicMock()
+    client.post.side_effect = [MagicMock(status_code=201), requests.ConnectionError("down")]
+
+    with patch("scripts.pinterest_automation.get_client", return_value=client):
+        assert automate_pinning(limit_per_category=2, board_name="B", config_path=config, limiter=MagicMock()) == 1
+    assert "Board b1: 1/2 pinned" in capsys.readouterr().out
+
+
+@patch("scripts.pinterest_automation.load_daily_facts", return_value=[])
+@patch("scripts.pinterest_automation.create_pin", return_value={"id": "p"})
+@patch("scripts.pinterest_automation.get_board_id", return_value="b1")
+def test_pins_journaled_items(mock_board, mock_create, mock_facts, tmp_path):
+    config = _write_sites(tmp_path, [{"name": "a", "items": _tools(1)}])
+    journal_insert(_tools(2)[1:], tmp_path / "a" / "database.json")
+
+    assert automate_pinning(limit_per_category=5, board_name="B", config_path=config, limiter=MagicMock()) == 2
+    assert "https://a.test/api/t1.html" in [c.args[3] for c in mock_create.call_args_list]
+
+
+def test_item_key():
+    from scripts.pinterest_automation import item_key
+
+    assert item_key({"slug": "s", "id": 1}) == "s"
+    assert item_key({"id": 7, "text": "t"}) == "7"
+    assert item_key({"text": "fact"}) == item_key({"text": "fact"})
@@ -2,26 +2,39 @@ import json
 import os
 import sys
 from pathlib import Path
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import patch, MagicMock
 
 import pytest
 
-from scripts.post_pinterest import get_or_create_board, create_pin, main, make_pinterest_request
+from scripts.post_pinterest import (
+    PIN_QUEUE_NAME,
+    PinQueue,
+    build_pin,
+    create_pin,
+    get_or_create_board,
+    main,
+    make_pinterest_request,
+    pin_items,
+)
+from scripts.utils import TokenBucket, journal_insert
 
 
-@patch("scripts.post_pinterest.urlopen")
-def test_make_pinterest_request_success(mock_urlopen):
-    mock_response = MagicMock()
-    mock_response.read.return_value = json.dumps({"id": "123"}).encode("utf-8")
-    mock_urlopen.return_value.__enter__.return_value = mock_response
+def test_make_pinterest_request_success(fake_pinterest):
+    fake_pinterest.respond(200, {"id": "123"})
 
     res = make_pinterest_request("GET", "/test")
     assert res == {"id": "123"}
+    assert fake_pinterest.requests[0]["headers"]["Authorization"] == "Bearer valid_token"
 
 
-@patch("scripts.post_pinterest.urlopen")
-def test_make_pinterest_request_error(mock_urlopen):
-    mock_urlopen.side_effect = Exception("Network error")
+def test_make_pinterest_request_http_error(fake_pinterest):
+    fake_pinterest.respond(403, {"message": "forbidden"})
+    assert make_pinterest_request("GET", "/test") is None
+
+
+@patch("scripts.post_pinterest.get_client")
+def test_make_pinterest_request_error(mock_client):
+    mock_client.return_value.request.side_effect = Exception("Network error")
     res = make_pinterest_request("GET", "/test")
     assert res is None
 
@@ -76,49 +89,180 @@ def test_main_no_db(mock_exists):
     assert exc.value.code == 0
 
 
-@patch("sys.argv", ["post_pinterest.py", "http://host", "Board", "dist"])
 @patch("scripts.post_pinterest.PINTEREST_ACCESS_TOKEN", "valid_token")
-@patch("pathlib.Path.exists")
-@patch("builtins.open", new_callable=mock_open, read_data=json.dumps([]))
-def test_main_empty_db(mock_file, mock_exists):
-    mock_exists.return_value = True
-    with pytest.raises(SystemExit) as exc:
-        main()
+def test_main_empty_db(tmp_path):
+    _write_db(tmp_path, [])
+    with patch("sys.argv", ["post_pinterest.py", "http://host", "Board", str(tmp_path)]):
+        with pytest.raises(SystemExit) as exc:
+            main()
     assert exc.value.code == 0
 
 
-@patch("sys.argv", ["post_pinterest.py", "http://host", "Board", "dist"])
 @patch("scripts.post_pinterest.PINTEREST_ACCESS_TOKEN", "valid_token")
-@patch("pathlib.Path.exists")
-@patch("builtins.open", new_callable=mock_open, read_data=json.dumps([
-    {"title": "Tool 1", "description": "Desc", "category": "Cat", "slug": "slug1"}
-]))
 @patch("scripts.post_pinterest.get_or_create_board")
-@patch("scripts.post_pinterest.create_pin")
-@patch("time.sleep")
-def test_main_success(mock_sleep, mock_create_pin, mock_get_board, mock_file, mock_exists):
-    mock_exists.return_value = True
-    mock_get_board.return_value = "board123"
-    mock_create_pin.return_value = True
-    
-    # Should complete without sys.exit error
-    main()
-    
-    mock_create_pin.assert_called_once()
-    assert mock_sleep.call_count == 1
+def test_main_no_board(mock_get_board, tmp_path):
+    _write_db(tmp_path, [{"title": "Tool 1", "description": "Desc", "category": "Cat", "slug": "slug1"}])
+    mock_get_board.return_value = None
 
+    with patch("sys.argv", ["post_pinterest.py", "http://host", "Board", str(tmp_path)]):
+        with pytest.raises(SystemExit) as exc:
+            main()
+    assert exc.value.code == 1
 
-@patch("sys.argv", ["post_pinterest.py", "http://host", "Board", "dist"])
-@patch("scripts.post_pinterest.PINTEREST_ACCESS_TOKEN", "valid_token")
-@patch("pathlib.Path.exists")
-@patch("builtins.open", new_callable=mock_open, read_data=json.dumps([
-    {"title": "Tool 1", "description": "Desc", "category": "Cat", "slug": "slug1"}
-]))
-@patch("scripts.post_pinterest.get_or_create_board")
-def test_main_no_board(mock_get_board, mock_file, mock_exists):
-    mock_exists.return_value = True
-    mock_get_board.return_value = None
-    
-    with pytest.raises(SystemExit) as exc:
+
+@pytest.fixture
+def fake_pinterest(fake_http_server):
+    """Point the Pinterest client at the local fake API."""
+    with patch("scripts.post_pinterest.PINTEREST_API_BASE", fake_http_server.url), \
+         patch("scripts.post_pinterest.PINTEREST_ACCESS_TOKEN", "valid_token"):
+        yield fake_http_server
+
+
+def _pinned_links(server):
+    return [r["body"]["link"] for r in server.requests if r["path"] == "/pins"]
+
+
+def _write_db(root, items):
+    (root / "data").mkdir()
+    (root / "data" / "database.json").write_text(json.dumps(items), encoding="utf-8")
+
+
+def test_build_pin_links_to_item_page():
+    item = {"title": "Tool", "description": "Desc", "category": "Dev Tools", "slug": "tool"}
+    title, desc, link, image = build_pin(item, "https://host")
+    assert title == "Tool"
+    assert link == "https://host/api/tool.html"
+    assert "#DevTools" in desc
+
+
+def test_build_pin_prefers_item_card(tmp_path):
+    item = {"title": "Tool", "description": "Desc", "category": "Dev", "slug": "tool"}
+    (tmp_path / "tool.png").write_bytes(b"png")
+    assert build_pin(item, "https://host", tmp_path)[3] == "https://host/images/cards/tool.png"
+    assert build_pin(dict(item, slug="other"), "https://host", tmp_path)[3] == "https://host/images/og-image.png"
+
+
+def test_pin_queue_cycles_through_catalog(tmp_path, sample_items):
+    path = tmp_path / "queue.json"
+    queue = PinQueue(path, "Board")
+    first = queue.next_batch(sample_items, 3)
+    for item in first:
+        queue.mark_pinned(item["slug"])
+
+    queue = PinQueue(path, "Board")
+    second = queue.next_batch(sample_items, 3)
+    assert [i["slug"] for i in second] == [i["slug"] for i in sample_items[3:]]
+    for item in second:
+        queue.mark_pinned(item["slug"])
+
+    queue = PinQueue(path, "Board")
+    assert queue.next_batch(sample_items, 2) == sample_items[:2]
+    assert queue.cycle == 1
+
+
+def test_pin_queue_is_per_board_and_prunes_removed_items(tmp_path, sample_items):
+    path = tmp_path / "queue.json"
+    queue = PinQueue(path, "A")
+    queue.mark_pinned("dog-api")
+    queue.mark_pinned("gone")
+
+    assert PinQueue(path, "B").pinned == set()
+    queue = PinQueue(path, "A")
+    queue.next_batch(sample_items, 1)
+    assert queue.pinned == {"dog-api"}
+
+
+def test_pin_queues_sharing_a_file_save_concurrently(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    path = tmp_path / "queue.json"
+    queues = [PinQueue(path, board) for board in "ABCD"]
+
+    def pin_all(queue):
+        for i in range(25):
+            queue.mark_pinned(f"{queue.board}-{i}")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(pin_all, queues))
+
+    for board in "ABCD":
+        assert len(PinQueue(path, board).pinned) == 25
+
+
+def test_pin_items_resumes_after_failure(tmp_path, fake_pinterest, sample_items):
+    queue = PinQueue(tmp_path / "queue.json", "Board")
+    limiter = TokenBucket(1000, 10)
+    fake_pinterest.respond(201, {"id": "p1"})
+    fake_pinterest.respond(500, {"message": "boom"})
+    fake_pinterest.respond(201, {"id": "p3"})
+
+    batch = queue.next_batch(sample_items, 3)
+    assert pin_items("b1", batch, "https://host", queue, limiter, workers=1) == 2
+    assert queue.pinned == {sample_items[0]["slug"], sample_items[2]["slug"]}
+
+    # The failed item is first in line next run
+    queue = PinQueue(tmp_path / "queue.json", "Board")
+    assert queue.next_batch(sample_items, 1) == [sample_items[1]]
+
+
+def test_pin_items_uses_limiter(tmp_path, fake_pinterest, sample_items):
+    limiter = MagicMock()
+    queue = PinQueue(tmp_path / "queue.json", "Board")
+    fake_pinterest.respond(201, {"id": "p1"})
+    fake_pinterest.respond(201, {"id": "p2"})
+    assert pin_items("b1", sample_items[:2], "https://host", queue, limiter) == 2
+    assert limiter.acquire.call_count == 2
+
+
+def test_main_rotates_across_runs(tmp_path, fake_pinterest, sample_items, isolated_build_cache):
+    _write_db(tmp_path, sample_items)
+    argv = ["post_pinterest.py", "http://host", "Board", str(tmp_path)]
+
+    for _ in range(2):
+        fake_pinterest.respond(200, {"items": [{"name": "Board", "id": "b1"}]})
+        for n in range(3):
+            fake_pinterest.respond(201, {"id": f"p{n}"})
+        with patch("sys.argv", argv):
+            main()
+
+    links = _pinned_links(fake_pinterest)
+    assert sorted(links) == sorted(f"http://host/api/{i['slug']}.html" for i in sample_items)
+    assert (isolated_build_cache / PIN_QUEUE_NAME).exists()
+
+
+def test_main_pins_journaled_items(tmp_path, fake_pinterest, sample_items):
+    _write_db(tmp_path, sample_items[:1])
+    journal_insert([dict(sample_items[1], slug="journaled")], tmp_path / "data" / "database.json")
+    fake_pinterest.respond(200, {"items": [{"name": "Board", "id": "b1"}]})
+    fake_pinterest.respond(201, {"id": "p1"})
+    fake_pinterest.respond(201, {"id": "p2"})
+
+    with patch("sys.argv", ["post_pinterest.py", "http://host", "Board", str(tmp_path)]):
         main()
-    assert exc.value.code == 1
+    assert "http://host/api/journaled.html" in _pinned_links(fake_pinterest)
+
+
+def test_get_or_create_board_paginates_and_caches(fake_pinterest):
+    fake_pinterest.respond(200, {"items": [{"name": "Other", "id": "b1"}], "bookmark": "next"})
+    fake_pinterest.respond(200, {"items": [{"name": "Board", "id": "b2"}], "bookmark": None})
+    assert get_or_create_board("Board", "Desc") == "b2"
+    assert fake_pinterest.requests[1]["path"].endswith("bookmark=next")
+
+    # Second lookup is served from the cache
+    assert get_or_create_board("Board", "Desc") == "b2"
+    assert len(fake_pinterest.requests) == 2
+
+
+def test_get_or_create_board_does_not_create_when_listing_fails(fake_pinterest):
+    fake_pinterest.respond(200, {"items": [{"name": "Other", "id": "b1"}], "bookmark": "next"})
+    fake_pinterest.respond(403, {"message": "boom"})
+    assert get_or_create_board("Board", "Desc") is None
+    assert "POST" not in [r["method"] for r in fake_pinterest.requests]
+
+
+def test_get_or_create_board_caches_created_board(fake_pinterest):
+    fake_pinterest.respond(200, {"items": []})
+    fake_pinterest.respond(201, {"id": "new"})
+    assert get_or_create_board("Board", "Desc") == "new"
+    assert get_or_create_board("Board", "Desc") == "new"
+    assert [r["method"] for r in fake_pinterest.requests] == ["GET", "POST"]
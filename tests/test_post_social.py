@@ -1,55 +1,92 @@
 """Tests for scripts/post_social.py"""
+import json
 from unittest.mock import patch
 
 import pytest
 import responses
 
 from scripts.post_social import (
+    ROTATION_STATE_NAME,
+    find_item,
     format_post,
-    get_daily_seed,
-    pick_random_item,
+    pick_next_item,
     post_to_mastodon,
+    rotation_rank,
 )
 
 
-class TestGetDailySeed:
-    """Test date-seeded random generation."""
-
-    def test_returns_integer(self):
-        seed = get_daily_seed()
-        assert isinstance(seed, int)
-
-    def test_deterministic_same_day(self):
-        seed1 = get_daily_seed()
-        seed2 = get_daily_seed()
-        assert seed1 == seed2
-
-    def test_different_dates_different_seeds(self):
-        with patch("scripts.post_social.datetime") as mock_dt:
-            from datetime import timezone
-            mock_dt.now.return_value.strftime.return_value = "2025-01-01"
-            mock_dt.now.return_value.strftime.side_effect = None
-            # Different approach: just verify the seed is an int
-            seed = get_daily_seed()
-            assert isinstance(seed, int)
-
-
-class TestPickRandomItem:
-    """Test random item selection."""
-
-    def test_picks_an_item(self, sample_items):
-        item = pick_random_item(sample_items)
-        assert item in sample_items
-
-    def test_deterministic_for_same_seed(self, sample_items):
-        item1 = pick_random_item(sample_items)
-        item2 = pick_random_item(sample_items)
-        assert item1 == item2  # Same day = same seed = same pick
-
-    def test_single_item(self):
-        items = [{"title": "Only One", "slug": "only-one"}]
-        item = pick_random_item(items)
-        assert item["title"] == "Only One"
+class TestRotation:
+    """Test the non-repeating rotation scheduler."""
+
+    def _run(self, items, days, state=None):
+        """Simulate one successful post per day; return the slugs posted."""
+        state = state or {}
+        posted = []
+        for _ in range(days):
+            day = int(state.get("date", "day-0")[4:]) + 1
+            with patch("scripts.post_social.get_today", return_value=f"day-{day}"):
+                item, state = pick_next_item(lambda: iter(items), state)
+            posted.append(item["slug"])
+        return posted, state
+
+    def test_rank_is_keyed_by_cycle(self):
+        assert rotation_rank("dog-api", 0) == rotation_rank("dog-api", 0)
+        assert rotation_rank("dog-api", 0) != rotation_rank("dog-api", 1)
+
+    def test_no_repeats_within_a_cycle(self, sample_items):
+        posted, state = self._run(sample_items, len(sample_items))
+        assert sorted(posted) == sorted(i["slug"] for i in sample_items)
+        assert state["cycle"] == 0
+
+    def test_starts_new_cycle_after_catalog(self, sample_items):
+        posted, state = self._run(sample_items, len(sample_items) * 2)
+        n = len(sample_items)
+        assert sorted(posted[n:]) == sorted(posted[:n])
+        assert state["cycle"] == 1
+
+    def test_never_repeats_across_cycle_boundaries(self, sample_items):
+        for items in (sample_items[:2], sample_items[:3], sample_items):
+            n = len(items)
+            posted, _ = self._run(items, n * 20)
+            assert all(a != b for a, b in zip(posted, posted[1:]))
+            # Every cycle still posts each item exactly once
+            for start in range(0, len(posted), n):
+                assert sorted(posted[start:start + n]) == sorted(i["slug"] for i in items)
+
+    def test_duplicate_slugs_posted_once_and_reported(self, sample_items, capsys):
+        items = sample_items + [dict(sample_items[0], title="Copy")]
+        posted, _ = self._run(items, len(sample_items))
+        assert sorted(posted) == sorted(i["slug"] for i in sample_items)
+        assert f"Duplicate slug '{sample_items[0]['slug']}'" in capsys.readouterr().out
+
+    def test_survives_catalog_growth(self, sample_items):
+        first, state = self._run(sample_items[:3], 2)
+        grown = sample_items + [dict(sample_items[0], slug=f"new-{i}", title=f"New {i}") for i in range(20)]
+
+        posted = list(first)
+        while state["cycle"] == 0:
+            slugs, state = self._run(grown, 1, state)
+            posted += slugs
+        # Nothing repeats before the cycle ends, even though the catalog grew
+        assert len(set(posted[:-1])) == len(posted) - 1
+
+        # The next cycle covers the whole grown catalog exactly once
+        cycle, state = self._run(grown, len(grown) - 1, state)
+        assert sorted(posted[-1:] + cycle) == sorted(i["slug"] for i in grown)
+
+    def test_same_day_rerun_returns_same_item(self, sample_items):
+        with patch("scripts.post_social.get_today", return_value="2025-01-01"):
+            item, state = pick_next_item(lambda: iter(sample_items), {})
+            again, state2 = pick_next_item(lambda: iter(sample_items), state)
+        assert again == item
+        assert state2 == state
+
+    def test_empty_catalog(self):
+        assert pick_next_item(lambda: iter([]), {}) == (None, {})
+
+    def test_find_item_by_slug(self, sample_items):
+        assert find_item(lambda: iter(sample_items), "spotify")["title"] == "Spotify"
+        assert find_item(lambda: iter(sample_items), "missing") is None
 
 
 class TestFormatPost:
@@ -198,7 +235,7 @@ class TestMain:
         import json
         db_path.write_text(json.dumps(sample_items), encoding="utf-8")
 
-        with patch("scripts.post_social.load_database", return_value=sample_items), \
+        with patch("scripts.post_social.iter_database", lambda: iter(sample_items)), \
              patch("scripts.post_social.post_to_mastodon", return_value=False), \
              pytest.raises(SystemExit) as exc_info:
             main()
@@ -208,7 +245,7 @@ class TestMain:
     def test_main_empty_database(self):
         from scripts.post_social import main
 
-        with patch("scripts.post_social.load_database", return_value=[]), \
+        with patch("scripts.post_social.iter_database", lambda: iter([])), \
              pytest.raises(SystemExit) as exc_info:
             main()
 
@@ -217,9 +254,26 @@ class TestMain:
     def test_main_successful_post(self, sample_items):
         from scripts.post_social import main
 
-        with patch("scripts.post_social.load_database", return_value=sample_items), \
+        with patch("scripts.post_social.iter_database", lambda: iter(sample_items)), \
              patch("scripts.post_social.post_to_mastodon", return_value=True), \
              pytest.raises(SystemExit) as exc_info:
             main()
 
         assert exc_info.value.code == 0
+
+    def test_main_advances_rotation_only_on_success(self, sample_items, isolated_build_cache):
+        from scripts.post_social import main
+
+        state_path = isolated_build_cache / ROTATION_STATE_NAME
+        with patch("scripts.post_social.iter_database", lambda: iter(sample_items)):
+            with patch("scripts.post_social.post_to_mastodon", return_value=False), \
+                 pytest.raises(SystemExit):
+                main()
+            assert not state_path.exists()
+
+            with patch("scripts.post_social.post_to_mastodon", return_value=True), \
+                 pytest.raises(SystemExit):
+                main()
+        state = json.loads(state_path.read_text())
+        assert state["cycle"] == 0
+        assert state["slug"] in {i["slug"] for i in sample_items}
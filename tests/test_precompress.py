@@ -0,0 +1,107 @@
+"""Tests for scripts/precompress.py"""
+import gzip
+import tomllib
+from unittest.mock import patch
+
+import pytest
+
+from scripts import precompress
+from scripts.precompress import (
+    HEADER_RULES,
+    PROJECT_ROOT,
+    build_headers_file,
+    iter_text_files,
+    main,
+    precompress as run_precompress,
+    write_headers_file,
+)
+
+
+@pytest.fixture
+def dist(tmp_path):
+    dist_dir = tmp_path / "dist"
+    (dist_dir / "css").mkdir(parents=True)
+    (dist_dir / "images").mkdir()
+    (dist_dir / "index.html").write_text("<html>" + "hello directory " * 200 + "</html>", encoding="utf-8")
+    (dist_dir / "css" / "styles.css").write_text("body{color:red}" * 100, encoding="utf-8")
+    (dist_dir / "tiny.txt").write_text("x", encoding="utf-8")
+    (dist_dir / "images" / "logo.png").write_bytes(b"\x89PNG" * 100)
+    return dist_dir
+
+
+class TestPrecompress:
+    """Test sibling output and the compression cache."""
+
+    def test_writes_gzip_siblings(self, dist):
+        report = run_precompress(dist, workers=1)
+
+        html = (dist / "index.html").read_bytes()
+        assert gzip.decompress((dist / "index.html.gz").read_bytes()) == html
+        assert (dist / "css" / "styles.css.gz").exists()
+        assert report["files"] == 3
+        assert report[".gz"] < report["bytes"]
+
+    def test_skips_binary_and_incompressible_files(self, dist):
+        run_precompress(dist, workers=1)
+        assert not (dist / "images" / "logo.png.gz").exists()
+        # Compressing one byte only adds overhead
+        assert not (dist / "tiny.txt.gz").exists()
+
+    def test_reuses_cache_for_unchanged_files(self, dist):
+        assert run_precompress(dist, workers=1)["compressed"] == 3
+
+        (dist / "index.html").write_text("<html>changed " * 100, encoding="utf-8")
+        with patch.object(precompress, "_compress_to_cache", wraps=precompress._compress_to_cache) as spy:
+            report = run_precompress(dist, workers=1)
+
+        assert report["compressed"] == 1
+        assert spy.call_count == 1
+        assert gzip.decompress((dist / "index.html.gz").read_bytes()).startswith(b"<html>changed")
+
+    def test_brotli_siblings(self, dist):
+        brotli = pytest.importorskip("brotli")
+        run_precompress(dist, workers=1)
+        assert brotli.decompress((dist / "index.html.br").read_bytes()) == (dist / "index.html").read_bytes()
+
+    def test_parallel_matches_inline(self, dist, tmp_path):
+        run_precompress(dist, workers=2)
+        assert gzip.decompress((dist / "css" / "styles.css.gz").read_bytes()) == (dist / "css" / "styles.css").read_bytes()
+
+    def test_iter_text_files_ignores_siblings(self, dist):
+        run_precompress(dist, workers=1)
+        assert {p.name for p in iter_text_files(dist)} == {"index.html", "styles.css", "tiny.txt"}
+
+
+class TestHeadersFile:
+    """Test the generated _headers file."""
+
+    def test_format(self):
+        text = build_headers_file([("/*", {"Vary": "Accept-Encoding"}), ("/css/*", {"Cache-Control": "immutable"})])
+        assert text.splitlines()[1:] == ["/*", "  Vary: Accept-Encoding", "/css/*", "  Cache-Control: immutable"]
+
+    def test_rules_match_netlify_toml(self):
+        """HEADER_RULES mirrors netlify.toml, plus the Vary header it adds."""
+        config = tomllib.loads((PROJECT_ROOT / "netlify.toml").read_text(encoding="utf-8"))
+        netlify = {rule["for"]: rule["values"] for rule in config["headers"]}
+        ours = {pattern: dict(headers) for pattern, headers in HEADER_RULES}
+        ours["/*"].pop("Vary")
+        assert ours == netlify
+
+    def test_write(self, tmp_path):
+        path = write_headers_file(tmp_path)
+        assert "Vary: Accept-Encoding" in path.read_text(encoding="utf-8")
+
+
+class TestMain:
+    """Test the CLI."""
+
+    def test_missing_dist_exits(self, tmp_path):
+        with patch("sys.argv", ["precompress", str(tmp_path / "missing")]):
+            with pytest.raises(SystemExit):
+                main()
+
+    def test_compresses_given_dirs(self, dist):
+        with patch("sys.argv", ["precompress", str(dist)]):
+            main()
+        assert (dist / "_headers").exists()
+        assert (dist / "index.html.gz").exists()
@@ -0,0 +1,80 @@
+"""Tests for scripts/preview_server.py"""
+import gzip
+import threading
+import urllib.request
+
+import pytest
+
+from scripts.precompress import write_headers_file
+from scripts.preview_server import accepted_encodings, make_server, parse_headers_file
+
+
+@pytest.fixture
+def server(tmp_path):
+    dist = tmp_path / "dist"
+    dist.mkdir()
+    (dist / "index.html").write_text("<p>plain</p>", encoding="utf-8")
+    (dist / "index.html.gz").write_bytes(gzip.compress(b"<p>gzip</p>"))
+    (dist / "about.html").write_text("<p>about</p>", encoding="utf-8")
+    write_headers_file(dist)
+
+    srv = make_server(dist, port=0)
+    srv.RequestHandlerClass.func.log_message = lambda *args: None
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def _get(url, encoding=None):
+    request = urllib.request.Request(url, headers={"Accept-Encoding": encoding} if encoding else {})
+    with urllib.request.urlopen(request, timeout=5) as res:
+        return res.headers, res.read()
+
+
+class TestPreviewServer:
+    """Test content negotiation and _headers rules."""
+
+    def test_serves_gzip_sibling(self, server):
+        headers, body = _get(f"{server}/", "br;q=0, gzip")
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["Content-Type"] == "text/html"
+        assert gzip.decompress(body) == b"<p>gzip</p>"
+
+    def test_plain_without_accept_encoding(self, server):
+        headers, body = _get(f"{server}/index.html")
+        assert headers["Content-Encoding"] is None
+        assert body == b"<p>plain</p>"
+
+    def test_plain_when_no_sibling(self, server):
+        headers, body = _get(f"{server}/about.html", "gzip")
+        assert body == b"<p>about</p>"
+
+    def test_applies_headers_file(self, server):
+        headers, _ = _get(f"{server}/about.html")
+        assert headers["Vary"] == "Accept-Encoding"
+        assert headers["X-Frame-Options"] == "DENY"
+
+
+class TestHelpers:
+    """Test header parsing helpers."""
+
+    def test_accepted_encodings(self):
+        assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+        assert accepted_encodings("br;q=0, gzip;q=0.5") == {"gzip"}
+        assert accepted_encodings(None) == set()
+
+    def test_malformed_qvalue_counts_as_accepted(self):
+        assert accepted_encodings("gzip;q=x, br;q=") == {"gzip", "br"}
+        assert accepted_encodings("gzip; Q=0") == set()
+
+    def test_malformed_qvalue_is_not_an_error(self, server):
+        headers, body = _get(f"{server}/", "gzip;q=x")
+        assert headers["Content-Encoding"] == "gzip"
+
+    def test_parse_headers_file(self, tmp_path):
+        path = tmp_path / "_headers"
+        path.write_text("# comment\n/*\n  Vary: Accept-Encoding\n/js/*\n  Cache-Control: max-age=1\n", encoding="utf-8")
+        assert parse_headers_file(path) == [("/*", {"Vary": "Accept-Encoding"}), ("/js/*", {"Cache-Control": "max-age=1"})]
+        assert parse_headers_file(tmp_path / "missing") == []
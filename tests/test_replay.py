@@ -0,0 +1,163 @@
+import json
+
+import pytest
+from scripts.http_client import HttpClient, get_client
+from scripts.replay import (
+    RecordingTransport,
+    ReplayServer,
+    format_report,
+    main,
+    record,
+    replay,
+    run_benchmark,
+)
+
+FIXTURES = [
+    {"method": "GET", "url": "https://api.example.test/items?page=1", "status": 200, "body": {"page": 1}},
+    {"method": "GET", "url": "https://api.example.test/items", "status": 200, "body": {"page": 0}},
+    {"method": "POST", "url": "https://other.test/submit", "status": 202, "body": "accepted"},
+]
+
+
+def test_record_captures_exchanges(fake_http_server, tmp_path):
+    fake_http_server.respond(200, {"ok": True})
+    out = tmp_path / "fixtures" / "rec.json"
+
+    with record(out) as transport:
+        get_client().post(fake_http_server.url + "/hook?x=1", json={"a": 1}, headers={"Authorization": "secret"})
+
+    saved = json.loads(out.read_text(encoding="utf-8"))
+    assert transport.fixtures == saved
+    assert saved[0]["method"] == "POST"
+    assert saved[0]["url"].endswith("/hook?x=1")
+    assert saved[0]["body"] == {"ok": True}
+    assert saved[0]["request_body"] == {"a": 1}
+    assert "secret" not in out.read_text(encoding="utf-8")
+
+
+def test_recording_transport_save_is_replayable(fake_http_server, tmp_path):
+    fake_http_server.respond(200, "plain text")
+    transport = RecordingTransport()
+    HttpClient(transport=transport).get(fake_http_server.url + "/page")
+    path = transport.save(tmp_path / "page.json")
+
+    with replay(path) as (srv, client):
+        assert client.get(fake_http_server.url + "/page").text == "plain text"
+
+
+def test_replay_matches_host_and_path():
+    with replay(FIXTURES) as (srv, client):
+        assert client.get("https://api.example.test/items?page=1").json() == {"page": 1}
+        # Unknown query falls back to the bare path
+        assert client.get("https://api.example.test/items?page=9").json() == {"page": 0}
+        assert client.post("https://other.test/submit", data="x").status_code == 202
+        # Same path on a different host is not a match
+        assert client.get("https://other.test/items", retries=0).status_code == 404
+    assert srv.statuses == {200: 2, 202: 1, 404: 1}
+
+
+def test_replay_resets_shared_client():
+    with replay(FIXTURES) as (srv, client):
+        assert get_client() is client
+    assert get_client() is not client
+
+
+def test_error_injection_is_seeded():
+    def run(seed):
+        srv = ReplayServer(FIXTURES, error_rate=0.5, seed=seed)
+        try:
+            return [srv.respond("GET", "api.example.test", "/items")[0] for _ in range(20)]
+        finally:
+            srv.close()
+
+    first = run(3)
+    assert first == run(3)
+    assert {200, 503} <= set(first)
+
+
+def test_error_injection_ignores_interleaving():
+    def run(order):
+        srv = ReplayServer(FIXTURES, error_rate=0.5, seed=3)
+        try:
+            statuses = {"/items": [], "/items?page=1": []}
+            for path in order:
+                statuses[path].append(srv.respond("GET", "api.example.test", path)[0])
+            return statuses
+        finally:
+            srv.close()
+
+    assert run(["/items"] * 10 + ["/items?page=1"] * 10) == run(["/items", "/items?page=1"] * 10)
+
+
+def test_rate_limit_answers_429():
+    srv = ReplayServer(FIXTURES, rate_limit=0.001, burst=2)
+    try:
+        statuses = [srv.respond("GET", "api.example.test", "/items") for _ in range(3)]
+    finally:
+        srv.close()
+    assert [s[0] for s in statuses] == [200, 200, 429]
+    assert statuses[2][2] == {"Retry-After": "1"}
+
+
+def test_latency_is_applied(retry_sleep):
+    srv = ReplayServer(FIXTURES, latency=0.25)
+    try:
+        srv.respond("GET", "api.example.test", "/items")
+    finally:
+        srv.close()
+    retry_sleep.assert_any_call(0.25)
+
+
+def test_client_retries_through_injected_failures():
+    with replay(FIXTURES, error_rate=0.5, seed=1) as (srv, client):
+        statuses = [client.get("https://api.example.test/items", retries=10).status_code for _ in range(10)]
+    assert statuses == [200] * 10
+    assert srv.statuses[503] > 0
+
+
+@pytest.mark.parametrize("scenario", ["indexnow", "pinterest", "mastodon", "fetch"])
+def test_run_benchmark_scenarios(scenario):
+    report = run_benchmark(scenario, calls=6, workers=3)
+    assert report["succeeded"] == 6
+    assert report["http_requests"] == 6
+    assert sum(report["server_statuses"].values()) == 6
+    assert scenario in format_report(report)
+
+
+def test_run_benchmark_counts_failures():
+    report = run_benchmark("mastodon", calls=20, workers=2, error_rate=1.0)
+    assert report["failed"] == 20
+    assert report["server_statuses"] == {503: 20}
+
+
+def test_run_benchmark_with_recorded_fixtures(tmp_path):
+    path = tmp_path / "fetch.json"
+    path.write_text(json.dumps([{"method": "GET", "url": "https://api.publicapis.org/entries",
+                                 "status": 200, "body": {"entries": []}}]), encoding="utf-8")
+    assert run_benchmark("fetch", calls=2, workers=1, fixtures=str(path))["succeeded"] == 2
+
+
+def test_main_bench_json(capsys):
+    main(["bench", "indexnow", "--calls", "2", "--workers", "2", "--json"])
+    report = json.loads(capsys.readouterr().out)
+    assert report["scenario"] == "indexnow"
+    assert report["succeeded"] == 2
+
+
+def test_main_record(fake_http_server, tmp_path, capsys, monkeypatch):
+    fake_http_server.respond(200, {"entries": []})
+    calls = []
+
+    def run_module(name, **kwargs):
+        calls.append((name, list(__import__("sys").argv)))
+        get_client().get(fake_http_server.url + "/entries")
+        raise SystemExit(0)
+
+    monkeypatch.setattr("runpy.run_module", run_module)
+    out = tmp_path / "rec.json"
+
+    main(["record", str(out), "scripts.fetch_data", "--flag"])
+
+    assert calls == [("scripts.fetch_data", ["scripts.fetch_data", "--flag"])]
+    assert "Recorded 1 exchanges" in capsys.readouterr().out
+    assert json.loads(out.read_text(encoding="utf-8"))[0]["body"] == {"entries": []}
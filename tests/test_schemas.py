@@ -0,0 +1,99 @@
+"""Tests for scripts/schemas.py"""
+import pytest
+
+from scripts.schemas import SCHEMAS, compile_schema, get_render_plan
+
+
+class TestApiSchema:
+    """Test the built-in API schema against the original template output."""
+
+    def test_free_https_cors_item(self, sample_items):
+        view = get_render_plan().present(sample_items[0])
+        assert [p["label"] for p in view["properties"]] == ["Authentication", "HTTPS", "CORS"]
+        assert [(p["text"], p["tone"]) for p in view["properties"]] == [
+            ("🔓 None Required", "good"), ("✅ Supported", "good"), ("✅ Enabled", "good"),
+        ]
+        assert view["badges"] == [
+            {"text": "🔓 No Auth", "css": "badge-free"},
+            {"text": "🔒 HTTPS", "css": "badge-https"},
+            {"text": "✅ CORS", "css": "badge-cors"},
+        ]
+        assert view["facets"] == {"auth": "None", "https": "true", "cors": "yes"}
+
+    def test_keyed_http_item(self):
+        view = get_render_plan("api").present(
+            {"title": "T", "auth": "apiKey", "https": False, "cors": "unknown"}
+        )
+        assert [(p["text"], p["tone"]) for p in view["properties"]] == [
+            ("🔐 apiKey", "neutral"), ("⚠️ Not Available", "warn"), ("❓ Unknown", "neutral"),
+        ]
+        assert [b["text"] for b in view["badges"]] == ["🔐 apiKey", "⚠️ HTTP"]
+
+
+class TestRenderPlan:
+    """Test schema compilation and item presentation."""
+
+    def test_builtin_plans_are_compiled_once(self):
+        assert get_render_plan("tools") is get_render_plan("tools")
+
+    def test_unknown_schema(self):
+        with pytest.raises(ValueError, match="Unknown schema"):
+            get_render_plan("nope")
+
+    def test_field_without_key(self):
+        with pytest.raises(ValueError):
+            compile_schema({"fields": [{"label": "X"}]})
+
+    def test_skips_missing_and_empty_fields(self):
+        view = get_render_plan("opensource").present({"license": "MIT", "alternative_to": "", "tags": []})
+        assert [p["key"] for p in view["properties"]] == ["license"]
+
+    def test_list_values_are_joined(self):
+        view = get_render_plan("tools").present({"pricing": "Free", "tags": ["news", "world"]})
+        assert view["properties"][-1]["text"] == "news, world"
+        assert view["badges"] == [{"text": "🆓 Free", "css": "badge-free"}]
+
+    def test_field_without_matching_case_is_hidden(self):
+        plan = compile_schema({"fields": [{"key": "status", "cases": {"ok": {"text": "OK"}}}]})
+        assert plan.present({"status": "broken"})["properties"] == []
+        assert plan.present({"status": "ok"})["properties"][0]["label"] == "Status"
+
+    def test_custom_schema_labels_extend_defaults(self):
+        plan = compile_schema({"labels": {"item": "Widget", "items": "Widgets"}})
+        assert plan.labels["items"] == "Widgets"
+        assert plan.labels["schema_type"] == "SoftwareApplication"
+
+    def test_facet_keys(self):
+        assert get_render_plan("datasets").facet_keys == ["format", "license"]
+
+    def test_facet_options(self):
+        plan = get_render_plan("api")
+        items = plan.present_items([
+            {"auth": "apiKey", "https": True, "cors": "yes"},
+            {"auth": "None", "https": True, "cors": "no"},
+            {"auth": "apiKey", "https": True, "cors": "yes"},
+        ])
+        assert plan.facet_options(items) == [
+            {"key": "auth", "label": "Authentication", "options": [
+                {"value": "apiKey", "text": "🔐 apiKey"},
+                {"value": "None", "text": "🔓 None Required"},
+            ]},
+            {"key": "cors", "label": "CORS", "options": [
+                {"value": "no", "text": "❌ Disabled"},
+                {"value": "yes", "text": "✅ Enabled"},
+            ]},
+        ]
+
+    def test_present_items_formats_each_item_once(self, sample_items):
+        plan = get_render_plan()
+        presented = plan.present_items(sample_items)
+        assert all("view" in item for item in presented)
+        assert all("view" not in item for item in sample_items)
+        # Already-presented items are passed through untouched
+        again = plan.present_items(presented)
+        assert all(a is b for a, b in zip(again, presented))
+
+    @pytest.mark.parametrize("name", sorted(SCHEMAS))
+    def test_builtin_schemas_compile(self, name):
+        plan = get_render_plan(name)
+        assert {"item", "items", "visit", "schema_type"} <= set(plan.labels)
@@ -0,0 +1,70 @@
+"""Tests for scripts/search_index.py"""
+import json
+
+from scripts.search_index import MAX_POSTINGS, build_search_index, build_shards, score_item, tokenize
+
+
+class TestTokenize:
+    """Test search tokenization."""
+
+    def test_lowercases_and_splits(self):
+        assert tokenize("Open-Weather API v2.5") == ["open", "weather", "api", "v2"]
+
+    def test_drops_stopwords_and_short_tokens(self):
+        assert tokenize("The weather of a city") == ["weather", "city"]
+
+    def test_strips_accents(self):
+        assert tokenize("Café Météo") == ["cafe", "meteo"]
+
+    def test_empty(self):
+        assert tokenize("") == []
+        assert tokenize(None) == []
+
+
+class TestShards:
+    """Test the in-memory sharded index."""
+
+    def test_field_weights(self):
+        scores = score_item({"title": "Weather", "category": "Weather", "description": "weather weather data"})
+        assert scores == {"weather": 6, "data": 1}
+
+    def test_tokens_go_to_prefix_shards(self, sample_items):
+        shards = build_shards(sample_items)
+        assert "weather" in shards["we"]["terms"]
+        assert "animals" in shards["an"]["terms"]
+        assert all(term.startswith(prefix) for prefix, shard in shards.items() for term in shard["terms"])
+
+    def test_postings_ranked_and_docs_included(self):
+        items = [
+            {"slug": "forecast", "title": "Forecast", "description": "Weather forecasts", "category": "Science"},
+            {"slug": "openweather", "title": "OpenWeather Weather", "description": "", "category": "Weather"},
+        ]
+        shard = build_shards(items)["we"]
+        assert shard["terms"]["weather"] == [[1, 5], [0, 1]]
+        assert shard["docs"] == {"0": ["forecast", "Forecast", "Science"], "1": ["openweather", "OpenWeather Weather", "Weather"]}
+
+    def test_postings_capped(self):
+        items = [{"slug": f"s{i}", "title": f"Item {i}", "description": "common"} for i in range(MAX_POSTINGS + 5)]
+        assert len(build_shards(items)["co"]["terms"]["common"]) == MAX_POSTINGS
+
+
+class TestBuildSearchIndex:
+    """Test writing the shards to dist/."""
+
+    def test_writes_shards_and_meta(self, tmp_path, sample_items):
+        count = build_search_index(sample_items, tmp_path)
+
+        meta = json.loads((tmp_path / "search" / "meta.json").read_text(encoding="utf-8"))
+        assert meta["prefix"] == 2
+        assert meta["docs"] == len(sample_items)
+        assert len(meta["shards"]) == count
+        shard = json.loads((tmp_path / "search" / "ca.json").read_text(encoding="utf-8"))
+        assert "cat" in shard["terms"]
+
+    def test_replaces_stale_shards(self, tmp_path, sample_items):
+        stale = tmp_path / "search" / "zz.json"
+        stale.parent.mkdir()
+        stale.write_text("{}", encoding="utf-8")
+
+        build_search_index(sample_items, tmp_path)
+        assert not stale.exists()
@@ -0,0 +1,71 @@
+"""Tests for scripts/social_cards.py"""
+from unittest.mock import patch
+
+import pytest
+
+from scripts import social_cards
+from scripts.schemas import get_render_plan
+from scripts.social_cards import CARDS_DIR, build_social_cards, card_fields, card_hash, card_url
+
+
+class TestCardHash:
+    """Test the card cache key."""
+
+    def test_ignores_fields_not_drawn(self, sample_items):
+        item = dict(sample_items[0])
+        changed = dict(item, description="Something else", url="https://elsewhere")
+        assert card_hash(item) == card_hash(changed)
+
+    def test_changes_with_drawn_fields(self, sample_items):
+        item = sample_items[0]
+        assert card_hash(item) != card_hash(dict(item, title="Renamed"))
+        assert card_hash(item) != card_hash(dict(item, https=False))
+        assert card_hash(item) != card_hash(item, site_name="Other Directory")
+
+    def test_badges_follow_item_schema(self):
+        item = {"title": "Census", "category": "Government", "slug": "census", "format": "CSV", "license": "MIT"}
+        item["view"] = get_render_plan("datasets").present(item)
+        assert card_fields(item)["badges"] == [["CSV", "badge-https"], ["MIT", "badge-free"]]
+
+    def test_default_schema_badges_without_view(self, sample_items):
+        badges = [text for text, _ in card_fields(sample_items[0])["badges"]]
+        assert "HTTPS" in badges
+
+    def test_card_url(self):
+        assert card_url("dog-api") == "/images/cards/dog-api.png"
+
+
+class TestBuildSocialCards:
+    """Test card rendering, caching and output."""
+
+    def test_skips_without_pillow(self, tmp_path, sample_items):
+        with patch.object(social_cards, "Image", None):
+            assert build_social_cards(sample_items, tmp_path) == {}
+        assert not (tmp_path / CARDS_DIR).exists()
+
+    def test_renders_only_uncached_cards(self, tmp_path, sample_items, isolated_build_cache):
+        rendered = []
+
+        def fake_render(fields):
+            rendered.append(fields["title"])
+            return b"png:" + fields["title"].encode()
+
+        with patch.object(social_cards, "Image", object()), \
+             patch.object(social_cards, "render_card", fake_render):
+            cards = build_social_cards(sample_items, tmp_path / "dist", workers=1)
+            assert len(rendered) == len(sample_items)
+
+            changed = [dict(sample_items[0], title="Dog API v2")] + sample_items[1:]
+            build_social_cards(changed, tmp_path / "dist", workers=1)
+
+        assert rendered[len(sample_items):] == ["Dog API v2"]
+        assert cards["dog-api"] == "/images/cards/dog-api.png"
+        assert (tmp_path / "dist" / CARDS_DIR / "dog-api.png").read_bytes() == b"png:Dog API v2"
+        assert len(list((isolated_build_cache / "cards").glob("*.png"))) == len(sample_items) + 1
+
+    def test_renders_real_png_in_parallel(self, tmp_path, sample_items):
+        Image = pytest.importorskip("PIL.Image")
+        cards = build_social_cards(sample_items[:2], tmp_path, workers=2)
+        assert set(cards) == {"dog-api", "cat-facts"}
+        with Image.open(tmp_path / CARDS_DIR / "dog-api.png") as img:
+            assert img.size == social_cards.CARD_SIZE
@@ -5,9 +5,17 @@ from unittest.mock import patch
 import pytest
 from jinja2 import Environment, FileSystemLoader
 
+from scripts.build_directory import asset_url
+from scripts.schemas import get_render_plan
 from scripts.utils import TEMPLATES_DIR, slugify, truncate
 
 
+@pytest.fixture
+def sample_items(sample_items):
+    """Sample items with their precomputed views, as build_site() passes them."""
+    return get_render_plan().present_items(sample_items)
+
+
 @pytest.fixture
 def real_env():
     """Create Jinja2 env from the actual project templates."""
@@ -19,6 +27,7 @@ def real_env():
     )
     env.filters["slugify"] = slugify
     env.filters["truncate_text"] = truncate
+    env.globals["asset_url"] = asset_url
     env.globals.update({
         "site_name": "Test Site",
         "site_url": "https://test.com",
@@ -27,6 +36,7 @@ def real_env():
         "current_year": 2025,
         "ga_measurement_id": "G-TEST",
         "adsense_publisher_id": "ca-pub-TEST",
+        "labels": get_render_plan().labels,
     })
     return env
 
@@ -152,6 +162,36 @@ class TestItemTemplate:
         assert "application/ld+json" in html
         assert "SoftwareApplication" in html
 
+    def test_uses_item_social_card(self, real_env, sample_items):
+        tpl = real_env.get_template("item.html")
+        item = sample_items[0]
+        card = "https://test.com/images/cards/dog-api.png"
+        html = tpl.render(
+            item=item,
+            related_items=[],
+            page_title="Test",
+            page_description="Test",
+            page_url="https://test.com",
+            canonical_url="https://test.com",
+            og_image=card,
+        )
+        assert f'<meta property="og:image" content="{card}">' in html
+        assert f'<meta name="twitter:image" content="{card}">' in html
+        assert f'"image": "{card}"' in html
+
+    def test_falls_back_to_shared_og_image(self, real_env, sample_items):
+        tpl = real_env.get_template("item.html")
+        html = tpl.render(
+            item=sample_items[0],
+            related_items=[],
+            page_title="Test",
+            page_description="Test",
+            page_url="https://test.com",
+            canonical_url="https://test.com",
+        )
+        assert 'content="https://test.com/images/og-image.png"' in html
+        assert '"image"' not in html
+
     def test_contains_breadcrumb(self, real_env, sample_items):
         tpl = real_env.get_template("item.html")
         item = sample_items[0]
@@ -191,6 +231,27 @@ class TestItemTemplate:
         assert sample_items[1]["title"] in html
 
 
+    def test_renders_schema_properties(self, real_env):
+        plan = get_render_plan("datasets")
+        item = plan.present_items([{"title": "Climate Data", "slug": "climate-data", "description": "D",
+                                    "category": "Climate", "url": "https://x.test", "format": "CSV",
+                                    "license": "MIT"}])[0]
+        html = real_env.get_template("item.html").render(
+            item=item,
+            related_items=[],
+            labels=plan.labels,
+            page_title="Test",
+            page_description="Test",
+            page_url="https://test.com",
+            canonical_url="https://test.com",
+        )
+        assert '<span class="property-label">Format</span>' in html
+        assert "📜 MIT" in html
+        assert "Authentication" not in html
+        assert '"@type": "Dataset"' in html
+        assert "Get the Dataset" in html
+
+
 class TestCategoryTemplate:
     """Test the category listing template."""
 
@@ -226,6 +287,109 @@ class TestCategoryTemplate:
         )
         assert "category-search" in html
 
+    def test_facet_filters(self, real_env, sample_items):
+        tpl = real_env.get_template("category.html")
+        html = tpl.render(
+            category_name="Animals",
+            category_slug="animals",
+            items=sample_items[:2],
+            item_count=2,
+            facets=[{"key": "auth", "label": "Authentication", "options": [
+                {"value": "apiKey", "text": "🔐 apiKey"},
+                {"value": "None", "text": "🔓 None Required"},
+            ]}],
+            all_categories=[],
+            page_title="Test",
+            page_description="Test",
+            page_url="https://test.com",
+            canonical_url="https://test.com",
+        )
+        assert 'data-facet="auth"' in html
+        assert '<option value="apiKey">🔐 apiKey</option>' in html
+        assert "All Authentication" in html
+
+    def test_pagination_links(self, real_env, sample_items):
+        tpl = real_env.get_template("category.html")
+        html = tpl.render(
+            site_url="https://test.com",
+            category_name="Animals",
+            category_slug="animals",
+            items=sample_items[:1],
+            item_count=3,
+            items_url="/data/category/animals.json",
+            pagination={
+                "page": 2, "count": 3, "first": 2, "last": 2,
+                "prev_url": "/category/animals.html",
+                "next_url": "/category/animals/page-3.html",
+                "links": [
+                    {"number": 1, "url": "/category/animals.html"},
+                    {"number": 2, "url": "/category/animals/page-2.html"},
+                    {"number": 3, "url": "/category/animals/page-3.html"},
+                ],
+            },
+            all_categories=[],
+            page_title="Test",
+            page_description="Test",
+            page_url="https://test.com/category/animals/page-2.html",
+            canonical_url="https://test.com/category/animals/page-2.html",
+        )
+        assert '<link rel="prev" href="https://test.com/category/animals.html">' in html
+        assert '<link rel="next" href="https://test.com/category/animals/page-3.html">' in html
+        assert 'aria-current="page">2</span>' in html
+        assert 'data-items-url="/data/category/animals.json"' in html
+
+
+class TestAssetLinks:
+    """Test fingerprinted asset references in the layout."""
+
+    def test_base_uses_asset_manifest(self, real_env):
+        html = real_env.get_template("404.html").render(
+            page_title="Not Found",
+            page_description="Page not found",
+            page_url="https://test.com/404",
+            canonical_url="https://test.com",
+            asset_manifest={"css/bundle.css": "css/bundle.1234abcd.css", "js/bundle.js": "js/bundle.5678ef90.js"},
+        )
+        assert '<link rel="stylesheet" href="/css/bundle.1234abcd.css">' in html
+        assert 'src="/js/bundle.5678ef90.js"' in html
+
+    def test_inlines_critical_css(self, real_env):
+        html = real_env.get_template("404.html").render(
+            page_title="Not Found",
+            page_description="Page not found",
+            page_url="https://test.com/404",
+            canonical_url="https://test.com",
+            critical_css="body{margin:0}",
+        )
+        assert "<style>body{margin:0}</style>" in html
+        assert '<link rel="preload" href="/css/bundle.css" as="style"' in html
+        assert '<noscript>' in html
+
+
+class TestIndexTemplate:
+    """Test the homepage template."""
+
+    def test_uses_schema_labels(self, real_env):
+        labels = get_render_plan({"labels": {"item": "Dataset", "items": "Datasets"}}).labels
+        html = real_env.get_template("index.html").render(
+            page_title="Home",
+            page_description="Home",
+            page_url="https://test.com/",
+            canonical_url="https://test.com/",
+            total_apis=3,
+            total_categories=1,
+            categories=[],
+            featured_items=[],
+            labels=labels,
+        )
+        assert "Free &amp; Open Datasets" in html
+        assert 'aria-label="Search Datasets"' in html
+        assert "Free Datasets" in html
+        assert "Submit Your Dataset" in html
+        assert "Search APIs" not in html
+        assert "Free APIs" not in html
+        assert "built-in method" not in html
+
 
 class TestErrorTemplate:
     """Test the 404 template."""
@@ -240,6 +404,7 @@ class TestErrorTemplate:
         )
         assert "404" in html
         assert "Not Found" in html
+        assert "The API or page" in html
 
 
 class TestAmazonAffiliateBooks:
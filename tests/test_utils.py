@@ -1,14 +1,34 @@
 """Tests for scripts/utils.py"""
 import json
+import threading
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from scripts.utils import (
+    BuildContext,
+    TokenBucket,
+    compact_database,
     ensure_dir,
+    get_cache_dir,
     get_categories,
+    hash_content,
+    iter_database,
+    iter_journal,
+    iter_page_manifest,
+    journal_delete,
+    journal_insert,
+    journal_path,
+    journal_update,
+    journal_upsert,
     load_database,
+    load_json_state,
+    load_sites_config,
+    process_pool,
     save_database,
+    save_json_state,
+    save_page_manifest,
     slugify,
     truncate,
 )
@@ -74,6 +94,36 @@ class TestLoadDatabase:
             load_database(bad_file)
 
 
+class TestIterDatabase:
+    """Test streaming database reads."""
+
+    def test_matches_load_database(self, sample_database_path, sample_items):
+        assert list(iter_database(sample_database_path)) == sample_items
+
+    def test_small_chunks(self, sample_database_path, sample_items):
+        assert list(iter_database(sample_database_path, chunk_size=3)) == sample_items
+
+    def test_empty_array(self, tmp_path):
+        path = tmp_path / "db.json"
+        path.write_text(" [ ] ", encoding="utf-8")
+        assert list(iter_database(path)) == []
+
+    def test_is_lazy(self, tmp_path):
+        path = tmp_path / "db.json"
+        path.write_text('[{"slug": "a"}, {"slug": "b"}, BROKEN', encoding="utf-8")
+        items = iter_database(path, chunk_size=4)
+        assert next(items) == {"slug": "a"}
+        assert next(items) == {"slug": "b"}
+        with pytest.raises(ValueError):
+            next(items)
+
+    def test_non_array_raises(self, tmp_path):
+        path = tmp_path / "db.json"
+        path.write_text('{"key": "value"}', encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(iter_database(path))
+
+
 class TestSaveDatabase:
     """Test the save_database function."""
 
@@ -102,6 +152,122 @@ class TestSaveDatabase:
         assert path.exists()
 
 
+class TestCatalogJournal:
+    """Test journaled catalog edits and compaction."""
+
+    def test_journal_sits_next_to_database(self, tmp_path):
+        assert journal_path(tmp_path / "database.json") == tmp_path / "database.journal.jsonl"
+
+    def test_edits_append_without_rewriting_snapshot(self, sample_database_path):
+        before = sample_database_path.read_bytes()
+        journal_insert([{"slug": "new-api", "title": "New API"}], sample_database_path)
+        journal_update("dog-api", {"cors": "no"}, sample_database_path)
+        journal_delete(["cat-facts"], sample_database_path)
+
+        assert sample_database_path.read_bytes() == before
+        assert len(list(iter_journal(sample_database_path))) == 3
+
+    def test_load_replays_journal(self, sample_database_path, sample_items):
+        journal_insert([{"slug": "new-api", "title": "New API"}, dict(sample_items[0], title="Dupe")],
+                       sample_database_path)
+        journal_update("dog-api", {"cors": "no"}, sample_database_path)
+        journal_delete(["cat-facts"], sample_database_path)
+        journal_upsert([dict(sample_items[2], title="Replaced")], sample_database_path)
+
+        items = load_database(sample_database_path)
+        by_slug = {i["slug"]: i for i in items}
+        assert "cat-facts" not in by_slug
+        assert by_slug["dog-api"]["title"] == "Dog API"  # insert of an existing slug is skipped
+        assert by_slug["dog-api"]["cors"] == "no"
+        assert by_slug[sample_items[2]["slug"]]["title"] == "Replaced"
+        assert items[-1]["slug"] == "new-api"
+        assert list(iter_database(sample_database_path, chunk_size=16)) == items
+
+    def test_ops_apply_in_order(self, tmp_path):
+        db = tmp_path / "database.json"
+        db.write_text("[]", encoding="utf-8")
+        journal_insert([{"slug": "a", "v": 1}], db)
+        journal_delete(["a"], db)
+        journal_insert([{"slug": "a", "v": 2}], db)
+        journal_update("missing", {"v": 3}, db)
+        assert load_database(db) == [{"slug": "a", "v": 2}]
+
+    def test_compaction_folds_journal(self, sample_database_path, sample_items):
+        journal_insert([{"slug": "new-api", "title": "New API"}], sample_database_path)
+        journal_delete(["dog-api"], sample_database_path)
+        expected = load_database(sample_database_path)
+
+        assert compact_database(sample_database_path) == 2
+        assert not journal_path(sample_database_path).exists()
+        assert json.loads(sample_database_path.read_text(encoding="utf-8")) == expected
+        assert compact_database(sample_database_path) == 0
+
+    def test_replay_after_interrupted_compaction_is_harmless(self, sample_database_path):
+        journal_insert([{"slug": "new-api", "title": "New API"}], sample_database_path)
+        journal_update("dog-api", {"cors": "no"}, sample_database_path)
+        journal_delete(["cat-facts"], sample_database_path)
+        expected = load_database(sample_database_path)
+
+        # Snapshot written but the journal was never removed
+        journal = journal_path(sample_database_path).read_bytes()
+        compact_database(sample_database_path)
+        journal_path(sample_database_path).write_bytes(journal)
+
+        assert load_database(sample_database_path) == expected
+
+    def test_torn_last_line_is_ignored(self, sample_database_path):
+        journal_delete(["dog-api"], sample_database_path)
+        with open(journal_path(sample_database_path), "a", encoding="utf-8") as f:
+            f.write('{"op": "delete", "slu')
+        assert [op["slug"] for op in iter_journal(sample_database_path)] == ["dog-api"]
+
+    def test_append_after_torn_line_recovers(self, sample_database_path):
+        journal_delete(["dog-api"], sample_database_path)
+        # Crash mid-append: a partial line with no newline
+        with open(journal_path(sample_database_path), "a", encoding="utf-8") as f:
+            f.write('{"op": "delete", "slu')
+        journal_delete(["cat-facts"], sample_database_path)
+
+        assert [op["slug"] for op in iter_journal(sample_database_path)] == ["dog-api", "cat-facts"]
+        slugs = [item["slug"] for item in load_database(sample_database_path)]
+        assert "dog-api" not in slugs and "cat-facts" not in slugs
+
+    def test_appends_during_compaction_are_kept(self, sample_database_path):
+        slugs = [f"new-{i}" for i in range(40)]
+
+        def append(slug):
+            journal_insert([{"slug": slug, "title": slug}], sample_database_path)
+
+        threads = [threading.Thread(target=append, args=(slug,)) for slug in slugs]
+        for thread in threads:
+            thread.start()
+        for _ in range(5):
+            compact_database(sample_database_path)
+        for thread in threads:
+            thread.join()
+
+        loaded = {item["slug"] for item in load_database(sample_database_path)}
+        assert set(slugs) <= loaded
+
+    def test_corrupt_middle_line_raises(self, sample_database_path):
+        journal_path(sample_database_path).write_text('garbage\n{"op": "delete", "slug": "a"}\n', encoding="utf-8")
+        with pytest.raises(ValueError, match="not valid JSON"):
+            load_database(sample_database_path)
+
+    def test_rejects_malformed_ops(self, sample_database_path):
+        with pytest.raises(ValueError):
+            journal_update("dog-api", None, sample_database_path)
+        with pytest.raises(ValueError):
+            journal_upsert([{"slug": ""}], sample_database_path)
+        assert not journal_path(sample_database_path).exists()
+
+    def test_full_save_discards_journal(self, sample_database_path, sample_items):
+        journal_delete(["dog-api"], sample_database_path)
+        save_database(sample_items, sample_database_path)
+        assert not journal_path(sample_database_path).exists()
+        assert len(load_database(sample_database_path)) == len(sample_items)
+
+
 class TestEnsureDir:
     """Test the ensure_dir function."""
 
@@ -167,3 +333,154 @@ class TestTruncate:
     def test_exact_length(self):
         text = "x" * 160
         assert truncate(text, 160) == text
+
+
+class TestHashContent:
+    """Test content hashing."""
+
+    def test_str_and_bytes_match(self):
+        assert hash_content("abc") == hash_content(b"abc")
+
+    def test_different_content(self):
+        assert hash_content("a") != hash_content("b")
+
+
+class TestPageManifest:
+    """Test page manifest I/O."""
+
+    def test_round_trip(self, tmp_path):
+        records = [
+            {"path": "index.html", "type": "index", "hash": "aa"},
+            {"path": "api/dog-api.html", "type": "api", "hash": "bb"},
+        ]
+        save_page_manifest(records, tmp_path)
+        assert list(iter_page_manifest(tmp_path)) == records
+
+    def test_missing_manifest(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            list(iter_page_manifest(tmp_path))
+
+
+class TestBuildCache:
+    """Test persistent build state helpers."""
+
+    def test_cache_dir_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("BUILD_CACHE_DIR", str(tmp_path / "c"))
+        assert get_cache_dir() == tmp_path / "c"
+        assert (tmp_path / "c").is_dir()
+
+    def test_json_state_round_trip(self, tmp_path):
+        path = tmp_path / "state" / "s.json"
+        save_json_state(path, {"a": 1})
+        assert load_json_state(path) == {"a": 1}
+        assert not path.with_name("s.json.tmp").exists()
+
+    def test_json_state_default(self, tmp_path):
+        assert load_json_state(tmp_path / "missing.json", default={}) == {}
+        corrupt = tmp_path / "corrupt.json"
+        corrupt.write_text("{", encoding="utf-8")
+        assert load_json_state(corrupt, default=[]) == []
+
+
+class TestProcessPool:
+    """Test the shared process pool factory."""
+
+    def test_spawns_workers_from_threaded_parent(self):
+        def run():
+            with process_pool(1) as pool:
+                return pool.submit(hash_content, "x").result(timeout=60)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(run())) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == [hash_content("x")] * 2
+
+    def test_uses_spawn_context(self):
+        with process_pool(1) as pool:
+            assert pool._mp_context.get_start_method() == "spawn"
+
+
+class TestLoadSitesConfig:
+    """Test the multi-site configuration loader."""
+
+    def test_resolves_paths_relative_to_config(self, tmp_path):
+        config = tmp_path / "sites.json"
+        config.write_text(json.dumps([
+            {"name": "api", "site_url": "https://a.test/", "dist_dir": "dist", "database": "data/db.json"}
+        ]), encoding="utf-8")
+        site = load_sites_config(config)[0]
+        assert site["site_url"] == "https://a.test"
+        assert site["dist_dir"] == str(tmp_path / "dist")
+        assert site["database"] == str(tmp_path / "data" / "db.json")
+
+    def test_missing_required_keys(self, tmp_path):
+        config = tmp_path / "sites.json"
+        config.write_text(json.dumps([{"name": "api"}]), encoding="utf-8")
+        with pytest.raises(ValueError, match="site_url, dist_dir"):
+            load_sites_config(config)
+
+    def test_rejects_non_list(self, tmp_path):
+        config = tmp_path / "sites.json"
+        config.write_text("{}", encoding="utf-8")
+        with pytest.raises(ValueError):
+            load_sites_config(config)
+
+    def test_example_config_is_valid(self):
+        example = Path(__file__).parent.parent / "sites.example.json"
+        sites = load_sites_config(example)
+        assert [s["name"] for s in sites][0] == "api"
+
+
+class TestBuildContext:
+    """Test per-site build contexts."""
+
+    def test_from_site(self, tmp_path):
+        config = tmp_path / "sites.json"
+        config.write_text(json.dumps([
+            {"name": "tools", "site_url": "https://t.test/", "site_name": "Tools", "dist_dir": "out",
+             "database": "db.json", "src_dir": "site-src", "schema": "tools"}
+        ]), encoding="utf-8")
+        ctx = BuildContext.from_site(load_sites_config(config)[0])
+        assert ctx.site_url == "https://t.test"
+        assert ctx.site_name == "Tools"
+        assert ctx.dist_dir == tmp_path / "out"
+        assert ctx.database == tmp_path / "db.json"
+        assert ctx.templates_dir == tmp_path / "site-src" / "templates"
+        assert ctx.template_globals()["site_name"] == "Tools"
+        assert ctx.schema == "tools"
+
+    def test_cache_dir_is_per_site(self):
+        assert BuildContext("", "https://a.test").cache_dir == get_cache_dir()
+        site_cache = BuildContext("tools", "https://t.test").cache_dir
+        assert site_cache == get_cache_dir() / "sites" / "tools"
+        assert site_cache.is_dir()
+
+    def test_is_immutable(self):
+        with pytest.raises(AttributeError):
+            BuildContext("a", "https://a.test").site_url = "https://b.test"
+
+
+class TestTokenBucket:
+    """Test the token-bucket rate limiter."""
+
+    def test_allows_burst_then_limits(self):
+        bucket = TokenBucket(rate=1, capacity=2)
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    def test_acquire_waits_for_refill(self):
+        clock = [100.0]
+        with patch("scripts.utils.time.monotonic", lambda: clock[0]), \
+             patch("scripts.utils.time.sleep", lambda s: clock.__setitem__(0, clock[0] + s)):
+            bucket = TokenBucket(rate=2, capacity=1)
+            assert bucket.acquire() == 0
+            assert bucket.acquire() == pytest.approx(0.5)
+            assert clock[0] == pytest.approx(100.5)
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)